@@ -23,6 +23,14 @@ if errorlevel 1 (
     )
 )
 
+echo Compiling guide pack...
+python scripts\build_guide_pack.py
+if errorlevel 1 (
+    echo Error: Failed to compile the guide pack
+    pause
+    exit /b 1
+)
+
 echo Building executable...
 python -m PyInstaller --onefile --windowed --name "PokeMMO Companion" ^
     --add-data "data;data" ^
@@ -28,6 +28,14 @@ try {
     }
 }
 
+Write-Host "Compiling guide pack..." -ForegroundColor Yellow
+python scripts/build_guide_pack.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "Error: Failed to compile the guide pack" -ForegroundColor Red
+    Read-Host "Press Enter to exit"
+    exit 1
+}
+
 Write-Host "Building executable..." -ForegroundColor Yellow
 
 # Build the executable
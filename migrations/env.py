@@ -7,7 +7,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 
 from pokemmo_companion.core.models import SQLModel
-from pokemmo_companion.core.db import DB_PATH
+from pokemmo_companion.core.db import resolve_db_path
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,7 +29,7 @@ target_metadata = SQLModel.metadata
 
 # Set the database URL if not already set
 if not config.get_main_option("sqlalchemy.url"):
-    config.set_main_option("sqlalchemy.url", f"sqlite:///{DB_PATH}")
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{resolve_db_path()}")
 
 
 def run_migrations_offline() -> None:
@@ -56,13 +56,35 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _store_user_version(connection) -> None:
+    """Mirror the current revision into PRAGMA user_version.
+
+    The app's startup gate (core.schema) compares this number with its
+    head revision instead of loading Alembic on every launch.
+    """
+    revision = context.get_context().get_current_revision()
+    connection.exec_driver_sql(f"PRAGMA user_version = {int(revision or 0)}")
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
+    An existing connection can be passed in-process through
+    ``config.attributes["connection"]``.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+            _store_user_version(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
@@ -76,6 +98,7 @@ def run_migrations_online() -> None:
 
         with context.begin_transaction():
             context.run_migrations()
+            _store_user_version(connection)
 
 
 if context.is_offline_mode():
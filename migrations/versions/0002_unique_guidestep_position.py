@@ -0,0 +1,41 @@
+"""Add unique guide step position index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop duplicate positions left behind by older merge imports
+    op.execute(
+        sa.text(
+            "DELETE FROM guidestep "
+            "WHERE section_index IS NOT NULL AND step_index IS NOT NULL "
+            "AND id NOT IN ("
+            "SELECT MIN(id) FROM guidestep "
+            "GROUP BY guide_id, section_index, step_index)"
+        )
+    )
+    op.create_index(
+        "ux_guidestep_position",
+        "guidestep",
+        ["guide_id", "section_index", "step_index"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_guidestep_position", table_name="guidestep")
@@ -0,0 +1,38 @@
+"""Create import manifest table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "importmanifest",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("mtime", sa.Float(), nullable=False),
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_importmanifest_path"), "importmanifest", ["path"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_importmanifest_path"), table_name="importmanifest")
+    op.drop_table("importmanifest")
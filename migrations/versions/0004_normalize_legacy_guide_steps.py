@@ -0,0 +1,69 @@
+"""Normalize legacy guide steps and drop redundant guide_id index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Legacy rows stored the section as "NNN — title" with no indexes;
+    # move the number into section_index so sections can be queried in SQL
+    legacy = bind.execute(
+        sa.text(
+            "SELECT id, guide_id, title FROM guidestep "
+            "WHERE section_index IS NULL AND instr(title, '—') > 0 "
+            "ORDER BY id"
+        )
+    ).all()
+    next_step: dict[tuple[int, int], int] = {}
+    for step_id, guide_id, title in legacy:
+        idx_str, section_title = title.split("—", 1)
+        try:
+            section_index = int(idx_str.strip())
+        except ValueError:
+            continue
+        position = (guide_id, section_index)
+        if position not in next_step:
+            next_step[position] = bind.execute(
+                sa.text(
+                    "SELECT COALESCE(MAX(step_index), 0) FROM guidestep "
+                    "WHERE guide_id = :guide_id AND section_index = :section_index"
+                ),
+                {"guide_id": guide_id, "section_index": section_index},
+            ).scalar_one()
+        next_step[position] += 1
+        bind.execute(
+            sa.text(
+                "UPDATE guidestep SET section_index = :section_index, "
+                "step_index = :step_index, title = :title WHERE id = :id"
+            ),
+            {
+                "id": step_id,
+                "section_index": section_index,
+                "step_index": next_step[position],
+                "title": section_title.strip(),
+            },
+        )
+
+    # ux_guidestep_position (0002) leads with guide_id and also serves
+    # the ordered per-section reads, so the single-column index is redundant
+    op.drop_index("ix_guidestep_guide_id", table_name="guidestep")
+
+
+def downgrade() -> None:
+    op.create_index("ix_guidestep_guide_id", "guidestep", ["guide_id"], unique=False)
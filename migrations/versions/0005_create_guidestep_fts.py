@@ -0,0 +1,52 @@
+"""Create full-text index over guide steps
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE guidestep_fts USING fts5("
+        "title, text, content='guidestep', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER guidestep_fts_ai AFTER INSERT ON guidestep BEGIN "
+        "INSERT INTO guidestep_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    )
+    op.execute(
+        "CREATE TRIGGER guidestep_fts_ad AFTER DELETE ON guidestep BEGIN "
+        "INSERT INTO guidestep_fts(guidestep_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); END"
+    )
+    op.execute(
+        "CREATE TRIGGER guidestep_fts_au AFTER UPDATE OF title, text ON guidestep "
+        "BEGIN "
+        "INSERT INTO guidestep_fts(guidestep_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); "
+        "INSERT INTO guidestep_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    )
+    # Index the steps that already exist
+    op.execute("INSERT INTO guidestep_fts(guidestep_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS guidestep_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS guidestep_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS guidestep_fts_ai")
+    op.execute("DROP TABLE IF EXISTS guidestep_fts")
@@ -0,0 +1,41 @@
+"""Create section progress table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sectionprogress",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("guide_key", sa.String(), nullable=False),
+        sa.Column("section_index", sa.Integer(), nullable=False),
+        sa.Column("done", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_sectionprogress_position",
+        "sectionprogress",
+        ["guide_key", "section_index"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_sectionprogress_position", table_name="sectionprogress")
+    op.drop_table("sectionprogress")
@@ -0,0 +1,53 @@
+"""Create guide section summary table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "guidesection",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("guide_id", sa.Integer(), nullable=False),
+        sa.Column("section_index", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("step_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["guide_id"],
+            ["guide.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_guidesection_position",
+        "guidesection",
+        ["guide_id", "section_index"],
+        unique=True,
+    )
+
+    # Backfill from the steps already imported
+    op.execute(
+        "INSERT INTO guidesection (guide_id, section_index, title, step_count) "
+        "SELECT guide_id, section_index, min(title), count(*) FROM guidestep "
+        "WHERE section_index IS NOT NULL "
+        "GROUP BY guide_id, section_index"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_guidesection_position", table_name="guidesection")
+    op.drop_table("guidesection")
@@ -0,0 +1,102 @@
+"""Create interned tag store
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-05-01 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tag",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tag_name"), "tag", ["name"], unique=True)
+
+    op.create_table(
+        "guidetag",
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column("guide_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["guide_id"],
+            ["guide.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["tag_id"],
+            ["tag.id"],
+        ),
+        sa.PrimaryKeyConstraint("tag_id", "guide_id"),
+        sqlite_with_rowid=False,
+    )
+    op.create_index("ix_guidetag_guide_id", "guidetag", ["guide_id"], unique=False)
+
+    op.create_table(
+        "sectiontag",
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column("section_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["section_id"],
+            ["guidesection.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["tag_id"],
+            ["tag.id"],
+        ),
+        sa.PrimaryKeyConstraint("tag_id", "section_id"),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_sectiontag_section_id", "sectiontag", ["section_id"], unique=False
+    )
+
+    # Guide tags move from the JSON arrays; step tags were always the
+    # guide's region tag plus section:<index>, now linked per section.
+    op.execute(
+        "INSERT OR IGNORE INTO tag (name) "
+        "SELECT DISTINCT j.value FROM guide, json_each(guide.tags) AS j "
+        "WHERE guide.tags IS NOT NULL"
+    )
+    op.execute(
+        "INSERT OR IGNORE INTO tag (name) "
+        "SELECT DISTINCT 'section:' || section_index FROM guidesection"
+    )
+    op.execute(
+        "INSERT OR IGNORE INTO guidetag (tag_id, guide_id) "
+        "SELECT tag.id, guide.id FROM guide, json_each(guide.tags) AS j "
+        "JOIN tag ON tag.name = j.value WHERE guide.tags IS NOT NULL"
+    )
+    op.execute(
+        "INSERT OR IGNORE INTO sectiontag (tag_id, section_id) "
+        "SELECT tag.id, guidesection.id FROM guidesection "
+        "JOIN tag ON tag.name = 'section:' || guidesection.section_index"
+    )
+    op.execute("UPDATE guidestep SET tags = NULL")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE guidestep SET tags = ("
+        "SELECT json_array('region:' || guide.key, "
+        "'section:' || guidestep.section_index) "
+        "FROM guide WHERE guide.id = guidestep.guide_id)"
+    )
+    op.drop_index("ix_sectiontag_section_id", table_name="sectiontag")
+    op.drop_table("sectiontag")
+    op.drop_index("ix_guidetag_guide_id", table_name="guidetag")
+    op.drop_table("guidetag")
+    op.drop_index(op.f("ix_tag_name"), table_name="tag")
+    op.drop_table("tag")
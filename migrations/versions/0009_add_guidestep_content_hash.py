@@ -0,0 +1,44 @@
+"""Add per-step content hashes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-05-15 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def _step_hash(title: str, text: str | None) -> int:
+    # Must match pokemmo_companion.core.services.guide_loader.step_hash
+    digest = hashlib.blake2b(
+        f"{title}\x1f{text or ''}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def upgrade() -> None:
+    op.add_column("guidestep", sa.Column("content_hash", sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.exec_driver_sql("SELECT id, title, text FROM guidestep").all()
+    if rows:
+        bind.exec_driver_sql(
+            "UPDATE guidestep SET content_hash = ? WHERE id = ?",
+            [(_step_hash(title, text), step_id) for step_id, title, text in rows],
+        )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE guidestep DROP COLUMN content_hash")
@@ -0,0 +1,45 @@
+"""Drop the JSON tag columns
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2024-06-01 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tags live in guidetag/sectiontag since 0008; carry over any guide tag
+    # that was only written to the JSON array since then
+    op.execute(
+        "INSERT OR IGNORE INTO tag (name) "
+        "SELECT DISTINCT j.value FROM guide, json_each(guide.tags) AS j "
+        "WHERE guide.tags IS NOT NULL"
+    )
+    op.execute(
+        "INSERT OR IGNORE INTO guidetag (tag_id, guide_id) "
+        "SELECT tag.id, guide.id FROM guide, json_each(guide.tags) AS j "
+        "JOIN tag ON tag.name = j.value WHERE guide.tags IS NOT NULL"
+    )
+    op.execute("ALTER TABLE guide DROP COLUMN tags")
+    op.execute("ALTER TABLE guidestep DROP COLUMN tags")
+
+
+def downgrade() -> None:
+    op.add_column("guidestep", sa.Column("tags", sa.JSON(), nullable=True))
+    op.add_column("guide", sa.Column("tags", sa.JSON(), nullable=True))
+    op.execute(
+        "UPDATE guide SET tags = ("
+        "SELECT json_group_array(tag.name) FROM guidetag "
+        "JOIN tag ON tag.id = guidetag.tag_id WHERE guidetag.guide_id = guide.id)"
+    )
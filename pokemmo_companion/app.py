@@ -1,24 +1,137 @@
 """Main application entry point for PokeMMO Companion App."""
 
-import sys
-from PySide6.QtWidgets import QApplication
+import time
 
-from pokemmo_companion.core.db import init_db
-from pokemmo_companion.ui.main_window import MainWindow
+_T0 = time.perf_counter()
 
+import argparse  # noqa: E402
+import sys  # noqa: E402
 
-def main():
-    """Main application entry point."""
-    app = QApplication(sys.argv)
-    
-    # Initialize database
+from pokemmo_companion.core import instrumentation  # noqa: E402
+from pokemmo_companion.startup import StartupProfile  # noqa: E402
+
+
+def parse_args(argv=None):
+    """Parse the app's own options; anything else is left for Qt."""
+    parser = argparse.ArgumentParser(description="PokeMMO Companion")
+    parser.add_argument(
+        "--startup-profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="print import and startup phase timings (or write them to FILE as JSON)",
+    )
+    parser.add_argument(
+        "--instrument",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="FILE",
+        help="count SQL statements and time view handlers; adds a Debug panel "
+        "and writes the counters to FILE as JSON on exit",
+    )
+    parser.add_argument(
+        "--guide-store",
+        choices=("sqlite", "mmap"),
+        default=None,
+        help="where the guides view reads from: SQLite, or a memory-mapped file "
+        "next to the database (default: $POKEMMO_GUIDE_STORE, else sqlite)",
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="?",
+        const="data",
+        default=None,
+        metavar="DIR",
+        help="import guide files from DIR (default: data) and re-import them "
+        "whenever they are saved",
+    )
+    return parser.parse_known_args(argv)
+
+
+def _open_database(profile: StartupProfile, backend=None):
+    """Import the data layer and check the schema; runs off the GUI thread.
+
+    Returns the engine and, for the mmap backend, the opened guide store.
+    """
+    with profile.importing("pokemmo_companion.core.db"):
+        from pokemmo_companion.core.db import init_db, resolve_db_path
+    with profile.importing("pokemmo_companion.core.models"):
+        from pokemmo_companion.core import models  # noqa: F401
+    from pokemmo_companion.core.services.guide_pack import install_pack
+    from pokemmo_companion.core.services.guide_store import open_store, resolve_backend
+
+    # First launch: start from the bundled guide pack instead of empty tables
+    if install_pack(resolve_db_path()):
+        profile.mark("pack_installed")
     engine = init_db()
-    
-    # Create and show main window
-    window = MainWindow(engine)
+    profile.mark("schema_ready")
+    store = None
+    if resolve_backend(backend) == "mmap":
+        from sqlmodel import Session
+
+        with Session(engine) as session:
+            store = open_store(session)
+        profile.mark("guide_store_ready")
+    # Warm the view modules so attaching them on the GUI thread is cheap
+    with profile.importing("pokemmo_companion.ui.guides_view"):
+        from pokemmo_companion.ui import guides_view  # noqa: F401
+    return engine, store
+
+
+def main(argv=None):
+    """Main application entry point."""
+    args, qt_args = parse_args(sys.argv[1:] if argv is None else argv)
+    profile = StartupProfile(_T0, enabled=args.startup_profile is not None)
+    if args.instrument is not None:
+        instrumentation.enable()
+
+    with profile.importing("PySide6.QtWidgets"):
+        from PySide6.QtWidgets import QApplication
+    with profile.importing("pokemmo_companion.ui.main_window"):
+        from pokemmo_companion.ui.main_window import MainWindow
+    with profile.importing("pokemmo_companion.ui.query_executor"):
+        from pokemmo_companion.ui.query_executor import QueryExecutor
+    profile.mark("imports")
+
+    app = QApplication([sys.argv[0], *qt_args])
+    profile.mark("qapplication")
+
+    # Show the window first; the database is opened after it has painted
+    window = MainWindow()
     window.resize(1000, 600)
     window.show()
-    
+    profile.mark("window_shown")
+    app.aboutToQuit.connect(window.shutdown)
+    if args.instrument:
+        app.aboutToQuit.connect(lambda: instrumentation.dump_json(args.instrument))
+
+    executor = QueryExecutor(parent=window)
+
+    def on_ready(result):
+        engine, store = result
+        window.attach_engine(engine, store=store)
+        if args.watch:
+            window.watch_guides(args.watch)
+        profile.mark("guides_ready")
+        profile.report(args.startup_profile)
+
+    def on_error(message):
+        window.show_startup_error(message)
+        profile.report(args.startup_profile)
+
+    def on_first_paint():
+        profile.mark("first_paint")
+        executor.submit(
+            "startup",
+            lambda: _open_database(profile, args.guide_store),
+            on_ready,
+            on_error,
+        )
+
+    window.first_painted.connect(on_first_paint)
+
     # Start event loop
     sys.exit(app.exec())
 
@@ -1,27 +1,259 @@
 """Database utilities for the PokeMMO Companion App."""
 
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from sqlmodel import SQLModel, create_engine
+from typing import Iterator, Optional, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, create_engine
+
+from pokemmo_companion.core import instrumentation
 
 DB_PATH = Path("pokemmo_tracker.db")
+DB_PATH_ENV = "POKEMMO_DB_PATH"
+
+BUSY_TIMEOUT_MS = 5000
+# Pool for one writer (imports, progress flushes) and several readers
+# (UI queries on the thread pool); WAL lets the readers run during writes.
+POOL_SIZE = 8
+MAX_OVERFLOW = 8
+# Long-lived read connections a SessionManager keeps out of the pool
+MAX_READERS = 4
+
+# Applied to every new connection. journal_mode is persistent in the file,
+# the rest are per connection.
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", BUSY_TIMEOUT_MS),
+    ("cache_size", -64_000),  # KiB, i.e. ~64MB of page cache
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+)
+# Applied for the length of a guide import. The page cache of a long write
+# transaction fills up to cache_size with pages that are not read again, so
+# the importer's memory grew with the guide size instead of staying flat.
+IMPORT_PRAGMAS = (
+    ("cache_size", -8_000),  # ~8MB
+    ("mmap_size", 0),
+)
+
+_engines: dict[tuple[str, bool], Engine] = {}
+_engines_lock = threading.Lock()
+
 
+def resolve_db_path(db_path: Optional[Union[str, Path]] = None) -> Path:
+    """Return the database path: argument, then ``$POKEMMO_DB_PATH``, then default."""
+    if db_path is None:
+        db_path = os.environ.get(DB_PATH_ENV) or DB_PATH
+    return Path(db_path)
 
-def get_engine(echo: bool = False):
-    """Get a SQLAlchemy engine instance."""
-    return create_engine(
-        f"sqlite:///{DB_PATH}",
+
+def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+@contextmanager
+def import_pragmas(session: Session) -> Iterator[None]:
+    """Apply ``IMPORT_PRAGMAS`` to the session's connection within the block.
+
+    The previous values are restored on exit, on the same connection, so
+    the session must not commit or roll back inside the block.
+    """
+    connection = session.connection()
+    previous = [
+        (name, connection.exec_driver_sql(f"PRAGMA {name}").scalar())
+        for name, _ in IMPORT_PRAGMAS
+    ]
+    for name, value in IMPORT_PRAGMAS:
+        connection.exec_driver_sql(f"PRAGMA {name}={value}")
+    try:
+        yield
+    finally:
+        for name, value in previous:
+            connection.exec_driver_sql(f"PRAGMA {name}={value}")
+
+
+def create_sqlite_engine(
+    db_path: Optional[Union[str, Path]] = None, echo: bool = False
+) -> Engine:
+    """Create a new tuned SQLite engine; prefer ``get_engine``."""
+    path = resolve_db_path(db_path)
+    engine = create_engine(
+        f"sqlite:///{path}",
         echo=echo,
-        connect_args={"check_same_thread": False},
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": BUSY_TIMEOUT_MS / 1000,
+        },
     )
+    event.listen(engine, "connect", _apply_pragmas)
+    return instrumentation.register_engine(engine)
+
+
+def get_engine(
+    echo: bool = False, db_path: Optional[Union[str, Path]] = None
+) -> Engine:
+    """Get the process-wide SQLAlchemy engine for a database file.
+
+    Engines are created once per resolved path and reused, so every caller
+    shares one connection pool with the pragmas in ``SQLITE_PRAGMAS``.
+    """
+    path = resolve_db_path(db_path)
+    cache_key = (str(path.resolve()), echo)
+    with _engines_lock:
+        engine = _engines.get(cache_key)
+        if engine is None:
+            engine = _engines[cache_key] = create_sqlite_engine(path, echo=echo)
+        return engine
+
+
+def dispose_engines() -> None:
+    """Close and forget every engine created by ``get_engine``."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
 
 
 def init_db(engine=None):
-    """Initialize the database with all models.
-    
-    Prefer Alembic migrations; this is a fallback for a fresh DB.
+    """Open the database and bring its schema up to date.
+
+    Runs the Alembic migrations in-process only when the version stored
+    in the database is behind; see ``core.schema.ensure_schema``.
     """
-    from pokemmo_companion.core import models  # ensure models register metadata
-    
+    from pokemmo_companion.core.schema import ensure_schema
+
     engine = engine or get_engine()
-    SQLModel.metadata.create_all(engine)
+    ensure_schema(engine)
     return engine
+
+
+class _Reader:
+    """A read-only session bound to a connection it keeps checked out."""
+
+    __slots__ = ("connection", "session", "generation")
+
+    def __init__(self, connection: Connection, generation: int):
+        self.connection = connection
+        self.session = Session(bind=connection, autoflush=False)
+        self.generation = generation
+
+
+class SessionManager:
+    """Sessions for one engine: long-lived reads for the UI, short writes.
+
+    ``read()`` lends one of up to ``max_readers`` read-only sessions, each
+    bound to its own connection (``PRAGMA query_only``) that stays checked
+    out, so a UI query pays for the query alone rather than a new Session,
+    a pool checkout and a fresh identity map. pysqlite only opens a SQLite
+    transaction before a write, so these sessions never hold a WAL
+    snapshot and every statement sees the latest committed rows; loaded
+    objects are kept between uses. When every reader is busy a temporary
+    session is used instead.
+
+    ``write()`` returns a new, short-lived Session for imports and progress
+    flushes. Each commit through one is a refresh point: readers expire
+    their identity maps before their next use. Call ``refresh()`` after
+    writes made through other sessions.
+    """
+
+    def __init__(self, engine: Engine, max_readers: int = MAX_READERS):
+        self.engine = engine
+        self.max_readers = max_readers
+        self._lock = threading.Lock()
+        self._idle: list[_Reader] = []
+        self._readers: list[_Reader] = []
+        self._generation = 0
+        self._closed = False
+
+    def _acquire(self) -> Optional[_Reader]:
+        with self._lock:
+            if self._closed:
+                return None
+            if self._idle:
+                reader = self._idle.pop()
+            elif len(self._readers) < self.max_readers:
+                reader = None
+            else:
+                return None
+            generation = self._generation
+        if reader is None:
+            connection = self.engine.connect()
+            connection.exec_driver_sql("PRAGMA query_only=ON")
+            connection.commit()
+            reader = _Reader(connection, generation)
+            with self._lock:
+                self._readers.append(reader)
+        elif reader.generation != generation:
+            reader.session.expire_all()
+            reader.generation = generation
+        return reader
+
+    def _release(self, reader: _Reader) -> None:
+        # A rejected write leaves the BEGIN pysqlite issued before it open,
+        # which would pin this reader to an old snapshot
+        if reader.connection.connection.dbapi_connection.in_transaction:
+            reader.session.rollback()
+        with self._lock:
+            if not self._closed:
+                self._idle.append(reader)
+                return
+        self._close_reader(reader)
+
+    @contextmanager
+    def read(self) -> Iterator[Session]:
+        """Lend a read-only session for the duration of a ``with`` block."""
+        reader = self._acquire()
+        if reader is None:
+            with Session(self.engine) as session:
+                yield session
+            return
+        try:
+            yield reader.session
+        except BaseException:
+            reader.session.rollback()
+            raise
+        finally:
+            self._release(reader)
+
+    def write(self) -> Session:
+        """Return a new session for a short write; its commits refresh readers."""
+        session = Session(self.engine)
+        event.listen(session, "after_commit", self._after_commit)
+        return session
+
+    def _after_commit(self, _session) -> None:
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Make every reader drop its identity map before its next use."""
+        with self._lock:
+            self._generation += 1
+
+    @staticmethod
+    def _close_reader(reader: _Reader) -> None:
+        reader.session.close()
+        # The connection goes back to the pool; make it writable again
+        reader.connection.exec_driver_sql("PRAGMA query_only=OFF")
+        reader.connection.commit()
+        reader.connection.close()
+
+    def close(self) -> None:
+        """Close the idle readers; readers in use close when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._readers = []
+        for reader in idle:
+            self._close_reader(reader)
@@ -0,0 +1,235 @@
+"""SQL statement counters and named timing spans.
+
+Disabled by default. While disabled no SQLAlchemy listeners are attached
+and ``span`` returns a shared no-op context manager, so instrumented code
+pays one flag check per span. ``enable`` attaches ``before/after_cursor_execute``
+listeners to every engine passed to ``register_engine`` (``core.db`` does
+this for its engines) and starts recording spans. Setting
+``$POKEMMO_INSTRUMENT`` enables it at import time.
+
+Spans record their wall time and the number of SQL statements executed
+on the same thread while they were open. Work handed to another thread
+needs its own span there.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+F = TypeVar("F", bound=Callable)
+
+INSTRUMENT_ENV = "POKEMMO_INSTRUMENT"
+
+_NOOP = nullcontext()
+_enabled = bool(os.environ.get(INSTRUMENT_ENV))
+_lock = threading.Lock()
+_local = threading.local()
+_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+_statements: dict[str, list] = {}
+_spans: dict[str, list] = {}
+# Longest SQL prefix used as a statement key
+_SQL_KEY_LENGTH = 200
+
+
+@dataclass(frozen=True)
+class TimingStat:
+    """Aggregated timings of one statement or span name."""
+
+    name: str
+    count: int
+    total_ms: float
+    max_ms: float
+    queries: int = 0
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Point-in-time copy of all counters."""
+
+    enabled: bool
+    query_count: int
+    query_ms: float
+    statements: tuple[TimingStat, ...]
+    spans: tuple[TimingStat, ...]
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def format(self) -> str:
+        """Render the snapshot as an aligned text table."""
+        lines = [f"SQL: {self.query_count} statements, {self.query_ms:.1f}ms"]
+        lines.append("")
+        lines.append(
+            f"{'span':<36} {'count':>7} {'total ms':>10} {'max ms':>9} {'sql':>6}"
+        )
+        for s in self.spans:
+            lines.append(
+                f"{s.name:<36} {s.count:>7} {s.total_ms:>10.1f} "
+                f"{s.max_ms:>9.1f} {s.queries:>6}"
+            )
+        lines.append("")
+        lines.append(f"{'statement':<60} {'count':>7} {'total ms':>10}")
+        for s in self.statements:
+            name = " ".join(s.name.split())[:60]
+            lines.append(f"{name:<60} {s.count:>7} {s.total_ms:>10.1f}")
+        return "\n".join(lines)
+
+
+def is_enabled() -> bool:
+    """Whether statements and spans are being recorded."""
+    return _enabled
+
+
+def _record(table: dict[str, list], name: str, elapsed: float, queries: int = 0):
+    with _lock:
+        stat = table.get(name)
+        if stat is None:
+            table[name] = [1, elapsed, elapsed, queries]
+        else:
+            stat[0] += 1
+            stat[1] += elapsed
+            if elapsed > stat[2]:
+                stat[2] = elapsed
+            stat[3] += queries
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("instrumentation_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("instrumentation_start")
+    if not starts:  # enabled between before and after
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    _local.queries = getattr(_local, "queries", 0) + 1
+    _record(_statements, statement[:_SQL_KEY_LENGTH], elapsed)
+
+
+def _attach(engine: Engine) -> None:
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _detach(engine: Engine) -> None:
+    from sqlalchemy import event
+
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def register_engine(engine: Engine) -> Engine:
+    """Make an engine's statements countable; listeners attach only while enabled."""
+    _engines.add(engine)
+    if _enabled:
+        _attach(engine)
+    return engine
+
+
+def enable() -> None:
+    """Start recording statements of registered engines and spans."""
+    global _enabled
+    _enabled = True
+    for engine in list(_engines):
+        _attach(engine)
+
+
+def disable() -> None:
+    """Stop recording and detach the statement listeners."""
+    global _enabled
+    _enabled = False
+    for engine in list(_engines):
+        _detach(engine)
+
+
+def reset() -> None:
+    """Clear all counters."""
+    with _lock:
+        _statements.clear()
+        _spans.clear()
+
+
+class _Span:
+    __slots__ = ("name", "start", "queries")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.queries = getattr(_local, "queries", 0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _record(
+            _spans, self.name, elapsed, getattr(_local, "queries", 0) - self.queries
+        )
+        return False
+
+
+def span(name: str):
+    """Context manager timing the block under ``name`` while enabled."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator wrapping every call of a function in ``span(name)``."""
+
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _stats(table: dict[str, list]) -> tuple[TimingStat, ...]:
+    stats = (
+        TimingStat(name, count, total * 1000, worst * 1000, queries)
+        for name, (count, total, worst, queries) in table.items()
+    )
+    return tuple(sorted(stats, key=lambda s: s.total_ms, reverse=True))
+
+
+def snapshot() -> Snapshot:
+    """Return a copy of the current counters, slowest first."""
+    with _lock:
+        statements = _stats(_statements)
+        spans = _stats(_spans)
+    return Snapshot(
+        enabled=_enabled,
+        query_count=sum(s.count for s in statements),
+        query_ms=sum(s.total_ms for s in statements),
+        statements=statements,
+        spans=spans,
+    )
+
+
+def dump_json(path: Optional[Path | str] = None) -> str:
+    """Return the snapshot as JSON, also writing it to ``path`` if given."""
+    data = json.dumps(snapshot().as_dict(), indent=2)
+    if path is not None:
+        Path(path).write_text(data + "\n", encoding="utf-8")
+    return data
@@ -1,7 +1,8 @@
 """Core data models for the PokeMMO Companion App."""
 
-from typing import Optional, List
-from sqlmodel import SQLModel, Field, Column, JSON
+from typing import Optional
+from sqlalchemy import DDL, Index, event
+from sqlmodel import SQLModel, Field
 
 
 class Guide(SQLModel, table=True):
@@ -10,17 +11,150 @@ class Guide(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     key: str = Field(index=True, unique=True)
     title: str
-    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
 
 
 class GuideStep(SQLModel, table=True):
     """A step within a guide section."""
-    
+
+    __table_args__ = (
+        Index(
+            "ux_guidestep_position",
+            "guide_id",
+            "section_index",
+            "step_index",
+            unique=True,
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    guide_id: int = Field(foreign_key="guide.id", index=True)
+    # Lookups by guide_id use the leading column of ux_guidestep_position
+    guide_id: int = Field(foreign_key="guide.id")
     section_index: Optional[int] = None
     step_index: Optional[int] = None
     title: str
     details: Optional[str] = None
     text: Optional[str] = None
-    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    # 64-bit hash of title and text, see guide_loader.step_hash; lets
+    # imports diff a file against the stored steps without reading texts
+    content_hash: Optional[int] = None
+
+
+# Full-text index over step titles and texts (external content, kept in
+# sync by triggers). Mirrored by migration 0005 for Alembic-managed DBs;
+# test_migrations_match_models checks that the two agree.
+GUIDESTEP_FTS_DDL = (
+    "CREATE VIRTUAL TABLE guidestep_fts USING fts5("
+    "title, text, content='guidestep', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER guidestep_fts_ai AFTER INSERT ON guidestep BEGIN "
+    "INSERT INTO guidestep_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER guidestep_fts_ad AFTER DELETE ON guidestep BEGIN "
+    "INSERT INTO guidestep_fts(guidestep_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER guidestep_fts_au AFTER UPDATE OF title, text ON guidestep "
+    "BEGIN "
+    "INSERT INTO guidestep_fts(guidestep_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO guidestep_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+)
+
+for _statement in GUIDESTEP_FTS_DDL:
+    event.listen(
+        GuideStep.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    GuideStep.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS guidestep_fts").execute_if(dialect="sqlite"),
+)
+
+
+class GuideSection(SQLModel, table=True):
+    """Title and step count of one guide section.
+
+    Derived from GuideStep rows and rebuilt by the guide loader whenever a
+    guide is written, so section lists never scan steps.
+    """
+
+    __table_args__ = (
+        Index(
+            "ux_guidesection_position",
+            "guide_id",
+            "section_index",
+            unique=True,
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    guide_id: int = Field(foreign_key="guide.id")
+    section_index: int
+    title: str
+    step_count: int = 0
+
+
+class Tag(SQLModel, table=True):
+    """An interned tag name such as ``region:kanto`` or ``section:3``."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(index=True, unique=True)
+
+
+class GuideTag(SQLModel, table=True):
+    """Links a tag to a guide; the tag applies to every step of the guide."""
+
+    __table_args__ = (
+        Index("ix_guidetag_guide_id", "guide_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    guide_id: int = Field(foreign_key="guide.id", primary_key=True)
+
+
+class SectionTag(SQLModel, table=True):
+    """Links a tag to a guide section; the tag applies to its steps."""
+
+    __table_args__ = (
+        Index("ix_sectiontag_section_id", "section_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    section_id: int = Field(foreign_key="guidesection.id", primary_key=True)
+
+
+class ImportManifest(SQLModel, table=True):
+    """The last imported state of a guide file, used to skip unchanged files."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    path: str = Field(index=True, unique=True)
+    size: int
+    mtime: float
+    content_hash: str
+
+
+class SectionProgress(SQLModel, table=True):
+    """Whether the user has completed a guide section.
+
+    Keyed by guide key and section index rather than row ids so progress
+    survives guide re-imports.
+    """
+
+    __table_args__ = (
+        Index(
+            "ux_sectionprogress_position",
+            "guide_key",
+            "section_index",
+            unique=True,
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    guide_key: str
+    section_index: int
+    done: bool = False
+    updated_at: float = 0.0
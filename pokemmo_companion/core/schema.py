@@ -0,0 +1,96 @@
+"""Startup schema gate backed by the Alembic migrations."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+log = logging.getLogger(__name__)
+
+# Numeric id of the head revision in migrations/versions. migrations/env.py
+# stores the current revision in ``PRAGMA user_version`` after every run,
+# so startup can compare the two with one header read.
+SCHEMA_VERSION = 10
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+def stored_version(conn: Connection) -> int:
+    """Return the schema version recorded in the database header."""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def alembic_config(conn: Connection):
+    """Build an Alembic config that runs on ``conn`` without alembic.ini."""
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = conn
+    return config
+
+
+def _legacy_revision(conn: Connection) -> str | None:
+    """Guess the revision of a database built by ``create_all``.
+
+    Before the schema gate, ``init_db`` created tables without recording
+    a revision. Each migration left a marker table or index behind, so
+    the newest marker present tells which revision the file matches.
+    """
+    insp = inspect(conn)
+    tables = set(insp.get_table_names())
+    if "guide" not in tables:
+        return None
+    if "tag" in tables:
+        columns = {c["name"] for c in insp.get_columns("guidestep")}
+        if "tags" not in columns:
+            return "0010"
+        return "0009" if "content_hash" in columns else "0008"
+    if "guidesection" in tables:
+        return "0007"
+    if "sectionprogress" in tables:
+        return "0006"
+    if "guidestep_fts" in tables:
+        return "0005"
+    indexes = {ix["name"] for ix in insp.get_indexes("guidestep")}
+    if "importmanifest" in tables:
+        return "0003" if "ix_guidestep_guide_id" in indexes else "0004"
+    if "ux_guidestep_position" in indexes:
+        return "0002"
+    return "0001"
+
+
+def upgrade(engine: Engine) -> None:
+    """Run pending migrations in-process in one transaction."""
+    from alembic import command
+
+    with engine.begin() as conn:
+        config = alembic_config(conn)
+        if not inspect(conn).has_table("alembic_version"):
+            legacy = _legacy_revision(conn)
+            if legacy is not None:
+                log.info("Stamping unversioned database as revision %s", legacy)
+                command.stamp(config, legacy)
+        command.upgrade(config, "head")
+
+
+def ensure_schema(engine: Engine) -> bool:
+    """Bring the schema up to ``SCHEMA_VERSION``; return whether it ran.
+
+    The common case, an up-to-date database, costs a single
+    ``PRAGMA user_version`` read and never imports Alembic.
+    """
+    with engine.connect() as conn:
+        version = stored_version(conn)
+    if version == SCHEMA_VERSION:
+        return False
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this app "
+            f"supports ({SCHEMA_VERSION})"
+        )
+    log.info("Migrating database schema from %d to %d", version, SCHEMA_VERSION)
+    upgrade(engine)
+    return True
@@ -0,0 +1,285 @@
+"""Page queries and a read-side cache of guide sections and steps for the guides view."""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable, Iterable, Optional
+from sqlalchemy import bindparam, func
+from sqlmodel import Session, select
+
+from pokemmo_companion.core.models import Guide, GuideSection, GuideStep
+from pokemmo_companion.core.services.guide_keys import guide_ref
+from pokemmo_companion.core.services.guide_loader import ImportStats
+from pokemmo_companion.core.services.guide_store import import_token
+
+DEFAULT_MAX_GUIDES = 8
+# Seconds between checks for imports made by other processes
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_PAGE_SIZE = 500
+# Keyset start for a first page; below any section or step index
+_BEFORE_FIRST = -(2**63)
+
+# Hot statements are built once with bound parameters: executing the same
+# object skips statement construction and always hits SQLAlchemy's
+# compiled cache. Guide keys are resolved to ids through ``guide_ref``, so
+# none of them joins the guide table.
+_REGION_KEYS = select(Guide.key).order_by(Guide.key)
+_SECTIONS_PAGE = (
+    select(GuideSection.section_index, GuideSection.title)
+    .where(
+        GuideSection.guide_id == bindparam("guide_id"),
+        GuideSection.section_index > bindparam("after"),
+    )
+    .order_by(GuideSection.section_index)
+    .limit(bindparam("limit"))
+)
+_STEPS_PAGE = (
+    select(
+        GuideStep.step_index,
+        func.coalesce(GuideStep.text, GuideStep.details, ""),
+    )
+    .where(
+        GuideStep.guide_id == bindparam("guide_id"),
+        GuideStep.section_index == bindparam("section_index"),
+        GuideStep.step_index > bindparam("after"),
+    )
+    .order_by(GuideStep.step_index)
+    .limit(bindparam("limit"))
+)
+
+
+Rows = tuple[tuple[int, str], ...]
+
+
+class CachedGuide:
+    """Section list and per-section (step_index, text) rows of one guide.
+
+    ``sections`` is None for a guide with too many sections to cache, and
+    ``steps`` is filled lazily with the sections small enough to cache.
+    """
+
+    __slots__ = ("key", "guide_id", "title", "sections", "steps")
+
+    def __init__(
+        self,
+        key: str,
+        guide_id: int,
+        title: str,
+        sections: Optional[Rows],
+    ):
+        self.key = key
+        self.guide_id = guide_id
+        self.title = title
+        self.sections = sections
+        self.steps: dict[int, Rows] = {}
+
+
+def _slice(rows: Rows, after: Optional[int], limit: int) -> list[tuple[int, str]]:
+    """Return the page of cached ``rows`` a keyset query would return."""
+    start = 0 if after is None else bisect_right(rows, after, key=itemgetter(0))
+    return list(rows[start : start + limit])
+
+
+def query_region_keys(session: Session) -> list[str]:
+    """Return the keys of all guides in order."""
+    return list(session.exec(_REGION_KEYS).all())
+
+
+def query_sections_page(
+    session: Session,
+    guide_key: str,
+    after: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> list[tuple[int, str]]:
+    """Return up to ``limit`` (section_index, title) pairs after ``after``.
+
+    Keyset pagination on ``section_index``: pass the last index of the
+    previous page to get the next one.
+    """
+    ref = guide_ref(session, guide_key)
+    if ref is None:
+        return []
+    rows = session.exec(
+        _SECTIONS_PAGE,
+        params={
+            "guide_id": ref.id,
+            "after": _BEFORE_FIRST if after is None else after,
+            "limit": limit,
+        },
+    ).all()
+    return [(idx, title) for idx, title in rows]
+
+
+def query_steps_page(
+    session: Session,
+    guide_key: str,
+    section_index: int,
+    after: Optional[int] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> list[tuple[int, str]]:
+    """Return up to ``limit`` (step_index, text) pairs of a section after ``after``."""
+    ref = guide_ref(session, guide_key)
+    if ref is None:
+        return []
+    rows = session.exec(
+        _STEPS_PAGE,
+        params={
+            "guide_id": ref.id,
+            "section_index": section_index,
+            "after": _BEFORE_FIRST if after is None else after,
+            "limit": limit,
+        },
+    ).all()
+    return [(idx, text) for idx, text in rows]
+
+
+class GuideCache:
+    """LRU cache of ``CachedGuide`` entries keyed by guide key.
+
+    ``sections_page`` and ``steps_page`` answer the same pages as
+    ``query_sections_page`` and ``query_steps_page``. Loading a guide costs
+    one session and one query for its section list; each section's steps
+    are fetched when its first page is asked for. Lists longer than
+    ``max_rows`` are not cached, so their pages always come from SQLite
+    and a huge guide or section is never read whole. Register ``on_import`` with
+    ``guide_loader.add_import_listener`` to drop guides as they are
+    re-imported. Imports made by another process, e.g.
+    ``scripts/import_guides.py --watch``, never reach the listeners: at
+    most once every ``check_interval`` seconds an access compares the
+    import token of the manifest (``guide_store.import_token``) with the
+    one the entries were loaded under and drops every entry if it changed.
+    Other hits never touch the database.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_guides: int = DEFAULT_MAX_GUIDES,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        max_rows: int = DEFAULT_PAGE_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.max_guides = max_guides
+        self.check_interval = check_interval
+        self.max_rows = max_rows
+        self._entries: OrderedDict[str, CachedGuide] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation so a load racing an import is not cached
+        self._generation = 0
+        self._token: Optional[bytes] = None
+        self._checked = float("-inf")
+
+    def _check_token(self) -> None:
+        """Drop every entry if the database saw an import since the last check."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < self.check_interval:
+                return
+            self._checked = now
+        with self.session_factory() as s:
+            token = import_token(s)
+        with self._lock:
+            if token != self._token:
+                self._token = token
+                self._entries.clear()
+                self._generation += 1
+
+    def get(self, key: str) -> Optional[CachedGuide]:
+        """Return the cached guide for ``key``, loading it on a miss."""
+        self._check_token()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            generation = self._generation
+
+        entry = self._load(key)
+        if entry is None:
+            return None
+
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_guides:
+                self._entries.popitem(last=False)
+        return entry
+
+    def sections_page(
+        self,
+        key: str,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> list[tuple[int, str]]:
+        """Return a page of (section_index, title) pairs of a guide."""
+        entry = self.get(key)
+        if entry is None:
+            return []
+        if entry.sections is None:
+            with self.session_factory() as s:
+                return query_sections_page(s, key, after, limit)
+        return _slice(entry.sections, after, limit)
+
+    def steps_page(
+        self,
+        key: str,
+        section_index: int,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> list[tuple[int, str]]:
+        """Return a page of (step_index, text) pairs of a section."""
+        entry = self.get(key)
+        if entry is None:
+            return []
+        rows = entry.steps.get(section_index)
+        if rows is None:
+            with self.session_factory() as s:
+                if after is not None:
+                    # Only a first page is read far enough to be cached
+                    return query_steps_page(s, key, section_index, after, limit)
+                page = query_steps_page(s, key, section_index, None, self.max_rows + 1)
+            if len(page) > self.max_rows:
+                return page[:limit]
+            rows = entry.steps[section_index] = tuple(page)
+        return _slice(rows, after, limit)
+
+    def _load(self, key: str) -> Optional[CachedGuide]:
+        with self.session_factory() as s:
+            ref = guide_ref(s, key)
+            if ref is None:
+                return None
+            sections = query_sections_page(s, key, None, self.max_rows + 1)
+        return CachedGuide(
+            key=key,
+            guide_id=ref.id,
+            title=ref.title,
+            sections=tuple(sections) if len(sections) <= self.max_rows else None,
+        )
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Drop the given guide keys, or every entry when ``keys`` is None."""
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def on_import(self, stats: ImportStats) -> None:
+        """Import listener dropping every guide the run rewrote."""
+        self.invalidate(stats.guides)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
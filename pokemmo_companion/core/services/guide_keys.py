@@ -0,0 +1,113 @@
+"""In-memory map from guide keys to guide ids and titles.
+
+The guides view and the loader turn a region key into a guide id on every
+click and every imported file. ``guide_ref`` answers that from a map
+loaded with one query per database (engine) and kept until the loader
+calls ``invalidate_guide_keys`` after an import. A key that is not in the
+map reloads it, so guides added by another process still resolve; the
+miss is remembered for ``MISS_RETRY_INTERVAL`` seconds (or until the next
+invalidation), so looking up an unknown key again does not rescan the
+guide table every time.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import NamedTuple, Optional
+from weakref import WeakKeyDictionary
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, select
+
+from pokemmo_companion.core.models import Guide
+
+_ALL_GUIDES = select(Guide.key, Guide.id, Guide.title)
+# Seconds before a key that was not found reloads the map again
+MISS_RETRY_INTERVAL = 1.0
+
+
+class GuideRef(NamedTuple):
+    id: int
+    title: str
+
+
+class GuideKeyMap:
+    """Key -> ``GuideRef`` map of one database, safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refs: Optional[dict[str, GuideRef]] = None
+        # Key -> monotonic time of the reload that did not find it
+        self._misses: dict[str, float] = {}
+        # Bumped on invalidation so a load racing an import is not kept
+        self._generation = 0
+
+    def get(self, session: Session, key: str) -> Optional[GuideRef]:
+        """Return the id and title of the guide ``key``, or None if unknown."""
+        with self._lock:
+            refs, generation = self._refs, self._generation
+            missed = self._misses.get(key)
+        if refs is not None:
+            if key in refs:
+                return refs[key]
+            if missed is not None and time.monotonic() - missed < MISS_RETRY_INTERVAL:
+                return None
+        refs = self._load(session, generation)
+        ref = refs.get(key)
+        if ref is None:
+            with self._lock:
+                if generation == self._generation:
+                    self._misses[key] = time.monotonic()
+        return ref
+
+    def _load(self, session: Session, generation: int) -> dict[str, GuideRef]:
+        refs = {
+            key: GuideRef(guide_id, title)
+            for key, guide_id, title in session.exec(_ALL_GUIDES)
+        }
+        with self._lock:
+            if generation == self._generation:
+                self._refs = refs
+        return refs
+
+    def invalidate(self) -> None:
+        """Forget every entry; the next lookup reloads the map."""
+        with self._lock:
+            self._refs = None
+            self._misses.clear()
+            self._generation += 1
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the map currently holds entries."""
+        with self._lock:
+            return self._refs is not None
+
+
+_maps: WeakKeyDictionary[Engine, GuideKeyMap] = WeakKeyDictionary()
+_maps_lock = threading.Lock()
+
+
+def _engine(session: Session) -> Engine:
+    bind = session.get_bind()
+    return bind.engine if isinstance(bind, Connection) else bind
+
+
+def guide_key_map(session: Session) -> GuideKeyMap:
+    """Return the key map of the session's database."""
+    engine = _engine(session)
+    with _maps_lock:
+        key_map = _maps.get(engine)
+        if key_map is None:
+            key_map = _maps[engine] = GuideKeyMap()
+        return key_map
+
+
+def guide_ref(session: Session, key: str) -> Optional[GuideRef]:
+    """Return the id and title of the guide ``key`` in the session's database."""
+    return guide_key_map(session).get(session, key)
+
+
+def invalidate_guide_keys(session: Session) -> None:
+    """Drop the key map of the session's database, e.g. after an import."""
+    guide_key_map(session).invalidate()
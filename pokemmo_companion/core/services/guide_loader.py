@@ -2,40 +2,425 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
-from dataclasses import dataclass
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from itertools import islice, repeat
 from pathlib import Path
-from typing import Iterable, Literal
+from typing import Any, Callable, Iterable, Iterator, Literal, NamedTuple, Optional
+from sqlalchemy import bindparam, delete, func, insert, update
 from sqlmodel import Session, select
 
-from pokemmo_companion.core.models import Guide, GuideStep
+from pokemmo_companion.core.db import import_pragmas
+from pokemmo_companion.core.instrumentation import span
+from pokemmo_companion.core.models import (
+    Guide,
+    GuideSection,
+    GuideStep,
+    ImportManifest,
+)
+from pokemmo_companion.core.services.guide_keys import (
+    guide_ref,
+    invalidate_guide_keys,
+)
+from pokemmo_companion.core.services.guide_store import refresh_for_session
+from pokemmo_companion.core.services.tags import (
+    clear_section_tags,
+    tag_guide,
+    tag_sections,
+)
 
 log = logging.getLogger(__name__)
 
+GUIDE_PATTERN = "guide_*.json"
+DEFAULT_BATCH_SIZE = 5000
+# Files larger than this are hashed and parsed incrementally
+DEFAULT_STREAM_THRESHOLD = 32 * 1024 * 1024
+_STREAM_CHUNK_SIZE = 1024 * 1024
+# Parse results queued per worker process; parsed steps wait in memory
+# until the writer gets to them, so only this many run ahead of it
+_JOBS_IN_FLIGHT = 2
+# Largest single value (e.g. one section) the streaming reader buffers, in
+# characters; malformed or truncated input fails here instead of buffering
+# the rest of the file
+_MAX_STREAM_VALUE = 64 * 1024 * 1024
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
 
-@dataclass(frozen=True)
-class LoadedStep:
+
+class LoadedStep(NamedTuple):
     """A step loaded from a guide JSON file."""
-    
+
     section_index: int
     section_title: str
     step_index: int
     text: str
 
 
+@dataclass
+class ImportStats:
+    """Summary of a load_guides_from_dir run."""
+
+    files: int = 0
+    skipped: int = 0
+    inserted: int = 0
+    updated: int = 0
+    moved: int = 0
+    merged: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    elapsed: float = 0.0
+    guides: list[str] = field(default_factory=list)
+    # Filled by dry runs only
+    changes: list[StepChangeset] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Inserted step rows per second of wall time."""
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class ParsedFile:
+    """A guide file read and parsed ahead of the database writer."""
+
+    path: Path
+    size: int
+    mtime: float
+    status: Literal["parsed", "stream", "unchanged", "touched", "no_region", "error"]
+    content_hash: str = ""
+    region: str = ""
+    steps: tuple[LoadedStep, ...] = ()
+    error: str = ""
+
+
+ImportListener = Callable[[ImportStats], None]
+_import_listeners: list[ImportListener] = []
+
+
+def add_import_listener(listener: ImportListener) -> None:
+    """Call ``listener`` with the stats of every committed import run."""
+    _import_listeners.append(listener)
+
+
+def remove_import_listener(listener: ImportListener) -> None:
+    """Stop notifying a listener registered with ``add_import_listener``."""
+    if listener in _import_listeners:
+        _import_listeners.remove(listener)
+
+
+def _section_steps(s_idx: int, section: dict) -> Iterator[LoadedStep]:
+    """Iterate over the steps of one section payload."""
+    title = str(section.get("title", f"Section {s_idx}"))
+    for t_idx, line in enumerate(section.get("steps", []), start=1):
+        yield LoadedStep(s_idx, title, t_idx, str(line))
+
+
 def _iter_steps(payload: dict) -> Iterable[LoadedStep]:
     """Iterate over all steps in a guide payload."""
     for s_idx, section in enumerate(payload.get("sections", []), start=1):
-        title = str(section.get("title", f"Section {s_idx}"))
-        for t_idx, line in enumerate(section.get("steps", []), start=1):
-            yield LoadedStep(s_idx, title, t_idx, str(line))
+        yield from _section_steps(s_idx, section)
 
 
-def _load_json(path: Path) -> dict:
-    """Load and parse a JSON file."""
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+class _JsonStream:
+    """Incremental reader for the top level of a guide JSON document.
+
+    Only one top-level value or one array element is decoded at a time, so
+    memory is bounded by the largest section rather than the whole file. A
+    value longer than ``max_value`` characters raises ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        chunk_size: int = _STREAM_CHUNK_SIZE,
+        max_value: int = _MAX_STREAM_VALUE,
+    ):
+        self._file = path.open("r", encoding="utf-8")
+        self._chunk_size = chunk_size
+        self._max_value = max_value
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Append the next chunk to the unconsumed part of the buffer."""
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _grow(self, size: int) -> bool:
+        """Read up to ``size`` more characters of the value being decoded."""
+        pending = len(self._buf) - self._pos
+        if pending >= self._max_value:
+            raise ValueError(
+                f"JSON value in {self._file.name} is longer than "
+                f"{self._max_value} characters"
+            )
+        return self._fill(min(size, self._max_value - pending))
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} in {self._file.name}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value.
+
+        Each retry decodes again from the start of the value, so the read
+        size doubles per retry to keep a value spanning many chunks linear.
+        """
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._grow(size):
+                    raise
+                size *= 2
+                continue
+            # A number ending at the buffer edge may continue in the next chunk
+            if end == len(self._buf) and self._grow(size):
+                size *= 2
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the top-level object.
+
+        The caller must consume each member's value (with ``value`` or
+        ``items``) before asking for the next key.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() != ",":
+                self._expect("}")
+                return
+            self._pos += 1
+
+    def items(self) -> Iterator[Any]:
+        """Yield the elements of the array at the current position."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._peek() != ",":
+                self._expect("]")
+                return
+            self._pos += 1
+
+
+def _stream_region(path: Path, chunk_size: int = _STREAM_CHUNK_SIZE) -> str:
+    """Find the region of a guide file without materializing its sections."""
+    with closing(_JsonStream(path, chunk_size)) as stream:
+        for key in stream.members():
+            if key == "region":
+                return str(stream.value()).strip()
+            if key == "sections":
+                for _ in stream.items():
+                    pass
+            else:
+                stream.value()
+    return ""
+
+
+def _stream_steps(
+    path: Path, chunk_size: int = _STREAM_CHUNK_SIZE
+) -> Iterator[LoadedStep]:
+    """Yield the steps of a guide file section by section with bounded memory."""
+    with closing(_JsonStream(path, chunk_size)) as stream:
+        for key in stream.members():
+            if key != "sections":
+                stream.value()
+                continue
+            for s_idx, section in enumerate(stream.items(), start=1):
+                yield from _section_steps(s_idx, section)
+
+
+def _load_json(raw: bytes) -> dict:
+    """Parse the raw bytes of a JSON file."""
+    return json.loads(raw.decode("utf-8"))
+
+
+def _content_hash(raw: bytes) -> str:
+    """Hash the raw bytes of a guide file for the import manifest."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _file_hash(path: Path) -> str:
+    """Hash a guide file chunk by chunk, matching ``_content_hash``."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_file(
+    path: Path,
+    known: Optional[tuple[int, float, str]],
+    force: bool,
+    stream_threshold: int = DEFAULT_STREAM_THRESHOLD,
+) -> ParsedFile:
+    """Read, hash and parse one guide file.
+
+    Runs in a worker process when ``jobs > 1``, so it never touches the
+    database and reports problems in the result instead of logging them.
+    ``known`` is the (size, mtime, content_hash) manifest entry, if any.
+    Files above ``stream_threshold`` bytes are only hashed here and come
+    back with status ``"stream"`` for the writer to read incrementally.
+    The ``loader.parse`` span is only recorded when ``jobs == 1``.
+    """
+    with span("loader.parse"):
+        return _read_and_parse(path, known, force, stream_threshold)
+
+
+def _read_and_parse(
+    path: Path,
+    known: Optional[tuple[int, float, str]],
+    force: bool,
+    stream_threshold: int,
+) -> ParsedFile:
+    try:
+        stat = path.stat()
+        size, mtime = stat.st_size, stat.st_mtime
+        if not force and known is not None and known[:2] == (size, mtime):
+            return ParsedFile(path, size, mtime, "unchanged")
+
+        if size > stream_threshold:
+            content_hash = _file_hash(path)
+            if not force and known is not None and known[2] == content_hash:
+                return ParsedFile(path, size, mtime, "touched", content_hash)
+            return ParsedFile(path, size, mtime, "stream", content_hash)
+
+        raw = path.read_bytes()
+        content_hash = _content_hash(raw)
+        if not force and known is not None and known[2] == content_hash:
+            return ParsedFile(path, size, mtime, "touched", content_hash)
+
+        payload = _load_json(raw)
+        region = str(payload.get("region", "")).strip()
+        if not region:
+            return ParsedFile(path, size, mtime, "no_region", content_hash)
+        steps = tuple(_iter_steps(payload))
+    except Exception as e:
+        return ParsedFile(path, 0, 0.0, "error", error=str(e))
+    return ParsedFile(path, size, mtime, "parsed", content_hash, region, steps)
+
+
+def _parse_in_pool(
+    pool: ProcessPoolExecutor, window: int, *iterables: Iterable
+) -> Iterator[ParsedFile]:
+    """Like ``pool.map(_parse_file, ...)`` with at most ``window`` files pending.
+
+    Results are yielded in input order; the next file is submitted as each
+    result is taken, so memory holds at most ``window`` parsed files.
+    """
+    pending: deque[Future[ParsedFile]] = deque()
+    for args in zip(*iterables):
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(_parse_file, *args))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _manifest_key(path: Path) -> str:
+    """Return the manifest key of a guide file: its resolved path."""
+    return str(path.resolve())
+
+
+def _relative_manifest_key(path: Path) -> str:
+    """Return the manifest key of a guide file relative to its data directory.
+
+    ``GUIDE_PATTERN`` only matches files directly inside the directory, so
+    this is the file name.
+    """
+    return path.name
+
+
+def _manifest_entry(
+    manifest: dict[str, ImportManifest], path: Path
+) -> Optional[ImportManifest]:
+    """Return the manifest entry of a file.
+
+    Entries keyed relative to the data directory, written by
+    ``relativize_manifest`` for the guide pack or before the manifest was
+    keyed by resolved path, are used until the file is recorded again.
+    """
+    return manifest.get(_manifest_key(path)) or manifest.get(
+        _relative_manifest_key(path)
+    )
+
+
+def relativize_manifest(session: Session, data_dir: Path | str) -> None:
+    """Re-key the import manifest relative to ``data_dir``.
+
+    Used for databases that are copied to other machines (the guide pack):
+    the next import there matches the entries against its own data
+    directory instead of the build paths. Entries outside ``data_dir`` are
+    dropped.
+    """
+    root = Path(data_dir).resolve()
+    for entry in session.exec(select(ImportManifest)).all():
+        path = Path(entry.path)
+        if path.is_absolute() and path.parent == root:
+            entry.path = _relative_manifest_key(path)
+            session.add(entry)
+        else:
+            session.delete(entry)
+    session.commit()
+
+
+def _record_manifest(
+    session: Session,
+    manifest: dict[str, ImportManifest],
+    parsed: ParsedFile,
+) -> None:
+    """Create or update the manifest entry for an imported file."""
+    key = _manifest_key(parsed.path)
+    entry = _manifest_entry(manifest, parsed.path)
+    if entry is None:
+        entry = ImportManifest(path=key, size=0, mtime=0.0, content_hash="")
+        manifest[key] = entry
+    elif entry.path != key:
+        # Re-key a legacy name-only entry
+        del manifest[entry.path]
+        entry.path = key
+        manifest[key] = entry
+    entry.size = parsed.size
+    entry.mtime = parsed.mtime
+    entry.content_hash = parsed.content_hash
+    session.add(entry)
 
 
 def _guide_key(region: str) -> str:
@@ -43,102 +428,587 @@ def _guide_key(region: str) -> str:
     return region.strip().lower()
 
 
+def _batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Split an iterable of rows into lists of at most ``size`` rows."""
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _upsert_guide(session: Session, key: str, title: str) -> int:
+    """Find or create the guide row for ``key`` and return its id.
+
+    A guide already in the key map under the same title is only re-tagged;
+    otherwise the row is loaded, created or renamed and flushed.
+    """
+    ref = guide_ref(session, key)
+    if ref is not None and ref.title == title:
+        tag_guide(session, ref.id, [f"region:{key}"])
+        return ref.id
+    guide = session.exec(select(Guide).where(Guide.key == key)).first()
+    if guide is None:
+        guide = Guide(key=key, title=title)
+        session.add(guide)
+    elif guide.title != title:
+        guide.title = title
+    session.flush()
+    tag_guide(session, guide.id, [f"region:{key}"])
+    return guide.id
+
+
+def step_hash(title: str, text: Optional[str]) -> int:
+    """Return the signed 64-bit content hash stored in ``GuideStep.content_hash``."""
+    digest = hashlib.blake2b(
+        f"{title}\x1f{text or ''}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class StoredStep(NamedTuple):
+    """Position and content hash of a step row already in the database."""
+
+    id: int
+    section_index: int
+    step_index: int
+    content_hash: Optional[int]
+
+
+@dataclass
+class StepChangeset:
+    """Row changes that turn a guide's stored steps into a file's steps."""
+
+    guide_key: str
+    inserts: list[LoadedStep] = field(default_factory=list)
+    # Same position, new title or text
+    updates: list[tuple[StoredStep, LoadedStep]] = field(default_factory=list)
+    # Same title and text, new position
+    moves: list[tuple[StoredStep, LoadedStep]] = field(default_factory=list)
+    deletes: list[StoredStep] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def size(self) -> int:
+        """Number of rows the changeset writes."""
+        return (
+            len(self.inserts) + len(self.updates) + len(self.moves) + len(self.deletes)
+        )
+
+    def format(self) -> str:
+        """Render the changeset as one summary line plus one line per change."""
+
+        def pos(section_index, step_index) -> str:
+            return f"{section_index:03d}.{step_index:03d}"
+
+        def clip(text) -> str:
+            text = " ".join(str(text or "").split())
+            return text if len(text) <= 60 else text[:59] + "…"
+
+        lines = [
+            f"{self.guide_key}: {len(self.inserts)} inserted, "
+            f"{len(self.updates)} updated, {len(self.moves)} moved, "
+            f"{len(self.deletes)} deleted, {self.unchanged} unchanged"
+        ]
+        for step in self.inserts:
+            lines.append(
+                f"  + {pos(step.section_index, step.step_index)} {clip(step.text)}"
+            )
+        for row, step in self.updates:
+            lines.append(
+                f"  ~ {pos(step.section_index, step.step_index)} #{row.id} "
+                f"{clip(step.text)}"
+            )
+        for row, step in self.moves:
+            lines.append(
+                f"  > {pos(step.section_index, step.step_index)} #{row.id} "
+                f"(was {pos(row.section_index, row.step_index)})"
+            )
+        for row in self.deletes:
+            lines.append(f"  - {pos(row.section_index, row.step_index)} #{row.id}")
+        return "\n".join(lines)
+
+
+def _stored_steps(session: Session, guide_id: int) -> list[StoredStep]:
+    """Read the positions and hashes of a guide's steps, without their texts."""
+    step_table = GuideStep.__table__
+    rows = session.execute(
+        select(
+            step_table.c.id,
+            step_table.c.section_index,
+            step_table.c.step_index,
+            step_table.c.content_hash,
+        ).where(step_table.c.guide_id == guide_id)
+    )
+    return [StoredStep(*row) for row in rows]
+
+
+def diff_steps(
+    stored: Iterable[StoredStep], steps: Iterable[LoadedStep], guide_key: str = ""
+) -> StepChangeset:
+    """Compute the changes that make ``stored`` match ``steps``.
+
+    Linear in the number of steps: rows are matched by position and
+    content hash, then the remaining file steps reuse a free row with the
+    same hash (a move) or the free row at their position (an update), so
+    step ids survive edits and reordering. Rows nobody claims are deleted.
+    Only changed steps are kept in memory, so ``steps`` may be lazy.
+    """
+    changes = StepChangeset(guide_key)
+    by_position = {(row.section_index, row.step_index): row for row in stored}
+    claimed: set[int] = set()
+    pending: list[tuple[LoadedStep, int]] = []
+    for step in steps:
+        digest = step_hash(step.section_title, step.text)
+        row = by_position.get((step.section_index, step.step_index))
+        if row is not None and row.content_hash == digest:
+            claimed.add(row.id)
+            changes.unchanged += 1
+        else:
+            pending.append((step, digest))
+
+    # Free rows by hash, each list reversed so pop() takes the first row
+    free_by_hash: dict[Optional[int], list[StoredStep]] = {}
+    for row in reversed(list(by_position.values())):
+        if row.id not in claimed:
+            free_by_hash.setdefault(row.content_hash, []).append(row)
+
+    unmatched = []
+    for step, digest in pending:
+        candidates = free_by_hash.get(digest)
+        while candidates and candidates[-1].id in claimed:
+            candidates.pop()
+        if candidates:
+            row = candidates.pop()
+            claimed.add(row.id)
+            changes.moves.append((row, step))
+        else:
+            unmatched.append(step)
+    for step in unmatched:
+        row = by_position.get((step.section_index, step.step_index))
+        if row is not None and row.id not in claimed:
+            claimed.add(row.id)
+            changes.updates.append((row, step))
+        else:
+            changes.inserts.append(step)
+    changes.deletes = [row for row in by_position.values() if row.id not in claimed]
+    return changes
+
+
+def merge_steps(
+    stored: Iterable[StoredStep], steps: Iterable[LoadedStep], guide_key: str = ""
+) -> StepChangeset:
+    """Compute a merge: insert file steps at positions that are not stored."""
+    changes = StepChangeset(guide_key)
+    positions = {(row.section_index, row.step_index) for row in stored}
+    for step in steps:
+        if (step.section_index, step.step_index) in positions:
+            changes.unchanged += 1
+        else:
+            changes.inserts.append(step)
+    return changes
+
+
+def _step_rows(guide_id: int, steps: Iterable[LoadedStep]) -> Iterator[dict]:
+    for step in steps:
+        yield {
+            "guide_id": guide_id,
+            "section_index": step.section_index,
+            "step_index": step.step_index,
+            "title": step.section_title,
+            "details": None,
+            "text": step.text,
+            "content_hash": step_hash(step.section_title, step.text),
+        }
+
+
+def _insert_steps(
+    session: Session, guide_id: int, steps: Iterable[LoadedStep], batch_size: int
+) -> int:
+    """Insert steps with batched executemany calls; return the row count."""
+    stmt = insert(GuideStep.__table__)
+    inserted = 0
+    for batch in _batched(_step_rows(guide_id, steps), batch_size):
+        session.execute(stmt, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _apply_changeset(
+    session: Session, guide_id: int, changes: StepChangeset, batch_size: int
+) -> None:
+    """Write a changeset with one executemany statement per kind of change.
+
+    Deleted rows go first and moved rows are parked at ``step_index = -id``
+    before taking their new positions, so ux_guidestep_position never sees
+    two rows at one position.
+    """
+    step_table = GuideStep.__table__
+    by_id = step_table.c.id == bindparam("b_id")
+
+    if changes.deletes:
+        with span("loader.delete"):
+            for batch in _batched(
+                ({"b_id": r.id} for r in changes.deletes), batch_size
+            ):
+                session.execute(delete(step_table).where(by_id), batch)
+    with span("loader.update"):
+        if changes.moves:
+            params = [{"b_id": row.id} for row, _ in changes.moves]
+            session.execute(
+                update(step_table).where(by_id).values(step_index=-step_table.c.id),
+                params,
+            )
+            session.execute(
+                update(step_table)
+                .where(by_id)
+                .values(
+                    section_index=bindparam("b_section"),
+                    step_index=bindparam("b_step"),
+                ),
+                [
+                    {
+                        "b_id": row.id,
+                        "b_section": step.section_index,
+                        "b_step": step.step_index,
+                    }
+                    for row, step in changes.moves
+                ],
+            )
+        if changes.updates:
+            session.execute(
+                update(step_table)
+                .where(by_id)
+                .values(
+                    title=bindparam("b_title"),
+                    text=bindparam("b_text"),
+                    content_hash=bindparam("b_hash"),
+                ),
+                [
+                    {
+                        "b_id": row.id,
+                        "b_title": step.section_title,
+                        "b_text": step.text,
+                        "b_hash": step_hash(step.section_title, step.text),
+                    }
+                    for row, step in changes.updates
+                ],
+            )
+    if changes.inserts:
+        with span("loader.insert"):
+            _insert_steps(session, guide_id, changes.inserts, batch_size)
+
+
+def _refresh_sections(session: Session, guide_id: int) -> int:
+    """Rebuild a guide's GuideSection rows and their tags; return the count.
+
+    Runs as one DELETE plus one INSERT ... SELECT over the guide's range
+    of ux_guidestep_position, so merged and replaced steps are counted
+    the same way.
+    """
+    section_table = GuideSection.__table__
+    step_table = GuideStep.__table__
+    clear_section_tags(session, guide_id)
+    session.execute(delete(section_table).where(section_table.c.guide_id == guide_id))
+    summary = (
+        select(
+            step_table.c.guide_id,
+            step_table.c.section_index,
+            func.min(step_table.c.title),
+            func.count(),
+        )
+        .where(
+            step_table.c.guide_id == guide_id,
+            step_table.c.section_index.is_not(None),
+        )
+        .group_by(step_table.c.section_index)
+    )
+    count = session.execute(
+        insert(section_table).from_select(
+            ["guide_id", "section_index", "title", "step_count"], summary
+        )
+    ).rowcount
+    tag_sections(session, guide_id)
+    return count
+
+
+def _write_guide(
+    session: Session,
+    parsed: ParsedFile,
+    region: str,
+    steps: Iterable[LoadedStep],
+    mode: Literal["replace", "merge"],
+    batch_size: int,
+    manifest: dict[str, ImportManifest],
+    stats: ImportStats,
+    dry_run: bool = False,
+) -> None:
+    """Write one parsed guide file inside the run's transaction.
+
+    Replace imports apply ``diff_steps`` against the stored rows; merge
+    imports apply ``merge_steps``. A guide with no stored steps skips the
+    diff and ``steps``, which may be a lazy iterator, is consumed once in
+    batches. With ``dry_run`` nothing is written and the changeset is
+    appended to ``stats.changes``.
+    """
+    key, title = _guide_key(region), f"{region} Guide"
+    if dry_run:
+        ref = guide_ref(session, key)
+        guide_id = ref.id if ref is not None else None
+    else:
+        with span("loader.guide_upsert"):
+            guide_id = _upsert_guide(session, key, title)
+    stored = _stored_steps(session, guide_id) if guide_id is not None else []
+    started = time.perf_counter()
+
+    if stored or dry_run:
+        with span("loader.diff"):
+            diff = diff_steps if mode == "replace" else merge_steps
+            changes = diff(stored, steps, key)
+        if not dry_run and changes.size:
+            _apply_changeset(session, guide_id, changes, batch_size)
+        inserted = len(changes.inserts)
+    else:
+        changes = StepChangeset(key)
+        with span("loader.insert"):
+            inserted = _insert_steps(session, guide_id, steps, batch_size)
+    write_ms = (time.perf_counter() - started) * 1000
+
+    stats.files += 1
+    stats.inserted += inserted
+    stats.updated += len(changes.updates)
+    stats.moved += len(changes.moves)
+    stats.deleted += len(changes.deletes)
+    if mode == "merge":
+        stats.merged += changes.unchanged
+    if dry_run:
+        stats.changes.append(changes)
+        return
+
+    if stored and not changes.size:
+        _record_manifest(session, manifest, parsed)
+        if mode == "replace":
+            stats.unchanged += 1
+        log.info(
+            "Skipped %s: %d steps unchanged (diff took %.1fms)",
+            region,
+            changes.unchanged,
+            write_ms,
+        )
+        return
+
+    with span("loader.sections"):
+        _refresh_sections(session, guide_id)
+    _record_manifest(session, manifest, parsed)
+    stats.guides.append(key)
+    log.info(
+        "Imported %s: %d inserted, %d updated, %d moved, %d deleted, "
+        "%d unchanged in %.1fms (mode=%s)",
+        region,
+        inserted,
+        len(changes.updates),
+        len(changes.moves),
+        len(changes.deletes),
+        changes.unchanged,
+        write_ms,
+        mode,
+    )
+
+
+def _write_streamed_guide(
+    session: Session,
+    parsed: ParsedFile,
+    mode: Literal["replace", "merge"],
+    batch_size: int,
+    manifest: dict[str, ImportManifest],
+    stats: ImportStats,
+    dry_run: bool = False,
+) -> None:
+    """Write a large guide file while reading it incrementally.
+
+    Parse errors can surface after some batches were written, so the file
+    is written inside a savepoint and rolled back on its own on failure.
+    """
+    try:
+        region = _stream_region(parsed.path)
+        if not region:
+            log.warning("Skipping %s (no 'region')", parsed.path.name)
+            return
+        with session.begin_nested():
+            _write_guide(
+                session,
+                parsed,
+                region,
+                _stream_steps(parsed.path),
+                mode,
+                batch_size,
+                manifest,
+                stats,
+                dry_run,
+            )
+    except (ValueError, UnicodeDecodeError) as e:
+        # json.JSONDecodeError is a ValueError; database errors propagate
+        log.error("Failed to import guide from %s: %s", parsed.path, e)
+        # The guide row may have been created inside the rolled back savepoint
+        invalidate_guide_keys(session)
+
+
 def load_guides_from_dir(
     data_dir: Path | str,
     session: Session,
     mode: Literal["replace", "merge"] = "replace",
-) -> None:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    skip_unchanged: bool = False,
+    force: bool = False,
+    jobs: int = 1,
+    stream_threshold: int = DEFAULT_STREAM_THRESHOLD,
+    dry_run: bool = False,
+    files: Optional[Iterable[str | Path]] = None,
+) -> ImportStats:
     """Load all guide files from a directory into the database.
-    
+
+    Each file is diffed against the guide's stored steps by per-step
+    content hash and only the inserted, updated, moved and deleted rows
+    are written, with batched Core executemany calls, so step ids stay
+    stable across imports. The whole run is committed as a single
+    transaction. Files that fail to parse are logged and skipped; a
+    database error rolls back the run. A memory-mapped guide store in use
+    next to the database is regenerated after the commit, and the
+    in-memory guide key map (``guide_keys``) is dropped.
+
+    Each imported file is recorded in the import manifest (resolved path,
+    size, mtime and content hash). Files whose size and mtime, or failing that
+    whose content hash, match the manifest are skipped without parsing.
+
+    With ``jobs > 1`` files are read and parsed in a process pool while
+    this thread, the only writer, drains the results in file order; at
+    most two files per process are parsed ahead of it.
+    Files larger than ``stream_threshold`` bytes are never loaded whole:
+    the writer reads them section by section and inserts in batches, so
+    memory stays bounded by ``batch_size`` and the largest section.
+
     Args:
         data_dir: Directory containing guide_*.json files
         session: Database session
         mode: Whether to replace existing guides or merge with them
+        batch_size: Maximum number of step rows per executemany call
+        skip_unchanged: Kept for compatibility; replace imports always
+            leave guides whose steps match the file untouched
+        force: Import every file, ignoring the import manifest
+        jobs: Number of parser processes; 1 parses on the calling thread
+        stream_threshold: File size in bytes above which a file is read
+            incrementally instead of with ``json.loads``
+        dry_run: Compute each file's changeset into ``stats.changes``
+            without writing anything; nothing is committed
+        files: Only import the guide files of ``data_dir`` with these
+            names, e.g. the files a watcher saw change
+
+    Returns:
+        Counts and timing for the run.
     """
     data_dir = Path(data_dir)
-    
-    for path in sorted(data_dir.glob("guide_*.json")):
-        try:
-            payload = _load_json(path)
-            region = str(payload.get("region", "")).strip()
-            
-            if not region:
-                log.warning("Skipping %s (no 'region')", path.name)
-                continue
+    stats = ImportStats()
+    started = time.perf_counter()
+    manifest = {m.path: m for m in session.exec(select(ImportManifest)).all()}
 
-            key, title = _guide_key(region), f"{region} Guide"
+    paths = sorted(data_dir.glob(GUIDE_PATTERN))
+    if files is not None:
+        wanted = {Path(name).name for name in files}
+        paths = [p for p in paths if p.name in wanted]
+    known = [
+        (
+            (m.size, m.mtime, m.content_hash)
+            if (m := _manifest_entry(manifest, p))
+            else None
+        )
+        for p in paths
+    ]
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    args = (paths, known, repeat(force), repeat(stream_threshold))
+    if pool is not None:
+        parsed_files = _parse_in_pool(pool, jobs * _JOBS_IN_FLIGHT, *args)
+    else:
+        parsed_files = map(_parse_file, *args)
 
-            # Find or create guide
-            guide = session.exec(select(Guide).where(Guide.key == key)).first()
-            if guide is None:
-                guide = Guide(key=key, title=title, tags=[f"region:{key}"])
-                session.add(guide)
-                session.commit()
-                session.refresh(guide)
-            else:
-                # Update guide if needed
-                changed = False
-                if guide.title != title:
-                    guide.title = title
-                    changed = True
-                
-                tags = set(guide.tags or [])
-                if f"region:{key}" not in tags:
-                    guide.tags = sorted(tags | {f"region:{key}"})
-                    changed = True
-                
-                if changed:
-                    session.add(guide)
-                    session.commit()
-
-            # Handle existing steps based on mode
-            if mode == "replace":
-                for existing_step in session.exec(
-                    select(GuideStep).where(GuideStep.guide_id == guide.id)
-                ).all():
-                    session.delete(existing_step)
-                session.commit()
-
-            # Insert new steps
-            inserted = merged = 0
-            for step in _iter_steps(payload):
-                tags = [f"region:{key}", f"section:{step.section_index}"]
-                
-                if mode == "merge":
-                    # Check for duplicates
-                    duplicate = session.exec(
-                        select(GuideStep).where(
-                            GuideStep.guide_id == guide.id,
-                            GuideStep.section_index == step.section_index,
-                            GuideStep.step_index == step.step_index,
-                        )
-                    ).first()
-                    if duplicate:
-                        merged += 1
-                        continue
-
-                session.add(
-                    GuideStep(
-                        guide_id=guide.id,
-                        section_index=step.section_index,
-                        step_index=step.step_index,
-                        title=step.section_title,
-                        text=step.text,
-                        tags=tags,
+    try:
+        with import_pragmas(session):
+            for parsed in parsed_files:
+                if parsed.status == "error":
+                    log.error(
+                        "Failed to import guide from %s: %s", parsed.path, parsed.error
                     )
-                )
-                inserted += 1
+                elif parsed.status == "no_region":
+                    log.warning("Skipping %s (no 'region')", parsed.path.name)
+                elif parsed.status in ("unchanged", "touched"):
+                    if parsed.status == "touched" and not dry_run:
+                        # Same content with a new mtime; remember the mtime
+                        _record_manifest(session, manifest, parsed)
+                    stats.skipped += 1
+                else:
+                    try:
+                        if parsed.status == "stream":
+                            _write_streamed_guide(
+                                session,
+                                parsed,
+                                mode,
+                                batch_size,
+                                manifest,
+                                stats,
+                                dry_run,
+                            )
+                        else:
+                            _write_guide(
+                                session,
+                                parsed,
+                                parsed.region,
+                                parsed.steps,
+                                mode,
+                                batch_size,
+                                manifest,
+                                stats,
+                                dry_run,
+                            )
+                    except Exception as e:
+                        log.error("Failed to import guide from %s: %s", parsed.path, e)
+                        raise
+    except Exception:
+        # import_pragmas has restored the connection's pragmas by now
+        session.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        # Lookups during the run may have cached rows that are rolled back
+        invalidate_guide_keys(session)
 
+    if dry_run:
+        session.rollback()
+    else:
+        with span("loader.commit"):
             session.commit()
-            log.info(
-                "Imported %s: %d inserted, %d merged (mode=%s)",
-                region,
-                inserted,
-                merged,
-                mode,
-            )
-            
-        except Exception as e:
-            log.error("Failed to import guide from %s: %s", path, e)
-            session.rollback()
-            continue
+        invalidate_guide_keys(session)
+        if stats.files:
+            with span("loader.guide_store"):
+                try:
+                    refresh_for_session(session)
+                except OSError:
+                    log.exception("Failed to regenerate the guide store")
+    stats.elapsed = time.perf_counter() - started
+    log.info(
+        "%s %d files: %d inserted, %d updated, %d moved, %d deleted "
+        "(%d unchanged files skipped) in %.3fs",
+        "Diffed" if dry_run else "Imported",
+        stats.files,
+        stats.inserted,
+        stats.updated,
+        stats.moved,
+        stats.deleted,
+        stats.skipped,
+        stats.elapsed,
+    )
+    if dry_run:
+        return stats
+    for listener in list(_import_listeners):
+        try:
+            listener(stats)
+        except Exception:
+            log.exception("Import listener %r failed", listener)
+    return stats
@@ -0,0 +1,119 @@
+"""Prebuilt guide pack: a migrated, indexed SQLite snapshot of the guides.
+
+The build compiles ``data/guide_*.json`` into ``data/guide_pack.db``
+(``scripts/build_guide_pack.py``), which ships in the PyInstaller bundle
+with the rest of ``data/``. On first launch ``install_pack`` copies it
+into the new database with the SQLite backup API, so a fresh install
+shows guides without importing JSON or running migrations.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional, Union
+
+log = logging.getLogger(__name__)
+
+PACK_NAME = "guide_pack.db"
+# Next to the guide JSON, both in a checkout and in the bundle
+DEFAULT_PACK_PATH = Path(__file__).resolve().parents[3] / "data" / PACK_NAME
+# Pages copied per backup step
+_BACKUP_PAGES = 4096
+
+
+def _remove(path: Path) -> None:
+    for leftover in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        leftover.unlink(missing_ok=True)
+
+
+def compile_pack(data_dir: Union[str, Path], dest: Optional[Union[str, Path]] = None):
+    """Import every guide file into a new, compacted SQLite file at ``dest``.
+
+    The pack is built next to ``dest`` and renamed over it when complete,
+    in rollback-journal mode so it is a single self-contained file. Its
+    import manifest is keyed relative to ``data_dir``, so the first import
+    after ``install_pack`` skips the guide files the pack was built from.
+
+    Returns:
+        The ImportStats of the import.
+    """
+    from sqlmodel import Session
+
+    from pokemmo_companion.core.db import create_sqlite_engine, init_db
+    from pokemmo_companion.core.services.guide_loader import (
+        load_guides_from_dir,
+        relativize_manifest,
+    )
+
+    dest = Path(dest) if dest is not None else DEFAULT_PACK_PATH
+    tmp = dest.with_name(dest.name + ".tmp")
+    _remove(tmp)
+    engine = create_sqlite_engine(tmp)
+    try:
+        init_db(engine)
+        with Session(engine) as session:
+            stats = load_guides_from_dir(data_dir, session, force=True)
+            # Build paths mean nothing where the pack is installed
+            relativize_manifest(session, data_dir)
+        if not stats.files:
+            raise ValueError(f"No guide files imported from {data_dir}")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO guidestep_fts(guidestep_fts) VALUES ('optimize')"
+            )
+            conn.exec_driver_sql("ANALYZE")
+            conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+            conn.exec_driver_sql("VACUUM")
+    except BaseException:
+        engine.dispose()
+        _remove(tmp)
+        raise
+    engine.dispose()
+    os.replace(tmp, dest)
+    log.info(
+        "Compiled %d guides (%d steps) into %s (%.1f KiB)",
+        stats.files,
+        stats.inserted,
+        dest,
+        dest.stat().st_size / 1024,
+    )
+    return stats
+
+
+def install_pack(
+    db_path: Union[str, Path], pack_path: Optional[Union[str, Path]] = None
+) -> bool:
+    """Copy the guide pack into ``db_path`` if that database does not exist yet.
+
+    Uses the SQLite backup API into a temporary file that is renamed into
+    place, so an interrupted copy never leaves a half-written database.
+    Returns whether the pack was installed.
+    """
+    pack_path = Path(pack_path) if pack_path is not None else DEFAULT_PACK_PATH
+    db_path = Path(db_path)
+    if not pack_path.is_file():
+        return False
+    if db_path.exists() and db_path.stat().st_size > 0:
+        return False
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = db_path.with_name(db_path.name + ".pack-tmp")
+    _remove(tmp)
+    source = sqlite3.connect(f"{pack_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        target = sqlite3.connect(tmp)
+        try:
+            source.backup(target, pages=_BACKUP_PAGES)
+        finally:
+            target.close()
+    except BaseException:
+        _remove(tmp)
+        raise
+    finally:
+        source.close()
+    os.replace(tmp, db_path)
+    log.info("Installed guide pack %s into %s", pack_path, db_path)
+    return True
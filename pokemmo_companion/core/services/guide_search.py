@@ -0,0 +1,169 @@
+"""Full-text search over guide steps backed by the SQLite FTS5 index."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Literal, NamedTuple, Optional
+from sqlalchemy import text
+from sqlmodel import Session
+
+DEFAULT_PAGE_SIZE = 20
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# bm25 has to rank every match, but the cursor and LIMIT are applied to
+# (score, rowid) alone; highlight() and the joins only run for the page.
+# highlight() needs an FTS cursor positioned by MATCH, so "marked" scans the
+# match again within the page's rowid range and keeps the page rows; the
+# unary + stops SQLite from turning the IN list into one MATCH per hit.
+_SEARCH_SQL = text("""
+    WITH page AS MATERIALIZED (
+        SELECT step_id, score
+        FROM (
+            SELECT rowid AS step_id, bm25(guidestep_fts) AS score
+            FROM guidestep_fts
+            WHERE guidestep_fts MATCH :match
+        )
+        WHERE (score, step_id) > (:after_score, :after_id)
+        ORDER BY score, step_id
+        LIMIT :limit
+    ),
+    marked AS MATERIALIZED (
+        SELECT rowid AS step_id,
+               highlight(guidestep_fts, 1, :open, :close) AS snippet
+        FROM guidestep_fts
+        WHERE guidestep_fts MATCH :match
+          AND rowid BETWEEN (SELECT min(step_id) FROM page)
+                        AND (SELECT max(step_id) FROM page)
+          AND +rowid IN (SELECT step_id FROM page)
+    )
+    SELECT page.step_id, page.score, marked.snippet,
+           guide."key", guide.title,
+           guidestep.section_index, guidestep.title, guidestep.step_index
+    FROM page
+    JOIN marked ON marked.step_id = page.step_id
+    JOIN guidestep ON guidestep.id = page.step_id
+    JOIN guide ON guide.id = guidestep.guide_id
+    ORDER BY page.score, page.step_id
+    """)
+
+
+class SearchCursor(NamedTuple):
+    """Keyset position after the last hit of a page."""
+
+    operator: Literal["AND", "OR"]
+    score: float
+    step_id: int
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A guide step matching a search, with the match highlighted."""
+
+    step_id: int
+    score: float
+    snippet: str
+    guide_key: str
+    guide_title: str
+    section_index: Optional[int]
+    section_title: str
+    step_index: Optional[int]
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """One page of search hits and the cursor for the next page."""
+
+    hits: tuple[SearchHit, ...]
+    next_cursor: Optional[SearchCursor]
+
+
+def build_match_query(query: str, operator: Literal["AND", "OR"] = "AND") -> str:
+    """Turn free text into an FTS5 query.
+
+    Words are quoted so punctuation such as ``?`` cannot break the FTS5
+    syntax, and the last word is a prefix match for search-as-you-type.
+    """
+    words = _TOKEN.findall(query)
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return f" {operator} ".join(terms)
+
+
+def _search_page(
+    session: Session,
+    match: str,
+    operator: Literal["AND", "OR"],
+    limit: int,
+    after_score: float,
+    after_id: int,
+    highlight: tuple[str, str],
+) -> SearchPage:
+    rows = session.execute(
+        _SEARCH_SQL,
+        {
+            "match": match,
+            "open": highlight[0],
+            "close": highlight[1],
+            "after_score": after_score,
+            "after_id": after_id,
+            "limit": limit,
+        },
+    ).all()
+    hits = tuple(SearchHit(*row) for row in rows)
+    next_cursor = (
+        SearchCursor(operator, hits[-1].score, hits[-1].step_id)
+        if len(hits) == limit
+        else None
+    )
+    return SearchPage(hits, next_cursor)
+
+
+def search_steps(
+    session: Session,
+    query: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[SearchCursor] = None,
+    highlight: tuple[str, str] = ("[", "]"),
+) -> SearchPage:
+    """Search step titles and texts across all guides.
+
+    Steps matching every word are returned first; if there are none the
+    words are OR-ed instead, so a question like "where do I get Surf?"
+    still finds the Surf steps. Hits are ordered by bm25 rank then step
+    id. Pass a page's ``next_cursor`` as ``after`` to get the following
+    page (keyset pagination).
+
+    Args:
+        session: Database session
+        query: Free-text search terms
+        limit: Maximum number of hits per page
+        after: Cursor returned as ``next_cursor`` by the previous page
+        highlight: Markers wrapped around matching terms in ``snippet``
+    """
+    if after is not None:
+        match = build_match_query(query, after.operator)
+        if not match:
+            return SearchPage((), None)
+        return _search_page(
+            session,
+            match,
+            after.operator,
+            limit,
+            after.score,
+            after.step_id,
+            highlight,
+        )
+
+    page = SearchPage((), None)
+    for operator in ("AND", "OR"):
+        match = build_match_query(query, operator)
+        if not match:
+            break
+        page = _search_page(
+            session, match, operator, limit, float("-inf"), 0, highlight
+        )
+        if page.hits or " AND " not in match:
+            break
+    return page
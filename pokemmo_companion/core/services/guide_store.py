@@ -0,0 +1,442 @@
+"""Memory-mapped, read-only guide store for the guides view.
+
+An alternative read backend to SQLite: one file next to the database
+(``<db>.guides``) holding an offset index per guide and section and all
+text contiguously in UTF-8. Pages are answered by binary search over
+fixed-size records and step texts come back as ``memoryview`` slices of
+the mapping, so nothing is copied until a row is displayed.
+
+File layout (little-endian)::
+
+    header    magic, version, guide count, import token, table offsets
+    guides    (key offset, key length, first section, section count)
+              sorted by key
+    sections  (section index, title offset, title length, first step,
+              step count) sorted by guide, then section index
+    steps     (step index, text offset, text length) sorted by guide,
+              section index, then step index
+    text      keys, titles and step texts
+
+The guide loader regenerates the file after every import when the mmap
+backend is selected (``refresh_for_session``). Imports made elsewhere,
+e.g. by ``scripts/import_guides.py --watch`` in another process, are
+caught through the header's import token: ``open_store`` and, at most
+once every ``check_interval`` seconds, ``GuideStore`` reads compare it
+with the database's and rewrite a stale file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Union
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from pokemmo_companion.core.models import Guide, GuideSection, GuideStep, ImportManifest
+
+log = logging.getLogger(__name__)
+
+GUIDE_STORE_ENV = "POKEMMO_GUIDE_STORE"
+BACKENDS = ("sqlite", "mmap")
+STORE_SUFFIX = ".guides"
+DEFAULT_PAGE_SIZE = 500
+# Seconds between two import token checks of a GuideStore
+DEFAULT_CHECK_INTERVAL = 1.0
+
+_MAGIC = b"PMGS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI16sQQQQ")
+_GUIDE = struct.Struct("<QIII")
+_SECTION = struct.Struct("<IQIII")
+_STEP = struct.Struct("<IQI")
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Return the read backend: argument, then ``$POKEMMO_GUIDE_STORE``, then sqlite."""
+    name = (name or os.environ.get(GUIDE_STORE_ENV) or "sqlite").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown guide store backend {name!r}; expected {BACKENDS}")
+    return name
+
+
+def store_path(db_path: Union[str, Path]) -> Path:
+    """Return the store file that belongs to a database file."""
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + STORE_SUFFIX)
+
+
+def _next_path(path: Path) -> Path:
+    return path.with_name(path.name + ".next")
+
+
+def import_token(session: Session) -> bytes:
+    """Fingerprint the imported files recorded in the import manifest."""
+    digest = hashlib.blake2b(digest_size=16)
+    rows = session.exec(
+        select(ImportManifest.path, ImportManifest.content_hash).order_by(
+            ImportManifest.path
+        )
+    )
+    for name, content_hash in rows:
+        digest.update(f"{name}\x1f{content_hash}\x1e".encode("utf-8"))
+    return digest.digest()
+
+
+def write_store(session: Session, path: Union[str, Path]) -> Path:
+    """Write every guide into a new store file at ``path``.
+
+    The file is written next to ``path`` and renamed over it. If a viewer
+    still maps the old file and the platform refuses the rename (Windows),
+    the new file is left at ``<path>.next`` for ``GuideStore`` to pick up.
+    """
+    path = Path(path)
+    guides, sections, steps = bytearray(), bytearray(), bytearray()
+    text = bytearray()
+
+    def put(value: Optional[str]) -> tuple[int, int]:
+        data = (value or "").encode("utf-8")
+        offset = len(text)
+        text.extend(data)
+        return offset, len(data)
+
+    guide_rows = session.exec(select(Guide.id, Guide.key).order_by(Guide.key)).all()
+    section_count = step_count = 0
+    for guide_id, key in guide_rows:
+        key_off, key_len = put(key)
+        first_section = section_count
+        section_rows = session.exec(
+            select(GuideSection.section_index, GuideSection.title)
+            .where(GuideSection.guide_id == guide_id)
+            .order_by(GuideSection.section_index)
+        ).all()
+        step_rows = iter(
+            session.exec(
+                select(
+                    GuideStep.section_index,
+                    GuideStep.step_index,
+                    func.coalesce(GuideStep.text, GuideStep.details, ""),
+                )
+                .where(
+                    GuideStep.guide_id == guide_id,
+                    GuideStep.section_index.is_not(None),
+                    GuideStep.step_index.is_not(None),
+                )
+                .order_by(GuideStep.section_index, GuideStep.step_index)
+            ).all()
+        )
+        pending = next(step_rows, None)
+        for section_index, title in section_rows:
+            title_off, title_len = put(title)
+            first_step = step_count
+            while pending is not None and pending[0] <= section_index:
+                if pending[0] == section_index:
+                    text_off, text_len = put(pending[2])
+                    steps.extend(_STEP.pack(pending[1], text_off, text_len))
+                    step_count += 1
+                pending = next(step_rows, None)
+            sections.extend(
+                _SECTION.pack(
+                    section_index,
+                    title_off,
+                    title_len,
+                    first_step,
+                    step_count - first_step,
+                )
+            )
+            section_count += 1
+        guides.extend(
+            _GUIDE.pack(key_off, key_len, first_section, section_count - first_section)
+        )
+
+    guides_off = _HEADER.size
+    sections_off = guides_off + len(guides)
+    steps_off = sections_off + len(sections)
+    text_off = steps_off + len(steps)
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        0,
+        len(guide_rows),
+        import_token(session),
+        guides_off,
+        sections_off,
+        steps_off,
+        text_off,
+    )
+
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        for part in (header, guides, sections, steps, text):
+            f.write(part)
+    try:
+        os.replace(tmp, path)
+    except PermissionError:
+        os.replace(tmp, _next_path(path))
+        log.warning("Guide store %s is in use; new version left as .next", path)
+        return _next_path(path)
+    log.info(
+        "Wrote guide store %s: %d guides, %d sections, %d steps (%.1f KiB)",
+        path,
+        len(guide_rows),
+        section_count,
+        step_count,
+        (text_off + len(text)) / 1024,
+    )
+    return path
+
+
+def _session_store_path(session: Session) -> Optional[Path]:
+    database = session.get_bind().url.database
+    if not database or database == ":memory:":
+        return None
+    return store_path(database)
+
+
+def refresh_for_session(session: Session) -> Optional[Path]:
+    """Regenerate the store of the session's database when mmap is selected.
+
+    Called by the guide loader after each committed import. Without
+    ``$POKEMMO_GUIDE_STORE=mmap`` nothing is written; a store opened
+    elsewhere notices the import by its token and rewrites itself.
+    """
+    path = _session_store_path(session)
+    if path is None or resolve_backend() != "mmap":
+        return None
+    return write_store(session, path)
+
+
+def _read_token(path: Path) -> Optional[bytes]:
+    """Return the import token of a store file, or None if it is not one."""
+    with path.open("rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, _, _, token, *_ = _HEADER.unpack(header)
+    return token if (magic, version) == (_MAGIC, _VERSION) else None
+
+
+class _Mapping(NamedTuple):
+    mm: mmap.mmap
+    view: memoryview
+    token: bytes
+    keys: dict[str, tuple[int, int]]
+    sections_off: int
+    steps_off: int
+    text_off: int
+
+
+def _map(path: Path) -> _Mapping:
+    with path.open("rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (
+        magic,
+        version,
+        _reserved,
+        guide_count,
+        token,
+        guides_off,
+        sections_off,
+        steps_off,
+        text_off,
+    ) = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC or version != _VERSION:
+        mm.close()
+        raise ValueError(f"{path} is not a version {_VERSION} guide store")
+    view = memoryview(mm)
+    keys = {}
+    for i in range(guide_count):
+        key_off, key_len, first, count = _GUIDE.unpack_from(
+            mm, guides_off + i * _GUIDE.size
+        )
+        start = text_off + key_off
+        keys[str(view[start : start + key_len], "utf-8")] = (first, count)
+    return _Mapping(mm, view, token, keys, sections_off, steps_off, text_off)
+
+
+class GuideStore:
+    """Read-only view of a store file, safe to share between threads.
+
+    Page methods mirror ``guide_cache.query_sections_page`` and
+    ``query_steps_page`` but return ``memoryview`` slices of the mapping
+    instead of strings; decode with ``str(text, "utf-8")``. ``reopen``
+    maps the latest file after an import; slices handed out earlier keep
+    the previous mapping alive until they are dropped.
+
+    With a ``session_factory``, reads compare the mapped file's import
+    token with the database's at most once every ``check_interval``
+    seconds and, after an import the file has not caught up with, map a
+    newer file or rewrite it, so imports by other processes show up too.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        session_factory: Optional[Callable[[], Session]] = None,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # Held by the one thread checking or rewriting the file
+        self._refresh_lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._mapping = _map(self._latest())
+
+    def _latest(self) -> Path:
+        """Promote a pending ``.next`` file if possible and return what to map."""
+        pending = _next_path(self.path)
+        if pending.exists():
+            try:
+                os.replace(pending, self.path)
+            except PermissionError:
+                return pending
+        return self.path
+
+    def reopen(self) -> None:
+        """Map the current file, e.g. after the loader regenerated it.
+
+        With a ``session_factory`` the file is rewritten first if it is
+        older than the last import.
+        """
+        with self._lock:
+            self._mapping = _map(self._latest())
+        self._check_token(force=True)
+
+    def _check_token(self, force: bool = False) -> None:
+        """Map an up-to-date file if the database saw an import since the check."""
+        if self.session_factory is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return
+        # Other threads keep reading the current mapping meanwhile
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = now
+            with self.session_factory() as s:
+                token = import_token(s)
+                if token == self._mapping.token:
+                    return
+                latest = self._latest()
+                if _read_token(latest) != token:
+                    latest = write_store(s, self.path)
+            mapping = _map(latest)
+            with self._lock:
+                self._mapping = mapping
+        finally:
+            self._refresh_lock.release()
+
+    @property
+    def token(self) -> bytes:
+        """Import token the file was written with."""
+        return self._mapping.token
+
+    def region_keys(self) -> list[str]:
+        """Return the keys of all guides in order."""
+        self._check_token()
+        return list(self._mapping.keys)
+
+    @staticmethod
+    def _bisect(
+        m: _Mapping, record: struct.Struct, base: int, lo: int, hi: int, key: int
+    ) -> int:
+        """First record in [lo, hi) whose leading field is greater than ``key``."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if record.unpack_from(m.mm, base + mid * record.size)[0] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def sections_page(
+        self,
+        guide_key: str,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> list[tuple[int, memoryview]]:
+        """Return up to ``limit`` (section_index, title) pairs after ``after``."""
+        self._check_token()
+        m = self._mapping
+        first, count = m.keys.get(guide_key, (0, 0))
+        start = first
+        if after is not None:
+            start = self._bisect(
+                m, _SECTION, m.sections_off, first, first + count, after
+            )
+        page = []
+        for i in range(start, min(first + count, start + limit)):
+            index, off, length, _, _ = _SECTION.unpack_from(
+                m.mm, m.sections_off + i * _SECTION.size
+            )
+            page.append((index, m.view[m.text_off + off : m.text_off + off + length]))
+        return page
+
+    def steps_page(
+        self,
+        guide_key: str,
+        section_index: int,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> list[tuple[int, memoryview]]:
+        """Return up to ``limit`` (step_index, text) pairs of one section."""
+        self._check_token()
+        m = self._mapping
+        first, count = m.keys.get(guide_key, (0, 0))
+        pos = (
+            self._bisect(
+                m, _SECTION, m.sections_off, first, first + count, section_index
+            )
+            - 1
+        )
+        if pos < first:
+            return []
+        index, _, _, first_step, step_count = _SECTION.unpack_from(
+            m.mm, m.sections_off + pos * _SECTION.size
+        )
+        if index != section_index:
+            return []
+        end = first_step + step_count
+        start = first_step
+        if after is not None:
+            start = self._bisect(m, _STEP, m.steps_off, first_step, end, after)
+        page = []
+        for i in range(start, min(end, start + limit)):
+            step_index, off, length = _STEP.unpack_from(
+                m.mm, m.steps_off + i * _STEP.size
+            )
+            page.append(
+                (step_index, m.view[m.text_off + off : m.text_off + off + length])
+            )
+        return page
+
+
+def open_store(session: Session, path: Union[str, Path, None] = None) -> GuideStore:
+    """Open the store of the session's database, (re)writing it if stale.
+
+    A store is stale when it is missing or its import token differs from
+    the database's, e.g. after an import made while it was not in use.
+    The returned store keeps checking the token with new sessions on the
+    session's engine.
+    """
+    path = Path(path) if path is not None else _session_store_path(session)
+    if path is None:
+        raise ValueError("The guide store needs a file-backed database")
+    for candidate in (_next_path(path), path):
+        if candidate.exists():
+            if _read_token(candidate) != import_token(session):
+                write_store(session, path)
+            break
+    else:
+        write_store(session, path)
+    return GuideStore(path, partial(Session, session.get_bind()))
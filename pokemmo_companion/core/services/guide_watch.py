@@ -0,0 +1,84 @@
+"""Watch a guide directory and re-import the files that change.
+
+``snapshot`` and ``changed_files`` find edited guide files by size and
+modification time; both the app's ``QFileSystemWatcher`` front end
+(``ui.guide_watcher``) and the polling loop here (``watch``, used by
+``scripts/import_guides.py --watch``) build on them. Bursts of changes,
+such as an editor writing a file in several steps, are debounced into a
+single import of just the changed files.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from pokemmo_companion.core.services.guide_loader import GUIDE_PATTERN
+
+log = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 0.5
+# Quiet time after the last change before importing
+DEFAULT_DEBOUNCE = 0.3
+
+# File name -> (size, mtime_ns)
+Snapshot = dict[str, tuple[int, int]]
+
+
+def snapshot(data_dir: Union[str, Path]) -> Snapshot:
+    """Return the size and mtime of every guide file in ``data_dir``."""
+    files = {}
+    for path in Path(data_dir).glob(GUIDE_PATTERN):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            # Removed between listing and stat, e.g. an editor's swap file
+            continue
+        files[path.name] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def changed_files(before: Snapshot, after: Snapshot) -> list[str]:
+    """Return the names of files added or modified between two snapshots.
+
+    Removed files are not reported: the loader keeps the guides of files
+    that are gone.
+    """
+    return sorted(name for name, sig in after.items() if before.get(name) != sig)
+
+
+def watch(
+    data_dir: Union[str, Path],
+    on_change: Callable[[list[str]], None],
+    interval: float = DEFAULT_POLL_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Poll ``data_dir`` and call ``on_change`` with the changed file names.
+
+    Files are compared against the state when the loop started, so only
+    edits made after that are reported. A burst of changes is reported
+    once, ``debounce`` seconds after the last one. Runs until ``stop`` is
+    set (or forever).
+    """
+    stop = stop or threading.Event()
+    seen = snapshot(data_dir)
+    pending: set[str] = set()
+    last_change = 0.0
+    while not stop.wait(interval if not pending else min(interval, debounce)):
+        current = snapshot(data_dir)
+        changed = changed_files(seen, current)
+        seen = current
+        if changed:
+            pending.update(changed)
+            last_change = time.monotonic()
+            continue
+        if pending and time.monotonic() - last_change >= debounce:
+            names, pending = sorted(pending), set()
+            try:
+                on_change(names)
+            except Exception:
+                log.exception("Re-importing %s failed", ", ".join(names))
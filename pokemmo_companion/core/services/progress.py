@@ -0,0 +1,155 @@
+"""Write-behind store for the user's guide progress."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from pokemmo_companion.core.models import SectionProgress
+
+log = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+SectionKey = tuple[str, int]
+
+
+class ProgressStore:
+    """Section progress kept in memory and flushed to SQLite in batches.
+
+    ``set_done`` only updates memory; repeated toggles of the same section
+    between flushes coalesce into one row write. A background thread
+    flushes pending changes every ``flush_interval`` seconds in a single
+    transaction, and ``close`` flushes whatever is left. Reads are served
+    from memory, loading a guide's stored progress on first use.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._done: dict[SectionKey, bool] = {}
+        self._loaded: set[str] = set()
+        self._pending: dict[SectionKey, tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="progress-flush", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread and flush pending changes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Failed to flush progress")
+
+    def _ensure_loaded(self, guide_key: str) -> None:
+        with self._lock:
+            if guide_key in self._loaded:
+                return
+        with self.session_factory() as s:
+            rows = s.exec(
+                select(SectionProgress.section_index, SectionProgress.done).where(
+                    SectionProgress.guide_key == guide_key
+                )
+            ).all()
+        with self._lock:
+            if guide_key in self._loaded:
+                return
+            for section_index, done in rows:
+                # Changes made while loading win over the stored state
+                self._done.setdefault((guide_key, section_index), done)
+            self._loaded.add(guide_key)
+
+    def is_loaded(self, guide_key: str) -> bool:
+        """Whether reads for a guide are served from memory already."""
+        with self._lock:
+            return guide_key in self._loaded
+
+    def is_done(self, guide_key: str, section_index: int) -> bool:
+        """Return whether a section is marked as done."""
+        self._ensure_loaded(guide_key)
+        with self._lock:
+            return self._done.get((guide_key, section_index), False)
+
+    def done_sections(self, guide_key: str) -> set[int]:
+        """Return the indexes of a guide's completed sections."""
+        self._ensure_loaded(guide_key)
+        with self._lock:
+            return {
+                idx
+                for (key, idx), done in self._done.items()
+                if key == guide_key and done
+            }
+
+    def set_done(self, guide_key: str, section_index: int, done: bool) -> None:
+        """Mark a section as done or not done; persisted on the next flush."""
+        with self._lock:
+            self._done[(guide_key, section_index)] = done
+            self._pending[(guide_key, section_index)] = (done, time.time())
+
+    @property
+    def pending(self) -> int:
+        """Number of sections changed since the last flush."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write pending changes in one transaction; return rows written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            rows = [
+                {
+                    "guide_key": key,
+                    "section_index": idx,
+                    "done": done,
+                    "updated_at": updated_at,
+                }
+                for (key, idx), (done, updated_at) in pending.items()
+            ]
+            stmt = sqlite_insert(SectionProgress.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["guide_key", "section_index"],
+                set_={
+                    "done": stmt.excluded.done,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            try:
+                with self.session_factory() as s:
+                    s.execute(stmt, rows)
+                    s.commit()
+            except Exception:
+                # Put the changes back unless newer ones replaced them
+                with self._lock:
+                    for position, change in pending.items():
+                        self._pending.setdefault(position, change)
+                raise
+            return len(rows)
@@ -0,0 +1,183 @@
+"""Interned tag store and tag queries over guides, sections and steps.
+
+Tag names are stored once in the ``tag`` table. Guides and sections link
+to them through ``guidetag`` and ``sectiontag``; a step carries the tags
+of its guide and of its section. The loader tags every guide with
+``region:<key>`` and every section with ``section:<index>``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+from sqlalchemy import String, and_, cast, delete, insert, literal, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from pokemmo_companion.core.models import (
+    Guide,
+    GuideSection,
+    GuideStep,
+    GuideTag,
+    SectionTag,
+    Tag,
+)
+
+
+def intern_tags(session: Session, names: Iterable[str]) -> dict[str, int]:
+    """Return tag ids by name, creating the missing tags."""
+    names = sorted(set(names))
+    if not names:
+        return {}
+    session.execute(
+        sqlite_insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"]),
+        [{"name": name} for name in names],
+    )
+    rows = session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+    return dict(rows.all())
+
+
+def tag_guide(session: Session, guide_id: int, names: Iterable[str]) -> None:
+    """Attach tags to a guide; existing links are kept."""
+    ids = intern_tags(session, names)
+    if ids:
+        session.execute(
+            sqlite_insert(GuideTag.__table__).on_conflict_do_nothing(),
+            [{"tag_id": tag_id, "guide_id": guide_id} for tag_id in ids.values()],
+        )
+
+
+def _section_label():
+    return literal("section:") + cast(GuideSection.section_index, String)
+
+
+def clear_section_tags(session: Session, guide_id: int) -> None:
+    """Remove the tag links of every section of a guide."""
+    session.execute(
+        delete(SectionTag).where(
+            SectionTag.section_id.in_(
+                select(GuideSection.id).where(GuideSection.guide_id == guide_id)
+            )
+        )
+    )
+
+
+def tag_sections(session: Session, guide_id: int) -> None:
+    """Tag each GuideSection row of a guide with ``section:<index>``.
+
+    Set-based: one INSERT OR IGNORE for the tag names and one
+    INSERT ... SELECT for the links, whatever the number of sections.
+    """
+    label = _section_label()
+    session.execute(
+        insert(Tag.__table__)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["name"],
+            select(label).where(GuideSection.guide_id == guide_id).distinct(),
+        )
+    )
+    session.execute(
+        insert(SectionTag.__table__)
+        .prefix_with("OR IGNORE")
+        .from_select(
+            ["tag_id", "section_id"],
+            select(Tag.id, GuideSection.id)
+            .join(Tag, Tag.name == label)
+            .where(GuideSection.guide_id == guide_id),
+        )
+    )
+
+
+def guides_with_tag(session: Session, name: str) -> list[Guide]:
+    """Return the guides linked to a tag."""
+    return list(
+        session.exec(
+            select(Guide)
+            .join(GuideTag, GuideTag.guide_id == Guide.id)
+            .join(Tag, Tag.id == GuideTag.tag_id)
+            .where(Tag.name == name)
+            .order_by(Guide.key)
+        ).all()
+    )
+
+
+def sections_with_tag(session: Session, name: str) -> list[tuple[str, int, str]]:
+    """Return (guide_key, section_index, title) of the sections linked to a tag."""
+    rows = session.exec(
+        select(Guide.key, GuideSection.section_index, GuideSection.title)
+        .join(SectionTag, SectionTag.section_id == GuideSection.id)
+        .join(Tag, Tag.id == SectionTag.tag_id)
+        .join(Guide, Guide.id == GuideSection.guide_id)
+        .where(Tag.name == name)
+        .order_by(Guide.key, GuideSection.section_index)
+    ).all()
+    return [(key, idx, title) for key, idx, title in rows]
+
+
+def steps_with_tag(
+    session: Session, name: str, limit: Optional[int] = None
+) -> list[GuideStep]:
+    """Return every step carrying a tag, directly or through its section.
+
+    E.g. ``steps_with_tag(s, "section:3")`` returns the third section of
+    every region. Each branch starts from the unique tag name and walks
+    primary keys and ux_guidestep_position, so no table is scanned.
+    """
+    from_sections = (
+        select(GuideStep.id)
+        .join(
+            GuideSection,
+            and_(
+                GuideSection.guide_id == GuideStep.guide_id,
+                GuideSection.section_index == GuideStep.section_index,
+            ),
+        )
+        .join(SectionTag, SectionTag.section_id == GuideSection.id)
+        .join(Tag, Tag.id == SectionTag.tag_id)
+        .where(Tag.name == name)
+    )
+    from_guides = (
+        select(GuideStep.id)
+        .join(GuideTag, GuideTag.guide_id == GuideStep.guide_id)
+        .join(Tag, Tag.id == GuideTag.tag_id)
+        .where(Tag.name == name)
+    )
+    stmt = (
+        select(GuideStep)
+        .where(GuideStep.id.in_(union(from_sections, from_guides)))
+        .order_by(GuideStep.guide_id, GuideStep.section_index, GuideStep.step_index)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(session.exec(stmt).all())
+
+
+def tags_of_guide(session: Session, guide_id: int) -> list[str]:
+    """Return the sorted tag names linked to a guide."""
+    return list(
+        session.exec(
+            select(Tag.name)
+            .join(GuideTag, GuideTag.tag_id == Tag.id)
+            .where(GuideTag.guide_id == guide_id)
+            .order_by(Tag.name)
+        ).all()
+    )
+
+
+def tags_of_step(session: Session, step: GuideStep) -> list[str]:
+    """Return the sorted tag names a step inherits from its guide and section."""
+    guide_tags = (
+        select(Tag.name)
+        .join(GuideTag, GuideTag.tag_id == Tag.id)
+        .where(GuideTag.guide_id == step.guide_id)
+    )
+    section_tags = (
+        select(Tag.name)
+        .join(SectionTag, SectionTag.tag_id == Tag.id)
+        .join(GuideSection, GuideSection.id == SectionTag.section_id)
+        .where(
+            GuideSection.guide_id == step.guide_id,
+            GuideSection.section_index == step.section_index,
+        )
+    )
+    return sorted(session.exec(union(guide_tags, section_tags)).scalars().all())
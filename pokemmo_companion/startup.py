@@ -0,0 +1,93 @@
+"""Startup timing for the companion app (``--startup-profile``)."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Time from interpreter start of app.py to the first paint of MainWindow we
+# aim for with the PyInstaller onefile build on a typical desktop. The
+# onefile bootloader's unpacking happens before Python starts and is not
+# included.
+FIRST_PAINT_TARGET_MS = 1000.0
+
+
+class StartupProfile:
+    """Collects import and phase timings measured from ``t0``.
+
+    A disabled profile records nothing, so the normal startup path pays
+    no extra cost.
+    """
+
+    def __init__(self, t0: float, enabled: bool = False):
+        self.t0 = t0
+        self.enabled = enabled
+        self.imports: list[tuple[str, float]] = []
+        self.phases: list[tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def importing(self, name: str) -> Iterator[None]:
+        """Time the import statements in the block under ``name``.
+
+        Imports stay plain statements so PyInstaller still finds them.
+        Modules already in ``sys.modules`` are not recorded.
+        """
+        if not self.enabled or name in sys.modules:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        with self._lock:
+            self.imports.append((name, (time.perf_counter() - start) * 1000))
+
+    def mark(self, phase: str) -> None:
+        """Record that ``phase`` completed now."""
+        if self.enabled:
+            with self._lock:
+                self.phases.append((phase, (time.perf_counter() - self.t0) * 1000))
+
+    def phase_ms(self, phase: str) -> Optional[float]:
+        """Return the time since ``t0`` at which ``phase`` completed."""
+        with self._lock:
+            return next((ms for name, ms in self.phases if name == phase), None)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "imports_ms": dict(self.imports),
+                "phases_ms": dict(self.phases),
+                "first_paint_target_ms": FIRST_PAINT_TARGET_MS,
+            }
+
+    def report(self, dest: str = "-") -> None:
+        """Print the breakdown, or write it as JSON when ``dest`` is a path."""
+        if not self.enabled:
+            return
+        if dest != "-":
+            with open(dest, "w", encoding="utf-8") as f:
+                json.dump(self.as_dict(), f, indent=2)
+            return
+        out = sys.stderr or sys.stdout
+        if out is None:  # windowed build without a console
+            return
+        data = self.as_dict()
+        print("Startup profile (ms)", file=out)
+        print("  imports:", file=out)
+        for name, ms in data["imports_ms"].items():
+            print(f"    {name:<40} {ms:8.1f}", file=out)
+        print("  phases (since start):", file=out)
+        for name, ms in data["phases_ms"].items():
+            print(f"    {name:<40} {ms:8.1f}", file=out)
+        first_paint = data["phases_ms"].get("first_paint")
+        if first_paint is not None:
+            status = "ok" if first_paint <= FIRST_PAINT_TARGET_MS else "SLOW"
+            print(
+                f"  first paint {first_paint:.1f} / target "
+                f"{FIRST_PAINT_TARGET_MS:.0f} ({status})",
+                file=out,
+            )
@@ -0,0 +1,60 @@
+"""Debug panel showing SQL counters and span timings."""
+
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import (
+    QFileDialog,
+    QHBoxLayout,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+from pokemmo_companion.core import instrumentation
+
+
+class DebugPanel(QWidget):
+    """Text view of ``instrumentation.snapshot()`` with reset and JSON export."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Instrumentation")
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.refresh_btn = QPushButton("Refresh")
+        self.reset_btn = QPushButton("Reset")
+        self.save_btn = QPushButton("Save JSON…")
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.refresh_btn)
+        buttons.addWidget(self.reset_btn)
+        buttons.addStretch()
+        buttons.addWidget(self.save_btn)
+        root = QVBoxLayout(self)
+        root.addWidget(self.text)
+        root.addLayout(buttons)
+
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.reset_btn.clicked.connect(self._on_reset)
+        self.save_btn.clicked.connect(self._on_save)
+        self.refresh()
+
+    def refresh(self):
+        """Show the current counters."""
+        self.text.setPlainText(instrumentation.snapshot().format())
+
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
+
+    def _on_reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def _on_save(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save instrumentation", "instrumentation.json", "JSON (*.json)"
+        )
+        if path:
+            instrumentation.dump_json(path)
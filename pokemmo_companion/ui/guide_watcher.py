@@ -0,0 +1,100 @@
+"""Re-import guide files edited while the app is running."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.guide_watch import (
+    changed_files,
+    snapshot,
+)
+from pokemmo_companion.ui.query_executor import QueryExecutor
+
+log = logging.getLogger(__name__)
+
+DEBOUNCE_MS = 300
+
+
+class GuideFileWatcher(QObject):
+    """Watch a guide directory and import files as they are saved.
+
+    ``QFileSystemWatcher`` signals only restart a single-shot debounce
+    timer; when it fires, the directory is compared with the previous
+    snapshot and the changed files are imported in the background through
+    ``load_guides_from_dir(files=...)``. The loader's import listeners
+    (``GuidesView``) then refresh the affected regions. Only one import
+    runs at a time; changes made during it are picked up afterwards.
+    """
+
+    # Emitted with the names of the files an import was started for
+    reimporting = Signal(list)
+
+    def __init__(
+        self,
+        data_dir: str | Path,
+        session_factory: Callable,
+        debounce_ms: int = DEBOUNCE_MS,
+        executor: Optional[QueryExecutor] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.data_dir = Path(data_dir)
+        self.session_factory = session_factory
+        self.executor = executor or QueryExecutor(parent=self)
+        self._seen = snapshot(self.data_dir)
+        self._importing = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._on_settled)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._timer.start)
+        self._watcher.fileChanged.connect(self._timer.start)
+        self._watcher.addPath(str(self.data_dir))
+        self._watch_files()
+
+    def _watch_files(self) -> None:
+        # Editors that save by renaming drop the file from the watcher
+        watched = set(self._watcher.files())
+        paths = [str(self.data_dir / name) for name in self._seen]
+        missing = [p for p in paths if p not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def import_all(self) -> None:
+        """Import whatever the manifest does not know yet, e.g. at startup."""
+        self._start_import(None)
+
+    def _on_settled(self) -> None:
+        if self._importing:
+            # Re-checked when the running import finishes
+            return
+        current = snapshot(self.data_dir)
+        names = changed_files(self._seen, current)
+        self._seen = current
+        self._watch_files()
+        if names:
+            self._start_import(names)
+
+    def _start_import(self, names: Optional[list[str]]) -> None:
+        self._importing = True
+        self.reimporting.emit(names or [])
+
+        def run():
+            with self.session_factory() as session:
+                return load_guides_from_dir(self.data_dir, session, files=names)
+
+        self.executor.submit("import", run, self._finished, self._failed)
+
+    def _finished(self, _stats) -> None:
+        self._importing = False
+        if changed_files(self._seen, snapshot(self.data_dir)):
+            self._timer.start()
+
+    def _failed(self, message: str) -> None:
+        log.error("Re-importing guides from %s failed: %s", self.data_dir, message)
+        self._finished(None)
@@ -2,43 +2,109 @@
 
 from __future__ import annotations
 
-from typing import List, Tuple
-from PySide6.QtCore import Qt, Slot
+from functools import partial
+from PySide6.QtCore import QModelIndex, QPoint, Qt, QTimer, Signal, Slot
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QWidget,
     QHBoxLayout,
     QVBoxLayout,
+    QLineEdit,
+    QListView,
     QListWidget,
     QListWidgetItem,
     QLabel,
     QPushButton,
     QCheckBox,
-    QTextEdit,
     QComboBox,
 )
-from sqlmodel import Session, select
+from pokemmo_companion.core.instrumentation import span, timed
+from pokemmo_companion.core.services.guide_cache import (
+    GuideCache,
+    query_region_keys,
+)
+from pokemmo_companion.core.services.guide_loader import (
+    ImportStats,
+    add_import_listener,
+    remove_import_listener,
+)
+from pokemmo_companion.core.services.guide_search import search_steps
+from pokemmo_companion.ui.list_models import SectionListModel, StepListModel
+from pokemmo_companion.ui.query_executor import QueryExecutor
 
-from pokemmo_companion.core.models import Guide, GuideStep
+SEARCH_PAGE_SIZE = 50
+SEARCH_DEBOUNCE_MS = 150
+STEP_LAYOUT_BATCH = 100
 
 
 class GuidesView(QWidget):
     """Main guides view widget with region selection and step navigation."""
 
-    def __init__(self, session_factory, parent=None):
+    # Re-emits import listener calls (made on the importing thread) on the
+    # GUI thread
+    guides_imported = Signal(object)
+
+    def __init__(self, session_factory, progress=None, store=None, parent=None):
         super().__init__(parent)
         self.session_factory = session_factory
+        self.progress = progress
+        # Optional GuideStore serving regions, sections and steps from a
+        # memory-mapped file; search always runs on SQLite
+        self.store = store
+        # Without a store, pages of recently shown guides are served from
+        # memory and only misses query SQLite
+        self.cache = cache = GuideCache(session_factory) if store is None else None
+        self.executor = QueryExecutor(parent=self)
+        # Region whose sections are in the section model
+        self._region: str | None = None
+        # Section to select once its page arrives, e.g. a search hit
+        self._pending_section: tuple[str, int] | None = None
+        # Keys of the top visible section and step to scroll back to after
+        # a re-import reloads the region
+        self._pending_scroll: tuple[int | None, int | None] | None = None
+        # Row Skip was clicked on while it was the last loaded one; the
+        # next section is selected when the following page arrives
+        self._pending_skip: int | None = None
+        self.sections = SectionListModel(self.executor, "sections", parent=self)
+        self.steps = StepListModel(self.executor, "steps", parent=self)
+        if cache is not None:
+            # Called on the importing thread, before the view reloads
+            add_import_listener(cache.on_import)
+            self.destroyed.connect(lambda: remove_import_listener(cache.on_import))
+        listener = self.guides_imported.emit
+        add_import_listener(listener)
+        self.destroyed.connect(lambda: remove_import_listener(listener))
 
         # UI Components
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search all guides")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_results = QListWidget()
+        self.search_results.hide()
+        self._search_cursor = None
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
         self.region_combo = QComboBox()
-        self.section_list = QListWidget()
-        self.step_text = QTextEdit()
-        self.step_text.setReadOnly(True)
+        self.section_list = QListView()
+        self.section_list.setUniformItemSizes(True)
+        self.section_list.setModel(self.sections)
+        # Only visible steps are laid out and painted
+        self.step_list = QListView()
+        self.step_list.setModel(self.steps)
+        self.step_list.setWordWrap(True)
+        self.step_list.setLayoutMode(QListView.Batched)
+        self.step_list.setBatchSize(STEP_LAYOUT_BATCH)
+        self.step_list.setSelectionMode(QListView.NoSelection)
+        self.step_list.setAlternatingRowColors(True)
         self.done_check = QCheckBox("Mark section step as done")
         self.skip_btn = QPushButton("Skip")
         self.top_most = QCheckBox("Always on top")
 
         # Layout setup
         left = QVBoxLayout()
+        left.addWidget(self.search_box)
+        left.addWidget(self.search_results)
         left.addWidget(QLabel("Region"))
         left.addWidget(self.region_combo)
         left.addWidget(QLabel("Sections"))
@@ -46,7 +112,7 @@ class GuidesView(QWidget):
 
         right = QVBoxLayout()
         right.addWidget(QLabel("Step"))
-        right.addWidget(self.step_text)
+        right.addWidget(self.step_list)
         right.addWidget(self.done_check)
         right.addWidget(self.skip_btn)
         right.addStretch()
@@ -57,8 +123,20 @@ class GuidesView(QWidget):
         root.addLayout(right, 2)
 
         # Connect signals
+        self.search_box.textChanged.connect(self._search_timer.start)
+        self._search_timer.timeout.connect(self._run_search)
+        self.search_results.itemClicked.connect(self._on_search_result)
+        self.search_results.itemActivated.connect(self._on_search_result)
+        self.search_results.verticalScrollBar().valueChanged.connect(
+            self._on_search_scrolled
+        )
         self.region_combo.currentTextChanged.connect(self._on_region_changed)
-        self.section_list.currentItemChanged.connect(self._on_section_changed)
+        self.section_list.selectionModel().currentChanged.connect(
+            self._on_section_changed
+        )
+        self.sections.page_loaded.connect(self._on_sections_page)
+        self.steps.page_loaded.connect(self._on_steps_page)
+        self.guides_imported.connect(self._on_guides_imported)
         self.done_check.toggled.connect(self._on_done_toggled)
         self.skip_btn.clicked.connect(self._on_skip)
         self.top_most.toggled.connect(self._on_top_most)
@@ -68,86 +146,220 @@ class GuidesView(QWidget):
 
     def _load_regions(self):
         """Load available regions into the combo box."""
-        with self.session_factory() as s:
-            regions = [g for g in s.exec(select(Guide)).all()]
-        
+
+        def fetch():
+            if self.store is not None:
+                return self.store.region_keys()
+            with span("view.query.regions"), self.session_factory() as s:
+                return query_region_keys(s)
+
+        self.executor.submit("regions", fetch, self._show_regions)
+
+    def _show_regions(self, keys: list[str]):
+        current = self.region_combo.currentText()
+        self.region_combo.blockSignals(True)
         self.region_combo.clear()
-        for g in sorted(regions, key=lambda x: x.key):
-            self.region_combo.addItem(g.key)
+        self.region_combo.addItems(keys)
+        if current in keys:
+            self.region_combo.setCurrentText(current)
+        self.region_combo.blockSignals(False)
+        if self.region_combo.currentText() != self._region:
+            self._on_region_changed(self.region_combo.currentText())
+
+    def _fetch_sections(self, key: str, after, limit: int):
+        if self.store is not None:
+            return self.store.sections_page(key, after, limit)
+        with span("view.query.sections"):
+            return self.cache.sections_page(key, after, limit)
+
+    def _fetch_steps(self, key: str, section_index: int, after, limit: int):
+        if self.store is not None:
+            return self.store.steps_page(key, section_index, after, limit)
+        with span("view.query.steps"):
+            return self.cache.steps_page(key, section_index, after, limit)
 
     @Slot(str)
+    @timed("view.region_changed")
     def _on_region_changed(self, key: str):
         """Handle region selection change."""
-        self.section_list.clear()
-        if not key:
+        self._region = key or None
+        self._pending_skip = None
+        self.steps.reset()
+        self.sections.reset(partial(self._fetch_sections, key) if key else None)
+
+    def _on_sections_page(self):
+        """Select the pending or first section once its page has arrived."""
+        if self._pending_skip is not None:
+            row, self._pending_skip = self._pending_skip + 1, None
+            if row < self.sections.rowCount():
+                self._set_current_row(row)
             return
-            
-        with self.session_factory() as s:
-            guide = s.exec(select(Guide).where(Guide.key == key)).first()
-            if not guide:
+        pending = self._pending_section
+        if pending is not None and pending[0] == self._region:
+            row = self.sections.row_of(pending[1])
+            if row >= 0:
+                self._pending_section = None
+                self._set_current_row(row)
+                if self._pending_scroll is not None:
+                    _scroll_to_key(
+                        self.section_list, self.sections, self._pending_scroll[0]
+                    )
                 return
-            steps = s.exec(
-                select(GuideStep).where(GuideStep.guide_id == guide.id)
-            ).all()
-        
-        sections = self._group_by_section(steps)
-        for idx, title in sections:
-            item = QListWidgetItem(f"{idx:03d} — {title}")
-            item.setData(Qt.UserRole, (key, idx))
-            self.section_list.addItem(item)
-        
-        if self.section_list.count() > 0:
-            self.section_list.setCurrentRow(0)
-
-    def _group_by_section(self, steps: List[GuideStep]) -> List[Tuple[int, str]]:
-        """Group steps by section and return unique section titles."""
-        grouped = {}
-        for step in steps:
-            if step.section_index is not None and step.title:
-                grouped.setdefault(step.section_index, step.title)
-            elif step.title and "—" in step.title:
-                try:
-                    idx_str, title = step.title.split("—", 1)
-                    grouped.setdefault(int(idx_str.strip()), title.strip())
-                except Exception:
-                    pass
-        return sorted(grouped.items())
-
-    def _on_section_changed(self, current: QListWidgetItem, _prev: QListWidgetItem):
+            if not self.sections.complete:
+                self.sections.fetchMore()
+                return
+            self._pending_section = None
+            self._pending_scroll = None
+        if not self.section_list.currentIndex().isValid():
+            if self.sections.rowCount() > 0:
+                self._set_current_row(0)
+
+    def _on_steps_page(self):
+        """Scroll the steps back to where they were before a re-import."""
+        if self._pending_scroll is None or self._pending_section is not None:
+            return
+        key = self._pending_scroll[1]
+        if key is not None and self.steps.row_of(key) < 0 and not self.steps.complete:
+            self.steps.fetchMore()
+            return
+        self._pending_scroll = None
+        _scroll_to_key(self.step_list, self.steps, key)
+
+    def _set_current_row(self, row: int):
+        index = self.sections.index(row)
+        self.section_list.setCurrentIndex(index)
+        self.section_list.scrollTo(index)
+
+    def _current_section(self) -> tuple[str, int] | None:
+        index = self.section_list.currentIndex()
+        if not index.isValid() or self._region is None:
+            return None
+        return self._region, self.sections.key(index.row())
+
+    @timed("view.section_changed")
+    def _on_section_changed(self, current: QModelIndex, _prev: QModelIndex):
         """Handle section selection change."""
-        self.step_text.clear()
-        if not current:
+        section = self._current_section() if current.isValid() else None
+        if section is None:
+            self.steps.reset()
             return
-            
-        key, idx = current.data(Qt.UserRole)
-        with self.session_factory() as s:
-            guide = s.exec(select(Guide).where(Guide.key == key)).first()
-            if not guide:
-                return
-            steps = s.exec(
-                select(GuideStep).where(GuideStep.guide_id == guide.id)
-            ).all()
-        
-        lines = []
-        for step in sorted(
-            steps, key=lambda x: (x.section_index or 9999, x.step_index or 9999)
-        ):
-            if (step.section_index == idx) or (
-                step.title.startswith(f"{idx:03d} —")
-            ):
-                lines.append(step.text or step.details or "")
-        
-        self.step_text.setPlainText("\n".join(lines))
-
-    def _on_done_toggled(self, _checked: bool):
-        """Handle done checkbox toggle - stubbed for future implementation."""
-        pass  # wire to per-user progress later
 
+        key, idx = section
+        self.steps.reset(partial(self._fetch_steps, key, idx))
+        if self.progress is None:
+            return
+        if self.progress.is_loaded(key):
+            self._show_done(section, self.progress.is_done(key, idx))
+        else:
+            self.executor.submit(
+                "progress",
+                lambda: self.progress.is_done(key, idx),
+                lambda done: self._show_done(section, done),
+            )
+
+    def _show_done(self, section: tuple[str, int], done: bool):
+        if section != self._current_section():
+            return
+        self.done_check.blockSignals(True)
+        self.done_check.setChecked(done)
+        self.done_check.blockSignals(False)
+
+    @Slot(object)
+    @timed("view.guides_imported")
+    def _on_guides_imported(self, stats: ImportStats):
+        """Refresh regions, and reload the shown region if the import rewrote it.
+
+        Other regions are left alone. The shown one keeps its current
+        section and the scroll position of both lists.
+        """
+        if self.store is not None:
+            # The loader has regenerated the file before notifying, or
+            # reopen rewrites it when the mmap backend was not selected
+            self.store.reopen()
+        self._load_regions()
+        if self._region in stats.guides:
+            self._pending_section = self._current_section()
+            if self._pending_section is not None:
+                self._pending_scroll = (
+                    _top_key(self.section_list, self.sections),
+                    _top_key(self.step_list, self.steps),
+                )
+            self._on_region_changed(self._region)
+
+    @timed("view.search")
+    def _run_search(self):
+        """Run the search box query and show the first page of hits."""
+        self.search_results.clear()
+        self._search_cursor = None
+        query = self.search_box.text().strip()
+        if not query:
+            self.executor.cancel("search")
+            self.search_results.hide()
+            return
+
+        self._request_search_page(query, None)
+
+    def _request_search_page(self, query: str, after):
+        """Fetch one page of search hits in the background."""
+
+        def fetch():
+            with span("view.query.search"), self.session_factory() as s:
+                return search_steps(s, query, limit=SEARCH_PAGE_SIZE, after=after)
+
+        self.executor.submit("search", fetch, self._append_search_page)
+
+    def _append_search_page(self, page):
+        """Append a page of search hits to the results list."""
+        for hit in page.hits:
+            item = QListWidgetItem(
+                f"{hit.guide_key} › {hit.section_title}: {hit.snippet}"
+            )
+            item.setData(Qt.UserRole, (hit.guide_key, hit.section_index))
+            self.search_results.addItem(item)
+        self._search_cursor = page.next_cursor
+        self.search_results.setVisible(self.search_results.count() > 0)
+
+    @Slot(int)
+    def _on_search_scrolled(self, value: int):
+        """Load the next page of hits when the results list hits the bottom."""
+        bar = self.search_results.verticalScrollBar()
+        if self._search_cursor is not None and value == bar.maximum():
+            cursor, self._search_cursor = self._search_cursor, None
+            self._request_search_page(self.search_box.text().strip(), cursor)
+
+    def _on_search_result(self, item: QListWidgetItem):
+        """Jump to the region and section of a search hit."""
+        key, idx = item.data(Qt.UserRole)
+        self.select_section(key, idx)
+
+    def select_section(self, key: str, section_index: int):
+        """Show a region and select one of its sections."""
+        # Sections load in pages; select once the right page arrives
+        self._pending_section = (key, section_index)
+        self._pending_scroll = None
+        self._pending_skip = None
+        if self.region_combo.currentText() != key:
+            self.region_combo.setCurrentText(key)
+        else:
+            self._on_sections_page()
+
+    def _on_done_toggled(self, checked: bool):
+        """Record the current section as done or not done."""
+        section = self._current_section()
+        if section is None or self.progress is None:
+            return
+        key, idx = section
+        self.progress.set_done(key, idx, checked)
+
+    @timed("view.skip")
     def _on_skip(self):
         """Skip to next section."""
-        row = self.section_list.currentRow()
-        if row < self.section_list.count() - 1:
-            self.section_list.setCurrentRow(row + 1)
+        row = self.section_list.currentIndex().row()
+        if row < self.sections.rowCount() - 1:
+            self._set_current_row(row + 1)
+        elif row >= 0 and not self.sections.complete:
+            self._pending_skip = row
+            self.sections.fetchMore()
 
     def _on_top_most(self, checked: bool):
         """Toggle always on top window flag."""
@@ -157,3 +369,16 @@ class GuidesView(QWidget):
         else:
             self.window().setWindowFlags(flags & ~Qt.WindowStaysOnTopHint)
         self.window().show()
+
+
+def _top_key(view: QListView, model) -> int | None:
+    """Key of the first visible row of a paged list view."""
+    index = view.indexAt(QPoint(1, 1))
+    return model.key(index.row()) if index.isValid() else None
+
+
+def _scroll_to_key(view: QListView, model, key: int | None):
+    """Scroll a paged list view so the row with ``key`` is at the top."""
+    row = model.row_of(key) if key is not None else -1
+    if row >= 0:
+        view.scrollTo(model.index(row), QAbstractItemView.PositionAtTop)
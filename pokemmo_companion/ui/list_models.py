@@ -0,0 +1,156 @@
+"""Incrementally fetched list models for the guides view."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Optional, Union
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+from pokemmo_companion.ui.query_executor import QueryExecutor
+
+DEFAULT_PAGE_SIZE = 500
+
+# Row text: a string, or UTF-8 bytes such as a memoryview slice of the
+# guide store, decoded only when the row is displayed
+RowText = Union[str, bytes, memoryview]
+# fetch_page(after_key, limit) -> [(key, text), ...] ordered by key
+PageFetcher = Callable[[Optional[int], int], list[tuple[int, RowText]]]
+
+
+class PagedListModel(QAbstractListModel):
+    """Read-only list of ``(key, text)`` rows fetched page by page.
+
+    Rows live in two compact columns: an ``array`` of integer keys and a
+    list of texts, kept as fetched (``str`` or UTF-8 ``memoryview``) and
+    decoded on display. Only the first page is requested on ``reset``; Qt
+    views ask for more through ``canFetchMore`` and ``fetchMore`` as they
+    scroll, so populating costs the same for 20 or 20,000 rows. Pages run
+    on the ``QueryExecutor`` channel given to the constructor and use
+    keyset pagination on the key, which must be strictly increasing.
+    """
+
+    # Emitted after each page has been appended
+    page_loaded = Signal()
+
+    def __init__(
+        self,
+        executor: QueryExecutor,
+        channel: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.executor = executor
+        self.channel = channel
+        self.page_size = page_size
+        self._keys = array("q")
+        self._texts: list[RowText] = []
+        self._fetch: Optional[PageFetcher] = None
+        self._loading = False
+        self._exhausted = True
+        # Bumped on reset so pages of a previous fetcher are ignored
+        self._generation = 0
+
+    def reset(self, fetch_page: Optional[PageFetcher] = None) -> None:
+        """Drop all rows and start fetching from ``fetch_page``."""
+        self.executor.cancel(self.channel)
+        self.beginResetModel()
+        self._keys = array("q")
+        self._texts = []
+        self._fetch = fetch_page
+        self._loading = False
+        self._exhausted = fetch_page is None
+        self._generation += 1
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self._keys):
+            return None
+        if role == Qt.DisplayRole:
+            return self.display(self._keys[index.row()], self.text(index.row()))
+        if role == Qt.UserRole:
+            return self._keys[index.row()]
+        return None
+
+    def display(self, key: int, text: str) -> str:
+        """Return the text shown for a row."""
+        return text
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        fetch, limit = self._fetch, self.page_size
+        after = self._keys[-1] if self._keys else None
+        generation = self._generation
+        self.executor.submit(
+            self.channel,
+            lambda: fetch(after, limit),
+            lambda rows: self._append(generation, rows),
+            lambda _message: self._fail(generation),
+        )
+
+    def _append(self, generation: int, rows: list[tuple[int, RowText]]) -> None:
+        if generation != self._generation:
+            return
+        self._loading = False
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            first = len(self._keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            for key, text in rows:
+                self._keys.append(key)
+                self._texts.append(text)
+            self.endInsertRows()
+        self.page_loaded.emit()
+
+    def _fail(self, generation: int) -> None:
+        if generation == self._generation:
+            # Stop paging; the executor already logged the error
+            self._loading = False
+            self._exhausted = True
+            self.page_loaded.emit()
+
+    @property
+    def loading(self) -> bool:
+        """Whether a page request is in flight."""
+        return self._loading
+
+    def key(self, row: int) -> int:
+        """Return the key of a loaded row."""
+        return self._keys[row]
+
+    def row_of(self, key: int) -> int:
+        """Return the row of a loaded key, or -1."""
+        row = bisect_left(self._keys, key)
+        return row if row < len(self._keys) and self._keys[row] == key else -1
+
+    @property
+    def complete(self) -> bool:
+        """Whether every row has been fetched."""
+        return self._exhausted and not self._loading
+
+    def text(self, row: int) -> str:
+        """Return the text of a loaded row."""
+        text = self._texts[row]
+        return text if isinstance(text, str) else str(text, "utf-8")
+
+
+class SectionListModel(PagedListModel):
+    """Sections of a guide keyed by section index."""
+
+    def display(self, key: int, text: str) -> str:
+        return f"{key:03d} — {text}"
+
+
+class StepListModel(PagedListModel):
+    """Step texts of one section keyed by step index."""
@@ -1,34 +1,139 @@
 """Main window for the PokeMMO Companion App."""
 
-from PySide6.QtWidgets import QMainWindow, QStackedWidget, QToolBar
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QAction
-from sqlmodel import Session
+from PySide6.QtWidgets import QLabel, QMainWindow, QStackedWidget, QToolBar
+from pokemmo_companion.core import instrumentation
 
-from pokemmo_companion.ui.guides_view import GuidesView
+# How long shutdown waits for running view queries before closing sessions
+SHUTDOWN_WAIT_MS = 2000
 
 
 class MainWindow(QMainWindow):
-    """Main application window with navigation and content areas."""
+    """Main application window with navigation and content areas.
 
-    def __init__(self, engine, parent=None):
+    The window can be shown before the database is ready: pass ``engine``
+    later through ``attach_engine``, which builds the data-backed views.
+    Their modules (and sqlmodel with them) are imported only then.
+    """
+
+    # Emitted once, after the window has painted for the first time
+    first_painted = Signal()
+
+    def __init__(self, engine=None, parent=None):
         super().__init__(parent)
-        self.engine = engine
+        self.engine = None
+        self.sessions = None
+        self.progress = None
+        self.guides_view = None
+        self.guide_watcher = None
+        self.debug_panel = None
+        self._painted = False
         self.setWindowTitle("PokeMMO Companion")
 
         # Central widget setup
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
-
-        # Create views
-        self.guides_view = GuidesView(lambda: Session(self.engine))
-        self.stack.addWidget(self.guides_view)
+        self.placeholder = QLabel("Loading guides…")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.stack.addWidget(self.placeholder)
 
         # Toolbar setup
         tb = QToolBar("Navigation")
         self.addToolBar(tb)
 
-        act_guides = QAction("Guides", self)
-        act_guides.triggered.connect(
+        self.act_guides = QAction("Guides", self)
+        self.act_guides.setEnabled(False)
+        self.act_guides.triggered.connect(
             lambda: self.stack.setCurrentWidget(self.guides_view)
         )
-        tb.addAction(act_guides)
+        tb.addAction(self.act_guides)
+
+        # Only offered when instrumentation is recording
+        if instrumentation.is_enabled():
+            self.act_debug = QAction("Debug", self)
+            self.act_debug.triggered.connect(self.show_debug_panel)
+            tb.addAction(self.act_debug)
+
+        if engine is not None:
+            self.attach_engine(engine)
+
+    def attach_engine(self, engine, store=None):
+        """Create the data-backed views once the database is ready.
+
+        ``store`` is an optional ``GuideStore`` the guides view reads from
+        instead of SQLite.
+        """
+        from pokemmo_companion.core.db import SessionManager
+        from pokemmo_companion.core.services.progress import ProgressStore
+        from pokemmo_companion.ui.guides_view import GuidesView
+
+        self.engine = engine
+        # Views read through long-lived read-only sessions; writers get
+        # short-lived sessions whose commits refresh the readers
+        self.sessions = SessionManager(engine)
+
+        # Progress is written behind the UI and flushed on close
+        self.progress = ProgressStore(self.sessions.write)
+        self.progress.start()
+
+        # Create views
+        self.guides_view = GuidesView(
+            self.sessions.read, progress=self.progress, store=store
+        )
+        self.stack.addWidget(self.guides_view)
+        self.stack.setCurrentWidget(self.guides_view)
+        self.act_guides.setEnabled(True)
+
+    def watch_guides(self, data_dir):
+        """Re-import guide files in ``data_dir`` whenever they are saved."""
+        from pokemmo_companion.ui.guide_watcher import GuideFileWatcher
+
+        self.guide_watcher = GuideFileWatcher(
+            data_dir, self.sessions.write, parent=self
+        )
+        self.guide_watcher.reimporting.connect(self._on_reimporting)
+        self.guide_watcher.import_all()
+
+    def _on_reimporting(self, names):
+        self.statusBar().showMessage(
+            f"Importing {', '.join(names)}…" if names else "Importing guides…", 3000
+        )
+
+    def show_debug_panel(self):
+        """Open the instrumentation panel in its own window."""
+        from pokemmo_companion.ui.debug_panel import DebugPanel
+
+        if self.debug_panel is None:
+            self.debug_panel = DebugPanel(self)
+            self.debug_panel.setWindowFlag(Qt.Tool)
+            self.debug_panel.resize(720, 480)
+        self.debug_panel.show()
+        self.debug_panel.raise_()
+
+    def show_startup_error(self, message: str):
+        """Replace the loading placeholder with a startup error."""
+        self.placeholder.setText(f"Could not open the guide database:\n{message}")
+
+    def shutdown(self):
+        """Flush pending progress and close the read sessions.
+
+        Safe to call more than once.
+        """
+        if self.progress is not None:
+            self.progress.close()
+        if self.sessions is not None:
+            if self.guides_view is not None:
+                self.guides_view.executor.wait_for_done(SHUTDOWN_WAIT_MS)
+            self.sessions.close()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
+
+    def closeEvent(self, event):
+        """Flush pending progress before the window closes."""
+        self.shutdown()
+        super().closeEvent(event)
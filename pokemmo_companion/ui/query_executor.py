@@ -0,0 +1,131 @@
+"""Background execution of view queries on a Qt thread pool."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+log = logging.getLogger(__name__)
+
+
+class _Signals(QObject):
+    """Carries task results from pool threads back to the GUI thread."""
+
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class _QueryTask(QRunnable):
+    """Runs one query function unless it was superseded before starting."""
+
+    def __init__(
+        self,
+        request_id: int,
+        fn: Callable[[], Any],
+        signals: _Signals,
+        is_current: Callable[[int], bool],
+    ):
+        super().__init__()
+        self.request_id = request_id
+        self.fn = fn
+        self.signals = signals
+        self.is_current = is_current
+
+    def run(self) -> None:
+        if not self.is_current(self.request_id):
+            return
+        try:
+            result = self.fn()
+        except Exception as e:
+            log.exception("Background query failed")
+            self.signals.failed.emit(self.request_id, str(e))
+        else:
+            self.signals.finished.emit(self.request_id, result)
+
+
+class QueryExecutor(QObject):
+    """Runs view reads off the GUI thread and delivers results by signal.
+
+    Requests are grouped into named channels (e.g. ``"sections"``). Only
+    the latest request of a channel is current: submitting a new one
+    cancels a queued predecessor and drops the result of a running one,
+    so quickly scrolling through sections only renders the last pick.
+    Callbacks always run on the GUI thread.
+    """
+
+    def __init__(
+        self, pool: Optional[QThreadPool] = None, parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._signals = _Signals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._latest: dict[str, int] = {}
+        self._queued: dict[str, _QueryTask] = {}
+        self._callbacks: dict[int, tuple[str, Callable, Optional[Callable]]] = {}
+
+    def submit(
+        self,
+        channel: str,
+        fn: Callable[[], Any],
+        on_result: Callable[[Any], None],
+        on_error: Optional[Callable[[str], None]] = None,
+    ) -> int:
+        """Run ``fn`` in the pool and pass its result to ``on_result``."""
+        self.cancel(channel)
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._latest[channel] = request_id
+        task = _QueryTask(request_id, fn, self._signals, self.is_current)
+        task.setAutoDelete(False)
+        self._queued[channel] = task
+        self._callbacks[request_id] = (channel, on_result, on_error)
+        self.pool.start(task)
+        return request_id
+
+    def cancel(self, channel: str) -> None:
+        """Drop the pending request of a channel, if any."""
+        with self._lock:
+            request_id = self._latest.pop(channel, None)
+        task = self._queued.pop(channel, None)
+        if task is not None:
+            self.pool.tryTake(task)
+        if request_id is not None:
+            self._callbacks.pop(request_id, None)
+
+    def is_current(self, request_id: int) -> bool:
+        """Whether a request is still the latest of its channel."""
+        with self._lock:
+            return request_id in self._latest.values()
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Block until every queued query has finished."""
+        return self.pool.waitForDone(msecs)
+
+    def _take(self, request_id: int) -> Optional[tuple[Callable, Optional[Callable]]]:
+        if not self.is_current(request_id):
+            self._callbacks.pop(request_id, None)
+            return None
+        channel, on_result, on_error = self._callbacks.pop(request_id)
+        with self._lock:
+            self._latest.pop(channel, None)
+        self._queued.pop(channel, None)
+        return on_result, on_error
+
+    @Slot(int, object)
+    def _on_finished(self, request_id: int, result: Any) -> None:
+        callbacks = self._take(request_id)
+        if callbacks is not None:
+            callbacks[0](result)
+
+    @Slot(int, str)
+    def _on_failed(self, request_id: int, message: str) -> None:
+        callbacks = self._take(request_id)
+        if callbacks is not None and callbacks[1] is not None:
+            callbacks[1](message)
@@ -0,0 +1,34 @@
+"""Script to compile guide JSON files into the prebuilt guide pack."""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from pokemmo_companion.core.services.guide_pack import (
+    DEFAULT_PACK_PATH,
+    compile_pack,
+)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("data_dir", nargs="?", default="data", type=Path)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_PACK_PATH,
+        help=f"pack file to write (default: data/{DEFAULT_PACK_PATH.name})",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    compile_pack(args.data_dir, args.output)
@@ -1,5 +1,7 @@
 """Script to import PokeMMO guides from JSON files into the database."""
 
+import argparse
+import logging
 import sys
 from pathlib import Path
 
@@ -9,11 +11,103 @@ sys.path.insert(0, str(project_root))
 
 from sqlmodel import Session
 
-from pokemmo_companion.core.db import get_engine
-from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core import instrumentation
+from pokemmo_companion.core.db import get_engine, init_db
+from pokemmo_companion.core.services.guide_loader import (
+    DEFAULT_BATCH_SIZE,
+    load_guides_from_dir,
+)
+from pokemmo_companion.core.services.guide_watch import DEFAULT_POLL_INTERVAL, watch
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("data_dir", nargs="?", default="data", type=Path)
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="database file (default: $POKEMMO_DB_PATH or pokemmo_tracker.db)",
+    )
+    parser.add_argument("--mode", choices=["replace", "merge"], default="replace")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="no-op, kept for compatibility: unchanged guides are never rewritten",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the rows each file would insert, update, move or delete "
+        "without writing anything",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-import every file even if the import manifest says it is unchanged",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used to parse guide files",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="print SQL statement counts and loader phase timings after the import",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and re-import guide files as they are edited",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="seconds between directory scans in --watch mode",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    engine = get_engine()
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.instrument:
+        instrumentation.enable()
+    engine = init_db(get_engine(db_path=args.db))
     with Session(engine) as s:
-        load_guides_from_dir(Path("data"), s, mode="replace")
+        stats = load_guides_from_dir(
+            args.data_dir,
+            s,
+            mode=args.mode,
+            batch_size=args.batch_size,
+            skip_unchanged=args.skip_unchanged,
+            force=args.force,
+            jobs=args.jobs,
+            dry_run=args.dry_run,
+        )
+    for changes in stats.changes:
+        print(changes.format())
+    if args.instrument:
+        print(instrumentation.snapshot().format(), file=sys.stderr)
+    if args.watch and not args.dry_run:
+
+        def reimport(names):
+            with Session(engine) as s:
+                load_guides_from_dir(
+                    args.data_dir,
+                    s,
+                    mode=args.mode,
+                    batch_size=args.batch_size,
+                    files=names,
+                )
+
+        print(f"Watching {args.data_dir} for changes (Ctrl+C to stop)")
+        try:
+            watch(args.data_dir, reimport, interval=args.poll_interval)
+        except KeyboardInterrupt:
+            pass
@@ -6,6 +6,32 @@ from sqlmodel import Session, create_engine
 from pokemmo_companion.core.models import SQLModel
 
 
+def pytest_addoption(parser):
+    """Options for the benchmark suite (run with ``-m benchmark``)."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-json",
+        default="benchmark-results.json",
+        help="where to write benchmark results as JSON",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        default=str(Path(__file__).parent / "benchmark_baseline.json"),
+        help="stored baseline medians to compare against",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=1.5,
+        help="fail when a median exceeds baseline * threshold",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="rewrite the baseline file with this run's medians",
+    )
+
+
 @pytest.fixture
 def temp_db():
     """Create a temporary SQLite database for testing."""
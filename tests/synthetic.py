@@ -0,0 +1,45 @@
+"""Deterministic synthetic guide files for benchmarks."""
+
+import json
+import random
+from pathlib import Path
+
+WORDS = (
+    "talk to the professor head north catch battle trainer gym leader "
+    "route city cave surf cut strength flash badge heal potion pokeball "
+    "rival items berries evolve trade rare candy fishing rod bike ferry"
+).split()
+
+
+def synthetic_guide(region: int, sections: int, steps: int, seed: int = 0) -> dict:
+    """Build one guide payload; the same arguments always give the same data."""
+    rng = random.Random(f"{seed}:{region}")
+    return {
+        "region": f"Region{region:02d}",
+        "sections": [
+            {
+                "title": f"SECTION {s} " + " ".join(rng.choices(WORDS, k=2)).upper(),
+                "steps": [
+                    " ".join(rng.choices(WORDS, k=rng.randint(6, 14)))
+                    for _ in range(steps)
+                ],
+            }
+            for s in range(1, sections + 1)
+        ],
+    }
+
+
+def write_synthetic_guides(
+    dest: Path, regions: int, sections: int, steps: int, seed: int = 0
+) -> list[Path]:
+    """Write ``regions`` guide files of ``sections`` x ``steps`` into ``dest``."""
+    dest.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for region in range(1, regions + 1):
+        path = dest / f"guide_region{region:02d}.json"
+        path.write_text(
+            json.dumps(synthetic_guide(region, sections, steps, seed)),
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
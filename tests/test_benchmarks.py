@@ -0,0 +1,314 @@
+"""Benchmarks for guide imports and the queries behind the guides view.
+
+Deselected by default; run with ``pytest -m benchmark --no-cov``. Each
+benchmark's timings are written to ``--benchmark-json`` and its median is
+compared with ``tests/benchmark_baseline.json``: a benchmark fails when it
+is more than ``--benchmark-threshold`` times slower than its baseline.
+Rewrite the baseline with ``--benchmark-update`` after an intended change.
+"""
+
+import json
+import platform
+import sqlite3
+import statistics
+import time
+from contextlib import closing
+from pathlib import Path
+import pytest
+from sqlmodel import Session
+from pokemmo_companion.core.db import SessionManager, create_sqlite_engine, init_db
+from pokemmo_companion.core.services.guide_cache import (
+    GuideCache,
+    query_region_keys,
+    query_sections_page,
+    query_steps_page,
+)
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.guide_pack import compile_pack, install_pack
+from pokemmo_companion.core.services.guide_search import search_steps
+from pokemmo_companion.core.services.guide_store import open_store
+from pokemmo_companion.ui.guides_view import SEARCH_PAGE_SIZE
+from pokemmo_companion.ui.list_models import DEFAULT_PAGE_SIZE
+from tests.synthetic import write_synthetic_guides
+
+pytestmark = pytest.mark.benchmark
+
+REGIONS, SECTIONS, STEPS = 4, 250, 20
+LOAD_ROUNDS = 3
+QUERY_ROUNDS = 50
+# Sub-millisecond timings jitter more than any threshold; allow this much
+# absolute slack on top of baseline * threshold
+NOISE_FLOOR = 0.001
+
+
+class BenchmarkRecorder:
+    """Times benchmarks, checks them against the baseline and saves results."""
+
+    def __init__(self, config):
+        self.output = Path(config.getoption("--benchmark-json"))
+        self.baseline_path = Path(config.getoption("--benchmark-baseline"))
+        self.threshold = config.getoption("--benchmark-threshold")
+        self.update = config.getoption("--benchmark-update")
+        self.baseline = {}
+        if self.baseline_path.exists():
+            self.baseline = json.loads(self.baseline_path.read_text())["medians"]
+        self.results = {}
+
+    def run(self, name, fn, rounds, setup=None):
+        """Time ``fn`` ``rounds`` times; ``setup`` runs untimed before each."""
+        samples = []
+        for _ in range(rounds):
+            arg = setup() if setup is not None else None
+            start = time.perf_counter()
+            fn(arg) if setup is not None else fn()
+            samples.append(time.perf_counter() - start)
+        median = statistics.median(samples)
+        self.results[name] = {
+            "median": median,
+            "min": min(samples),
+            "max": max(samples),
+            "rounds": rounds,
+        }
+
+        baseline = self.baseline.get(name)
+        if baseline is not None and not self.update:
+            self.results[name]["baseline"] = baseline
+            assert median <= baseline * self.threshold + NOISE_FLOOR, (
+                f"{name}: median {median * 1000:.2f}ms is more than "
+                f"{self.threshold}x the baseline {baseline * 1000:.2f}ms"
+            )
+        return median
+
+    def write(self):
+        report = {
+            "dataset": {"regions": REGIONS, "sections": SECTIONS, "steps": STEPS},
+            "threshold": self.threshold,
+            "environment": {
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "machine": platform.machine(),
+            },
+            "results": self.results,
+        }
+        self.output.write_text(json.dumps(report, indent=2) + "\n")
+        if self.update and self.results:
+            medians = dict(self.baseline)
+            medians.update({k: v["median"] for k, v in self.results.items()})
+            self.baseline_path.write_text(
+                json.dumps(
+                    {"dataset": report["dataset"], "medians": medians},
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n"
+            )
+
+
+@pytest.fixture(scope="session")
+def bench(request):
+    recorder = BenchmarkRecorder(request.config)
+    yield recorder
+    recorder.write()
+
+
+@pytest.fixture(scope="module")
+def guide_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench_guides")
+    write_synthetic_guides(path, REGIONS, SECTIONS, STEPS)
+    return path
+
+
+@pytest.fixture(scope="module")
+def loaded_engine(tmp_path_factory, guide_dir):
+    engine = init_db(create_sqlite_engine(tmp_path_factory.mktemp("bench_db") / "b.db"))
+    with Session(engine) as s:
+        load_guides_from_dir(guide_dir, s)
+    yield engine
+    engine.dispose()
+
+
+def test_bench_load_replace_fresh(bench, guide_dir, tmp_path):
+    """Import every file into an empty database."""
+    engines = []
+
+    def fresh_session():
+        engine = init_db(create_sqlite_engine(tmp_path / f"fresh{len(engines)}.db"))
+        engines.append(engine)
+        return Session(engine)
+
+    def load(session):
+        with session:
+            load_guides_from_dir(guide_dir, session, mode="replace")
+
+    bench.run("load_replace_fresh", load, LOAD_ROUNDS, setup=fresh_session)
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("mode", ["replace", "merge"])
+def test_bench_load_existing(bench, guide_dir, loaded_engine, mode):
+    """Re-import every file over existing rows."""
+
+    def load():
+        with Session(loaded_engine) as s:
+            load_guides_from_dir(guide_dir, s, mode=mode, force=True)
+
+    bench.run(f"load_{mode}_existing", load, LOAD_ROUNDS)
+
+
+def test_bench_load_unchanged(bench, guide_dir, loaded_engine):
+    """Re-run an import where the manifest marks every file unchanged."""
+
+    def load():
+        with Session(loaded_engine) as s:
+            load_guides_from_dir(guide_dir, s)
+
+    bench.run("load_manifest_unchanged", load, LOAD_ROUNDS)
+
+
+def test_bench_view_queries(bench, loaded_engine):
+    """Time each query GuidesView issues, with its page sizes."""
+    with Session(loaded_engine) as s:
+        key = query_region_keys(s)[-1]
+        queries = {
+            "view_regions": lambda: query_region_keys(s),
+            "view_sections_first_page": lambda: query_sections_page(
+                s, key, None, DEFAULT_PAGE_SIZE
+            ),
+            "view_sections_last_page": lambda: query_sections_page(
+                s, key, SECTIONS - 10, DEFAULT_PAGE_SIZE
+            ),
+            "view_steps_page": lambda: query_steps_page(
+                s, key, SECTIONS // 2, None, DEFAULT_PAGE_SIZE
+            ),
+            "view_search_first_page": lambda: search_steps(
+                s, "gym leader", limit=SEARCH_PAGE_SIZE
+            ),
+        }
+        for name, query in queries.items():
+            assert query()  # warm up and check the dataset answers it
+            bench.run(name, query, QUERY_ROUNDS)
+
+
+@pytest.mark.parametrize("sessions", ["new", "reader", "cached"])
+def test_bench_view_clicks(bench, loaded_engine, sessions):
+    """Time a region and a section click: a session and its first page.
+
+    ``new`` opens a Session per click; ``reader`` borrows the long-lived
+    read session of a SessionManager; ``cached`` serves the pages from a
+    GuideCache over the read sessions, as GuidesView does.
+    """
+    manager = SessionManager(loaded_engine)
+    session_factory = (
+        (lambda: Session(loaded_engine)) if sessions == "new" else (manager.read)
+    )
+    suffix = "" if sessions == "new" else f"_{sessions}"
+    cache = GuideCache(manager.read)
+    with Session(loaded_engine) as s:
+        key = query_region_keys(s)[-1]
+
+    def click_region():
+        if sessions == "cached":
+            return cache.sections_page(key, None, DEFAULT_PAGE_SIZE)
+        with session_factory() as s:
+            return query_sections_page(s, key, None, DEFAULT_PAGE_SIZE)
+
+    def click_section():
+        if sessions == "cached":
+            return cache.steps_page(key, SECTIONS // 2, None, DEFAULT_PAGE_SIZE)
+        with session_factory() as s:
+            return query_steps_page(s, key, SECTIONS // 2, None, DEFAULT_PAGE_SIZE)
+
+    try:
+        for name, click in (
+            ("view_click_region", click_region),
+            ("view_click_section", click_section),
+        ):
+            assert click()
+            bench.run(name + suffix, click, QUERY_ROUNDS)
+    finally:
+        manager.close()
+
+
+def test_bench_view_queries_mmap(bench, loaded_engine, tmp_path):
+    """Time the same view pages served by the memory-mapped guide store."""
+    # A copy of the database, so the store written next to it is not
+    # rebuilt by every later import into loaded_engine's database
+    path = tmp_path / "mmap.db"
+    with loaded_engine.connect() as conn, closing(sqlite3.connect(path)) as copy:
+        conn.connection.dbapi_connection.backup(copy)
+    engine = create_sqlite_engine(path)
+    with Session(engine) as s:
+        store = open_store(s)
+    key = store.region_keys()[-1]
+    queries = {
+        "view_regions_mmap": store.region_keys,
+        "view_sections_first_page_mmap": lambda: store.sections_page(
+            key, None, DEFAULT_PAGE_SIZE
+        ),
+        "view_sections_last_page_mmap": lambda: store.sections_page(
+            key, SECTIONS - 10, DEFAULT_PAGE_SIZE
+        ),
+        "view_steps_page_mmap": lambda: store.steps_page(
+            key, SECTIONS // 2, None, DEFAULT_PAGE_SIZE
+        ),
+    }
+    try:
+        for name, query in queries.items():
+            assert query()
+            bench.run(name, query, QUERY_ROUNDS)
+    finally:
+        engine.dispose()
+
+
+def test_bench_load_replace_one_edit(bench, guide_dir, loaded_engine):
+    """Re-import after editing one step per file; only the delta is written."""
+    paths = sorted(guide_dir.glob("guide_*.json"))
+    originals = [p.read_text(encoding="utf-8") for p in paths]
+    rounds = []
+
+    def edit():
+        for path, original in zip(paths, originals, strict=True):
+            payload = json.loads(original)
+            payload["sections"][SECTIONS // 2]["steps"][0] += f" (edit {len(rounds)})"
+            path.write_text(json.dumps(payload), encoding="utf-8")
+        rounds.append(None)
+        return Session(loaded_engine)
+
+    def load(session):
+        with session:
+            stats = load_guides_from_dir(guide_dir, session)
+        assert (stats.updated, stats.inserted, stats.deleted) == (REGIONS, 0, 0)
+
+    try:
+        bench.run("load_replace_one_edit", load, LOAD_ROUNDS, setup=edit)
+    finally:
+        for path, original in zip(paths, originals, strict=True):
+            path.write_text(original, encoding="utf-8")
+
+
+@pytest.mark.parametrize("source", ["import", "pack"])
+def test_bench_first_launch(bench, guide_dir, tmp_path_factory, source):
+    """Time a fresh install from no database to the first sections page."""
+    build = tmp_path_factory.mktemp("first_launch")
+    pack = build / "guide_pack.db"
+    if source == "pack":
+        compile_pack(guide_dir, pack)
+    paths = []
+
+    def new_path():
+        paths.append(build / f"user{len(paths)}.db")
+        return paths[-1]
+
+    def launch(db_path):
+        if source == "pack":
+            install_pack(db_path, pack)
+        engine = init_db(create_sqlite_engine(db_path))
+        with Session(engine) as s:
+            if source == "import":
+                load_guides_from_dir(guide_dir, s)
+            key = query_region_keys(s)[0]
+            assert query_sections_page(s, key, None, DEFAULT_PAGE_SIZE)
+        engine.dispose()
+
+    bench.run(f"first_launch_{source}", launch, LOAD_ROUNDS, setup=new_path)
@@ -0,0 +1,111 @@
+"""Tests for the shared SQLite engine factory."""
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+from pokemmo_companion.core import db
+from pokemmo_companion.core.models import Guide
+
+
+@pytest.fixture
+def engines():
+    yield
+    db.dispose_engines()
+
+
+def test_get_engine_is_process_wide(tmp_path, engines):
+    """Test that one engine is shared per database path."""
+    path = tmp_path / "a.db"
+    engine = db.get_engine(db_path=path)
+
+    assert db.get_engine(db_path=str(path)) is engine
+    assert db.get_engine(db_path=tmp_path / "b.db") is not engine
+
+
+def test_db_path_env_override(tmp_path, monkeypatch, engines):
+    """Test that $POKEMMO_DB_PATH is used when no path is passed."""
+    path = tmp_path / "env.db"
+    monkeypatch.setenv(db.DB_PATH_ENV, str(path))
+
+    assert db.resolve_db_path() == path
+    assert db.resolve_db_path(tmp_path / "arg.db") == tmp_path / "arg.db"
+    assert db.get_engine().url.database == str(path)
+
+
+def test_pragmas_applied_on_connect(tmp_path, engines):
+    """Test that every connection gets the tuned pragmas."""
+    engine = db.get_engine(db_path=tmp_path / "p.db")
+    with engine.connect() as conn:
+
+        def pragma(name):
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == db.BUSY_TIMEOUT_MS
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("cache_size") == -64_000
+
+
+def test_import_pragmas_are_restored(tmp_path, engines):
+    """Test that import_pragmas caps the page cache only within the block."""
+    engine = db.get_engine(db_path=tmp_path / "i.db")
+    with Session(engine) as session:
+
+        def pragma(name):
+            return session.connection().exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        with db.import_pragmas(session):
+            assert pragma("cache_size") == -8_000
+            assert pragma("mmap_size") == 0
+        assert pragma("cache_size") == -64_000
+        assert pragma("mmap_size") == 256 * 1024 * 1024
+
+
+def test_readers_not_blocked_by_open_write(tmp_path, engines):
+    """Test that WAL lets a reader see committed data during a write."""
+    engine = db.get_engine(db_path=tmp_path / "w.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("INSERT INTO t VALUES (2)"))  # write txn left open
+        assert reader.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        writer.commit()
+        reader.rollback()
+        assert reader.execute(text("SELECT count(*) FROM t")).scalar() == 2
+
+
+def test_session_manager_reuses_read_sessions(tmp_path, engines):
+    """Test that reads share a read-only session refreshed by writes."""
+    engine = db.init_db(db.get_engine(db_path=tmp_path / "s.db"))
+    sessions = db.SessionManager(engine, max_readers=1)
+    with sessions.write() as s:
+        s.add(Guide(key="kanto", title="Kanto Guide"))
+        s.commit()
+
+    with sessions.read() as first:
+        guide = first.exec(select(Guide)).one()
+        with pytest.raises(OperationalError):
+            first.execute(text("DELETE FROM guide"))
+    with sessions.read() as second:
+        assert second is first
+        # Loaded objects survive between reads...
+        assert second.exec(select(Guide)).one() is guide
+        assert not inspect(guide).expired
+        # ...and a busy reader falls back to a temporary session
+        with sessions.read() as extra:
+            assert extra is not first
+
+    with sessions.write() as s:
+        s.add(Guide(key="johto", title="Johto Guide"))
+        s.commit()
+    with sessions.read() as third:
+        assert inspect(guide).expired
+        assert len(third.exec(select(Guide)).all()) == 2
+
+    sessions.close()
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 0
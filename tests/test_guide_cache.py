@@ -0,0 +1,278 @@
+"""Tests for the guide read cache."""
+
+import json
+from sqlalchemy import create_engine, event
+from sqlmodel import Session
+from pokemmo_companion.core.models import Guide, GuideStep
+from pokemmo_companion.core.services.guide_cache import (
+    GuideCache,
+    query_sections_page,
+    query_steps_page,
+)
+from pokemmo_companion.core.services import guide_keys
+from pokemmo_companion.core.services.guide_keys import guide_key_map, guide_ref
+from pokemmo_companion.core.services.guide_loader import (
+    _refresh_sections,
+    add_import_listener,
+    load_guides_from_dir,
+    remove_import_listener,
+)
+
+
+def _write_guide(path, region, sections):
+    guide_data = {
+        "region": region,
+        "sections": [{"title": title, "steps": steps} for title, steps in sections],
+    }
+    with path.open("w") as f:
+        json.dump(guide_data, f)
+
+
+class CountingFactory:
+    """Session factory that counts how many sessions were opened."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return Session(self.engine)
+
+
+def test_cache_hit_skips_database(temp_db, session, tmp_path):
+    """Test that cached pages are served without opening a session."""
+    _write_guide(
+        tmp_path / "guide_a.json",
+        "Alpha",
+        [("First", ["A1", "A2"]), ("Second", ["B1"])],
+    )
+    load_guides_from_dir(tmp_path, session)
+
+    factory = CountingFactory(temp_db)
+    cache = GuideCache(factory)
+
+    guide = cache.get("alpha")
+    assert guide.sections == ((1, "First"), (2, "Second"))
+    # One session for the import token check, one for the guide
+    assert factory.calls == 2
+
+    assert cache.steps_page("alpha", 1) == [(1, "A1"), (2, "A2")]
+    assert cache.steps_page("alpha", 2) == [(1, "B1")]
+    assert cache.steps_page("alpha", 3) == []
+    assert factory.calls == 5
+
+    assert cache.get("alpha") is guide
+    assert cache.sections_page("alpha", after=1) == [(2, "Second")]
+    assert cache.steps_page("alpha", 1, after=1) == [(2, "A2")]
+    assert cache.steps_page("alpha", 2) == [(1, "B1")]
+    assert factory.calls == 5
+    assert cache.get("missing") is None
+    assert cache.sections_page("missing") == []
+
+
+def test_cache_lru_eviction(temp_db, session, tmp_path):
+    """Test that the least recently used guide is evicted first."""
+    for region in ("One", "Two", "Three"):
+        _write_guide(tmp_path / f"guide_{region}.json", region, [("S", ["x"])])
+    load_guides_from_dir(tmp_path, session)
+
+    cache = GuideCache(lambda: Session(temp_db), max_guides=2)
+    cache.get("one")
+    cache.get("two")
+    cache.get("one")
+    cache.get("three")
+
+    assert "one" in cache
+    assert "two" not in cache
+    assert "three" in cache
+    assert len(cache) == 2
+
+
+def test_cache_invalidated_by_import(temp_db, session, tmp_path):
+    """Test that an import drops the guides it rewrote."""
+    guide_file = tmp_path / "guide_a.json"
+    _write_guide(guide_file, "Alpha", [("First", ["old"])])
+    _write_guide(tmp_path / "guide_b.json", "Beta", [("First", ["b"])])
+    load_guides_from_dir(tmp_path, session)
+
+    cache = GuideCache(lambda: Session(temp_db))
+    add_import_listener(cache.on_import)
+    try:
+        assert cache.steps_page("alpha", 1) == [(1, "old")]
+        cache.get("beta")
+
+        _write_guide(guide_file, "Alpha", [("First", ["new", "steps"])])
+        load_guides_from_dir(tmp_path, session)
+
+        assert "alpha" not in cache
+        assert "beta" in cache
+        assert cache.steps_page("alpha", 1) == [(1, "new"), (2, "steps")]
+    finally:
+        remove_import_listener(cache.on_import)
+
+
+def test_cache_notices_import_by_another_process(temp_db, session, tmp_path):
+    """Test that an import no listener saw is caught by the token check."""
+    guide_file = tmp_path / "guide_a.json"
+    _write_guide(guide_file, "Alpha", [("First", ["old"])])
+    load_guides_from_dir(tmp_path, session)
+
+    factory = CountingFactory(temp_db)
+    cache = GuideCache(factory, check_interval=3600)
+    assert cache.steps_page("alpha", 1) == [(1, "old")]
+
+    # Written through another engine, as by scripts/import_guides.py
+    other = create_engine(temp_db.url)
+    try:
+        _write_guide(guide_file, "Alpha", [("First", ["new"])])
+        with Session(other) as s:
+            load_guides_from_dir(tmp_path, s)
+    finally:
+        other.dispose()
+
+    calls = factory.calls
+    assert cache.steps_page("alpha", 1) == [(1, "old")]
+    assert factory.calls == calls  # not due for a check yet
+
+    cache.check_interval = 0
+    assert cache.steps_page("alpha", 1) == [(1, "new")]
+
+
+def test_cache_pages_long_lists_from_sqlite(temp_db, session, tmp_path):
+    """Test that lists over max_rows are paged from SQLite, not cached."""
+    _write_guide(
+        tmp_path / "guide_a.json",
+        "Alpha",
+        [("Long", [f"L{i}" for i in range(1, 6)]), ("Short", ["S1"])]
+        + [(f"Extra {i}", ["x"]) for i in range(3)],
+    )
+    load_guides_from_dir(tmp_path, session)
+
+    factory = CountingFactory(temp_db)
+    cache = GuideCache(factory, check_interval=3600, max_rows=4)
+    assert cache.get("alpha").sections is None
+    for after in (None, 2, 4):
+        assert cache.sections_page("alpha", after, 2) == query_sections_page(
+            session, "alpha", after, 2
+        )
+        assert cache.steps_page("alpha", 1, after, 2) == query_steps_page(
+            session, "alpha", 1, after, 2
+        )
+    assert 1 not in cache.get("alpha").steps
+
+    calls = factory.calls
+    assert cache.steps_page("alpha", 2) == [(1, "S1")]
+    assert cache.steps_page("alpha", 2) == [(1, "S1")]
+    assert factory.calls == calls + 1
+
+
+def test_section_queries_order_in_sql(session, tmp_path):
+    """Test that page queries return sections and steps in position order."""
+    guide = Guide(key="unordered", title="Unordered Guide")
+    session.add(guide)
+    session.flush()
+    for section_index, step_index in [(2, 2), (1, 3), (2, 1), (1, 1), (1, 2)]:
+        session.add(
+            GuideStep(
+                guide_id=guide.id,
+                section_index=section_index,
+                step_index=step_index,
+                title=f"Section {section_index}",
+                text=f"{section_index}.{step_index}",
+            )
+        )
+    session.add(
+        GuideStep(
+            guide_id=guide.id,
+            section_index=3,
+            step_index=1,
+            title="Section 3",
+            details="details only",
+        )
+    )
+    session.flush()
+    _refresh_sections(session, guide.id)
+    session.commit()
+
+    assert query_sections_page(session, "unordered") == [
+        (1, "Section 1"),
+        (2, "Section 2"),
+        (3, "Section 3"),
+    ]
+    assert query_steps_page(session, "unordered", 1) == [
+        (1, "1.1"),
+        (2, "1.2"),
+        (3, "1.3"),
+    ]
+    assert query_steps_page(session, "unordered", 2) == [(1, "2.1"), (2, "2.2")]
+    assert query_steps_page(session, "unordered", 3) == [(1, "details only")]
+
+
+def test_page_queries_use_keyset(session, tmp_path):
+    """Test that section and step pages continue after the given key."""
+    _write_guide(
+        tmp_path / "guide_a.json",
+        "Alpha",
+        [(f"S{i}", [f"{i}.{j}" for j in range(1, 4)]) for i in range(1, 6)],
+    )
+    load_guides_from_dir(tmp_path, session)
+
+    first = query_sections_page(session, "alpha", limit=2)
+    assert first == [(1, "S1"), (2, "S2")]
+    assert query_sections_page(session, "alpha", after=2, limit=2) == [
+        (3, "S3"),
+        (4, "S4"),
+    ]
+    assert query_sections_page(session, "alpha", after=4, limit=2) == [(5, "S5")]
+    assert query_sections_page(session, "missing") == []
+
+    assert query_steps_page(session, "alpha", 2, limit=2) == [(1, "2.1"), (2, "2.2")]
+    assert query_steps_page(session, "alpha", 2, after=2, limit=2) == [(3, "2.3")]
+
+
+def test_guide_key_map_invalidated_by_import(temp_db, session, tmp_path):
+    """Test that page queries resolve keys from memory until an import."""
+    _write_guide(tmp_path / "guide_a.json", "Alpha", [("First", ["a"])])
+    load_guides_from_dir(tmp_path, session)
+    key_map = guide_key_map(session)
+    assert not key_map.loaded
+
+    assert guide_ref(session, "alpha").title == "Alpha Guide"
+    assert key_map.loaded
+    statements = []
+    event.listen(temp_db, "before_cursor_execute", lambda *a: statements.append(a))
+    assert query_steps_page(session, "alpha", 1) == [(1, "a")]
+    assert len(statements) == 1
+
+    # Added by another writer: a miss reloads the map
+    session.add(Guide(key="manual", title="Manual Guide"))
+    session.commit()
+    assert guide_ref(session, "manual").title == "Manual Guide"
+
+    _write_guide(tmp_path / "guide_b.json", "Beta", [("First", ["b"])])
+    load_guides_from_dir(tmp_path, session)
+    assert not key_map.loaded
+    assert query_sections_page(session, "beta") == [(1, "First")]
+
+
+def test_guide_key_map_remembers_misses(temp_db, session, tmp_path, monkeypatch):
+    """Test that an unknown key rescans the guide table only once in a while."""
+    _write_guide(tmp_path / "guide_a.json", "Alpha", [("First", ["a"])])
+    load_guides_from_dir(tmp_path, session)
+    assert guide_ref(session, "alpha") is not None
+    statements = []
+    event.listen(temp_db, "before_cursor_execute", lambda *a: statements.append(a))
+
+    for _ in range(3):
+        assert guide_ref(session, "missing") is None
+    assert len(statements) == 1
+
+    # A guide added meanwhile resolves once the miss has expired
+    session.add(Guide(key="missing", title="Found Guide"))
+    session.commit()
+    statements.clear()
+    assert guide_ref(session, "missing") is None
+    assert statements == []
+    monkeypatch.setattr(guide_keys, "MISS_RETRY_INTERVAL", 0)
+    assert guide_ref(session, "missing").title == "Found Guide"
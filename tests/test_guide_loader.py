@@ -1,13 +1,38 @@
 """Tests for the guide loader service."""
 
 import json
+import os
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+from pokemmo_companion.core.services import guide_loader
 from pokemmo_companion.core.services.guide_loader import (
+    LoadedStep,
+    StoredStep,
+    diff_steps,
     load_guides_from_dir,
+    step_hash,
     _guide_key,
     _iter_steps,
+    _JsonStream,
+    _parse_in_pool,
+    _stream_region,
+    _stream_steps,
+)
+from pokemmo_companion.core.services.guide_search import search_steps
+from pokemmo_companion.core.services.tags import tags_of_guide, tags_of_step
+from pokemmo_companion.core.models import (
+    Guide,
+    GuideSection,
+    GuideStep,
+    ImportManifest,
 )
-from pokemmo_companion.core.models import Guide, GuideStep
 
 
 def test_guide_key():
@@ -66,7 +91,7 @@ def test_load_guides_from_dir_fresh_db(session, tmp_path):
     ).first()
     assert guide is not None
     assert guide.title == "TestRegion Guide"
-    assert "region:testregion" in guide.tags
+    assert "region:testregion" in tags_of_guide(session, guide.id)
     
     # Verify steps were created
     steps = session.exec(
@@ -79,14 +104,15 @@ def test_load_guides_from_dir_fresh_db(session, tmp_path):
     assert step1.section_index == 1
     assert step1.title == "Test Section"
     assert step1.text == "Test Step 1"
-    assert "region:testregion" in step1.tags
-    assert "section:1" in step1.tags
+    # Step tags are inherited from the guide and section tag links
+    assert "region:testregion" in tags_of_step(session, step1)
+    assert "section:1" in tags_of_step(session, step1)
 
 
 def test_load_guides_from_dir_merge_mode(session, tmp_path):
     """Test loading guides in merge mode."""
     # Create initial guide
-    guide = Guide(key="testregion", title="Test Guide", tags=["region:testregion"])
+    guide = Guide(key="testregion", title="Test Guide")
     session.add(guide)
     session.commit()
     session.refresh(guide)
@@ -98,7 +124,6 @@ def test_load_guides_from_dir_merge_mode(session, tmp_path):
         step_index=1,
         title="Existing Section",
         text="Existing Step",
-        tags=["region:testregion", "section:1"],
     )
     session.add(step)
     session.commit()
@@ -139,7 +164,7 @@ def test_load_guides_from_dir_merge_mode(session, tmp_path):
 def test_load_guides_from_dir_replace_mode(session, tmp_path):
     """Test loading guides in replace mode."""
     # Create initial guide with steps
-    guide = Guide(key="testregion", title="Test Guide", tags=["region:testregion"])
+    guide = Guide(key="testregion", title="Test Guide")
     session.add(guide)
     session.commit()
     session.refresh(guide)
@@ -150,7 +175,6 @@ def test_load_guides_from_dir_replace_mode(session, tmp_path):
         step_index=1,
         title="Old Section",
         text="Old Step",
-        tags=["region:testregion", "section:1"],
     )
     session.add(step)
     session.commit()
@@ -232,3 +256,498 @@ def test_load_guides_from_dir_missing_region(session, tmp_path, caplog):
     # Verify no guide was created
     guides = session.exec(session.query(Guide)).all()
     assert len(guides) == 0
+
+
+def test_load_guides_from_dir_batched_insert(session, tmp_path):
+    """Test that steps spanning several batches are all inserted."""
+    guide_data = {
+        "region": "BatchRegion",
+        "sections": [
+            {"title": f"Section {i}", "steps": [f"Step {j}" for j in range(7)]}
+            for i in range(5)
+        ],
+    }
+
+    guide_file = tmp_path / "guide_batch.json"
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    stats = load_guides_from_dir(tmp_path, session, mode="replace", batch_size=4)
+
+    assert stats.files == 1
+    assert stats.inserted == 35
+    assert stats.merged == 0
+    steps = session.exec(select(GuideStep)).all()
+    assert len(steps) == 35
+    assert {s.section_index for s in steps} == {1, 2, 3, 4, 5}
+
+
+def test_load_guides_from_dir_merge_counts(session, tmp_path):
+    """Test that a repeated merge reports every step as merged."""
+    guide_data = {
+        "region": "MergeRegion",
+        "sections": [
+            {"title": "One", "steps": ["A", "B", "C"]},
+            {"title": "Two", "steps": ["D"]},
+        ],
+    }
+
+    guide_file = tmp_path / "guide_merge.json"
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    first = load_guides_from_dir(tmp_path, session, mode="merge", batch_size=3)
+    assert (first.inserted, first.merged) == (4, 0)
+
+    guide_data["sections"][1]["steps"].append("E")
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    second = load_guides_from_dir(tmp_path, session, mode="merge", batch_size=3)
+    assert (second.inserted, second.merged) == (1, 4)
+    assert len(session.exec(select(GuideStep)).all()) == 5
+
+
+def test_load_guides_from_dir_sections(session, tmp_path):
+    """Test that imports keep the guide section summary in sync."""
+    guide_data = {
+        "region": "SectionRegion",
+        "sections": [
+            {"title": "One", "steps": ["A", "B", "C"]},
+            {"title": "Two", "steps": ["D"]},
+        ],
+    }
+    guide_file = tmp_path / "guide_sections.json"
+
+    def sections():
+        return [
+            (s.section_index, s.title, s.step_count)
+            for s in session.exec(
+                select(GuideSection).order_by(GuideSection.section_index)
+            ).all()
+        ]
+
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+    load_guides_from_dir(tmp_path, session)
+    assert sections() == [(1, "One", 3), (2, "Two", 1)]
+
+    guide_data["sections"][1]["steps"].append("E")
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+    load_guides_from_dir(tmp_path, session, mode="merge")
+    assert sections() == [(1, "One", 3), (2, "Two", 2)]
+
+    guide_data["sections"] = guide_data["sections"][:1]
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+    load_guides_from_dir(tmp_path, session, mode="replace")
+    assert sections() == [(1, "One", 3)]
+
+
+def test_load_guides_from_dir_skip_unchanged(session, tmp_path):
+    """Test that replace mode can leave unchanged guides untouched."""
+    guide_data = {
+        "region": "SameRegion",
+        "sections": [{"title": "Only", "steps": ["A", "B"]}],
+    }
+
+    guide_file = tmp_path / "guide_same.json"
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    load_guides_from_dir(tmp_path, session, mode="replace")
+    ids = sorted(s.id for s in session.exec(select(GuideStep)).all())
+
+    stats = load_guides_from_dir(
+        tmp_path, session, mode="replace", skip_unchanged=True, force=True
+    )
+    assert stats.unchanged == 1
+    assert stats.inserted == 0
+    assert sorted(s.id for s in session.exec(select(GuideStep)).all()) == ids
+
+    guide_data["sections"][0]["steps"][1] = "B2"
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    stats = load_guides_from_dir(
+        tmp_path, session, mode="replace", skip_unchanged=True, force=True
+    )
+    assert stats.unchanged == 0
+    assert (stats.updated, stats.deleted, stats.inserted) == (1, 0, 0)
+    assert sorted(s.id for s in session.exec(select(GuideStep)).all()) == ids
+
+
+def test_load_guides_from_dir_manifest(session, tmp_path):
+    """Test that files recorded in the import manifest are skipped."""
+    guide_data = {
+        "region": "ManifestRegion",
+        "sections": [{"title": "Only", "steps": ["A", "B"]}],
+    }
+
+    guide_file = tmp_path / "guide_manifest.json"
+    with guide_file.open("w") as f:
+        json.dump(guide_data, f)
+
+    first = load_guides_from_dir(tmp_path, session)
+    assert (first.files, first.skipped, first.inserted) == (1, 0, 2)
+    entry = session.exec(select(ImportManifest)).one()
+    assert entry.path == str(guide_file.resolve())
+    assert entry.size == guide_file.stat().st_size
+
+    second = load_guides_from_dir(tmp_path, session)
+    assert (second.files, second.skipped, second.inserted) == (0, 1, 0)
+
+    # Same content with a new mtime is skipped by hash
+    os.utime(guide_file, (1, 1))
+    third = load_guides_from_dir(tmp_path, session)
+    assert (third.files, third.skipped) == (0, 1)
+    assert session.exec(select(ImportManifest)).one().mtime == 1
+
+    # Forced files are parsed and diffed; nothing changed, nothing is written
+    forced = load_guides_from_dir(tmp_path, session, force=True)
+    assert (forced.files, forced.skipped, forced.unchanged) == (1, 0, 1)
+    assert forced.inserted == 0
+
+
+def test_load_guides_from_dir_parallel(session, tmp_path, caplog):
+    """Test that parsing in worker processes gives the same result."""
+    for i in range(4):
+        guide_data = {
+            "region": f"Region{i}",
+            "sections": [{"title": "S", "steps": [f"Step {j}" for j in range(3)]}],
+        }
+        with (tmp_path / f"guide_{i}.json").open("w") as f:
+            json.dump(guide_data, f)
+    (tmp_path / "guide_broken.json").write_text("not json")
+
+    stats = load_guides_from_dir(tmp_path, session, jobs=2)
+
+    assert stats.files == 4
+    assert stats.inserted == 12
+    assert "Failed to import guide from" in caplog.text
+    keys = sorted(g.key for g in session.exec(select(Guide)).all())
+    assert keys == ["region0", "region1", "region2", "region3"]
+
+
+def test_parse_in_pool_bounds_pending_files(tmp_path):
+    """Test that the pool parses a bounded window of files, yielded in order."""
+    paths = []
+    for i in range(6):
+        paths.append(tmp_path / f"guide_{i}.json")
+        paths[-1].write_text(json.dumps({"region": f"R{i}", "sections": []}))
+    submitted = []
+
+    class Pool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            return super().submit(fn, *args)
+
+    with Pool(max_workers=2) as pool:
+        parsed = _parse_in_pool(pool, 3, paths, [None] * 6, repeat(False), repeat(0))
+        first = next(parsed)
+        assert len(submitted) == 3
+        rest = list(parsed)
+
+    assert [f.path for f in [first, *rest]] == paths == submitted
+
+
+def test_stream_steps_matches_iter_steps(tmp_path):
+    """Test that the streaming reader yields the same steps as json.load."""
+    payload = {
+        "sections": [
+            {"title": "First", "steps": ["A", 'B "quoted"', "C\nnewline"]},
+            {"steps": [1, 2.5, "é"]},
+            {"title": "Empty", "steps": []},
+        ],
+        "meta": {"version": 12345, "list": [1, 2, 3]},
+        "region": "  Streamland ",
+    }
+    guide_file = tmp_path / "guide_stream.json"
+    guide_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    # A tiny chunk size forces values to straddle chunk boundaries
+    assert _stream_region(guide_file, chunk_size=7) == "Streamland"
+    assert list(_stream_steps(guide_file, chunk_size=7)) == list(
+        _iter_steps(payload)
+    )
+
+
+def test_manifest_is_keyed_by_resolved_path(session, tmp_path):
+    """Test that same-named files in two directories are tracked apart."""
+    for region in ("North", "South"):
+        (tmp_path / region).mkdir()
+        (tmp_path / region / "guide_main.json").write_text(
+            json.dumps({"region": region, "sections": [{"steps": ["A"]}]})
+        )
+    # Two files of the same size, and the same mtime
+    for region in ("North", "South"):
+        os.utime(tmp_path / region / "guide_main.json", (1, 1))
+
+    assert load_guides_from_dir(tmp_path / "North", session).files == 1
+    assert load_guides_from_dir(tmp_path / "South", session).files == 1
+    paths = sorted(m.path for m in session.exec(select(ImportManifest)))
+    assert paths == [
+        str((tmp_path / region / "guide_main.json").resolve())
+        for region in ("North", "South")
+    ]
+
+
+def test_manifest_adopts_legacy_name_entries(session, tmp_path):
+    """Test that an entry keyed by bare file name is used and re-keyed."""
+    guide_file = tmp_path / "guide_legacy.json"
+    guide_file.write_text(json.dumps({"region": "Legacy", "sections": []}))
+    load_guides_from_dir(tmp_path, session)
+    entry = session.exec(select(ImportManifest)).one()
+    entry.path = "guide_legacy.json"
+    session.add(entry)
+    session.commit()
+
+    os.utime(guide_file, (1, 1))
+    stats = load_guides_from_dir(tmp_path, session)
+
+    assert (stats.files, stats.skipped) == (0, 1)
+    assert session.exec(select(ImportManifest)).one().path == str(
+        guide_file.resolve()
+    )
+
+
+def test_stream_caps_truncated_value(tmp_path):
+    """Test that an unterminated value fails at the cap, not at EOF."""
+    path = tmp_path / "guide_truncated.json"
+    path.write_text('{"region": "R", "sections": [{"title": "' + "x" * 10_000)
+
+    stream = _JsonStream(path, chunk_size=16, max_value=100)
+    try:
+        with pytest.raises(ValueError, match="longer than 100 characters"):
+            for key in stream.members():
+                if key == "sections":
+                    list(stream.items())
+                else:
+                    stream.value()
+        assert len(stream._buf) <= 100 + 16
+    finally:
+        stream.close()
+
+
+def test_load_guides_from_dir_streamed(session, tmp_path, caplog):
+    """Test that large files are imported through the streaming reader."""
+    guide_data = {
+        "region": "BigRegion",
+        "sections": [
+            {"title": f"Section {i}", "steps": [f"Step {j}" for j in range(10)]}
+            for i in range(20)
+        ],
+    }
+    with (tmp_path / "guide_big.json").open("w") as f:
+        json.dump(guide_data, f)
+    (tmp_path / "guide_truncated.json").write_text(
+        '{"region": "Broken", "sections": [{"title": "S", "steps": ["A"]}, {'
+    )
+
+    stats = load_guides_from_dir(
+        tmp_path, session, batch_size=16, stream_threshold=0
+    )
+
+    assert stats.files == 1
+    assert stats.inserted == 200
+    assert "Failed to import guide from" in caplog.text
+    assert session.exec(select(Guide).where(Guide.key == "broken")).first() is None
+    steps = session.exec(select(GuideStep)).all()
+    assert len(steps) == 200
+    assert session.exec(select(ImportManifest)).one().path == str(
+        (tmp_path / "guide_big.json").resolve()
+    )
+
+
+def test_streamed_database_error_propagates(session, tmp_path, monkeypatch):
+    """Test that only parse errors are skipped; database errors are raised."""
+    (tmp_path / "guide_big.json").write_text(
+        json.dumps({"region": "Big", "sections": [{"title": "S", "steps": ["A"]}]})
+    )
+
+    def fail(*_args, **_kwargs):
+        raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(guide_loader, "_write_guide", fail)
+    with pytest.raises(OperationalError):
+        load_guides_from_dir(tmp_path, session, stream_threshold=0)
+
+
+# Imports one directory in a fresh interpreter and prints the growth of its
+# peak RSS in KiB over the baseline after setting up the database. VmHWM is
+# used because a child's ru_maxrss starts at the (large) pytest process's.
+_IMPORT_RSS_SCRIPT = """
+import sys
+from sqlmodel import Session
+from pokemmo_companion.core.db import create_sqlite_engine, init_db
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+
+def peak_rss():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+
+data_dir, db_path, threshold = sys.argv[1], sys.argv[2], int(sys.argv[3])
+engine = init_db(create_sqlite_engine(db_path))
+before = peak_rss()
+with Session(engine) as session:
+    load_guides_from_dir(data_dir, session, stream_threshold=threshold)
+print(peak_rss() - before)
+"""
+
+
+def _import_peak_rss(data_dir: Path, db_path: Path, stream_threshold: int) -> int:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _IMPORT_RSS_SCRIPT,
+            str(data_dir),
+            str(db_path),
+            str(stream_threshold),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    return int(result.stdout.split()[-1])
+
+
+@pytest.mark.slow
+def test_stream_steps_memory_is_bounded(tmp_path):
+    """Benchmark peak memory of the streaming reader and importer against json.load."""
+    if not Path("/proc/self/status").exists():
+        pytest.skip("peak RSS is read from /proc")
+
+    def write_guide(path, sections):
+        path.parent.mkdir()
+        payload = {
+            "region": "Bench",
+            "sections": [
+                {"title": f"S{i}", "steps": [f"step {i}.{j} " * 8 for j in range(50)]}
+                for i in range(sections)
+            ],
+        }
+        path.write_text(json.dumps(payload), encoding="utf-8")
+
+    def peak(fn):
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small = tmp_path / "small" / "guide_bench.json"
+    large = tmp_path / "large" / "guide_bench.json"
+    write_guide(small, 1000)
+    write_guide(large, 4000)
+
+    def drain(path):
+        for _ in _stream_steps(path):
+            pass
+
+    stream_small = peak(lambda: drain(small))
+    stream_large = peak(lambda: drain(large))
+    full_large = peak(lambda: json.loads(large.read_bytes()))
+
+    # 4x the file size should not grow the streaming peak noticeably
+    assert stream_large < stream_small * 1.5
+    assert stream_large * 10 < full_large
+
+    # The same for the whole streamed import: once the page cache is full
+    # (IMPORT_PRAGMAS caps it) its peak stops growing with the guide
+    streamed_small = _import_peak_rss(small.parent, tmp_path / "small.db", 0)
+    streamed_large = _import_peak_rss(large.parent, tmp_path / "large.db", 0)
+    parsed_large = _import_peak_rss(large.parent, tmp_path / "parse.db", 2**62)
+    assert streamed_large < streamed_small * 1.5
+    assert streamed_large * 2 < parsed_large
+
+
+def test_stream_value_spanning_chunks_is_linear(tmp_path, monkeypatch):
+    """Test that a section spanning many chunks is not re-decoded per chunk."""
+    path = tmp_path / "guide_wide.json"
+    path.write_text(
+        json.dumps({"region": "Wide", "sections": [{"steps": ["x" * 10] * 2000}]})
+    )
+    calls = []
+    raw_decode = json.JSONDecoder.raw_decode
+
+    def counting(self, s, idx=0):
+        calls.append(idx)
+        return raw_decode(self, s, idx)
+
+    monkeypatch.setattr(json.JSONDecoder, "raw_decode", counting)
+    steps = list(_stream_steps(path, chunk_size=16))
+
+    assert len(steps) == 2000
+    # ~28 KB in 16-char chunks: doubling reads retry ~11 times, not ~1700
+    assert len(calls) < 40
+
+
+def test_diff_steps_preserves_identity():
+    """Test that the diff reuses rows for edited and reordered steps."""
+
+    def loaded(*texts):
+        return [LoadedStep(1, "S", i, t) for i, t in enumerate(texts, start=1)]
+
+    stored = [
+        StoredStep(10 + i, 1, i, step_hash("S", t))
+        for i, t in enumerate(["a", "b", "c", "d"], start=1)
+    ]
+
+    changes = diff_steps(stored, loaded("b", "a", "c2", "e", "f"), "k")
+
+    assert changes.unchanged == 0
+    assert sorted((r.id, s.step_index) for r, s in changes.moves) == [(11, 2), (12, 1)]
+    assert [(r.id, s.text) for r, s in changes.updates] == [(13, "c2"), (14, "e")]
+    assert [s.text for s in changes.inserts] == ["f"]
+    assert changes.deletes == []
+    assert changes.size == 5
+    assert "#13" in changes.format()
+
+
+def test_load_guides_from_dir_diff(session, tmp_path):
+    """Test that re-imports write only the delta and keep step ids."""
+    guide_data = {
+        "region": "DiffRegion",
+        "sections": [
+            {"title": "One", "steps": ["A", "B", "C"]},
+            {"title": "Two", "steps": ["D", "E"]},
+        ],
+    }
+    guide_file = tmp_path / "guide_diff.json"
+    guide_file.write_text(json.dumps(guide_data))
+    load_guides_from_dir(tmp_path, session)
+
+    def steps():
+        return {
+            s.text: (s.id, s.section_index, s.step_index)
+            for s in session.exec(select(GuideStep)).all()
+        }
+
+    before = steps()
+    guide_data["sections"][0]["steps"] = ["New", "A", "B"]
+    guide_data["sections"][1]["steps"] = ["D", "E2"]
+    guide_file.write_text(json.dumps(guide_data))
+
+    dry = load_guides_from_dir(tmp_path, session, dry_run=True)
+    (changes,) = dry.changes
+    assert (len(changes.moves), len(changes.updates)) == (2, 1)
+    assert (len(changes.inserts), len(changes.deletes)) == (1, 1)
+    assert steps() == before
+    assert session.exec(select(ImportManifest)).one().size != guide_file.stat().st_size
+
+    stats = load_guides_from_dir(tmp_path, session)
+    assert (stats.moved, stats.updated, stats.deleted, stats.inserted) == (2, 1, 1, 1)
+    after = steps()
+    assert after["A"] == (before["A"][0], 1, 2)
+    assert after["B"] == (before["B"][0], 1, 3)
+    assert after["D"] == before["D"]
+    assert after["E2"] == before["E"]
+    assert after["New"][0] not in {id_ for id_, _, _ in before.values()}
+    assert "C" not in after
+    # The full-text index follows the updated row
+    hits = search_steps(session, "e2").hits
+    assert [hit.step_id for hit in hits] == [before["E"][0]]
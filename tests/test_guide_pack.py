@@ -0,0 +1,86 @@
+"""Tests for the prebuilt guide pack."""
+
+import shutil
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select
+from pokemmo_companion.core import schema
+from pokemmo_companion.core.db import create_sqlite_engine
+from pokemmo_companion.core.models import GuideSection, GuideStep, ImportManifest
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.guide_pack import compile_pack, install_pack
+from pokemmo_companion.core.services.guide_search import search_steps
+from tests.synthetic import write_synthetic_guides
+
+
+@pytest.fixture
+def pack(tmp_path):
+    write_synthetic_guides(tmp_path / "data", regions=2, sections=3, steps=4)
+    path = tmp_path / "guide_pack.db"
+    stats = compile_pack(tmp_path / "data", path)
+    assert (stats.files, stats.inserted) == (2, 24)
+    return path
+
+
+def test_install_pack_on_first_launch(pack, tmp_path):
+    """Test that a new database starts as a ready, searchable copy of the pack."""
+    db_path = tmp_path / "user" / "tracker.db"
+
+    assert install_pack(db_path, pack)
+
+    engine = create_sqlite_engine(db_path)
+    try:
+        assert not schema.ensure_schema(engine)
+        with Session(engine) as s:
+            assert s.exec(select(func.count()).select_from(GuideStep)).one() == 24
+            assert s.exec(select(func.count()).select_from(GuideSection)).one() == 6
+            assert search_steps(s, "the").hits
+    finally:
+        engine.dispose()
+    assert not list(tmp_path.glob("user/*.pack-tmp"))
+
+
+def test_installed_pack_skips_its_guide_files(pack, tmp_path):
+    """Test that the first import after install finds every file unchanged."""
+    # The guides as installed elsewhere, with new mtimes
+    data_dir = tmp_path / "user" / "data"
+    shutil.copytree(tmp_path / "data", data_dir, copy_function=shutil.copy)
+    db_path = tmp_path / "user" / "tracker.db"
+    assert install_pack(db_path, pack)
+
+    engine = create_sqlite_engine(db_path)
+    try:
+        with Session(engine) as s:
+            keys = set(s.exec(select(ImportManifest.path)).all())
+            assert keys == {p.name for p in data_dir.glob("guide_*.json")}
+
+            stats = load_guides_from_dir(data_dir, s)
+            assert (stats.files, stats.skipped) == (0, 2)
+            # Re-keyed to the new location, so later imports match directly
+            stats = load_guides_from_dir(data_dir, s)
+            assert (stats.files, stats.skipped) == (0, 2)
+            keys = set(s.exec(select(ImportManifest.path)).all())
+            assert keys == {str(p.resolve()) for p in data_dir.glob("guide_*.json")}
+    finally:
+        engine.dispose()
+
+
+def test_install_pack_keeps_existing_database(pack, tmp_path):
+    """Test that the pack never overwrites a database or installs when missing."""
+    db_path = tmp_path / "tracker.db"
+    db_path.write_bytes(b"existing")
+
+    assert not install_pack(db_path, pack)
+    assert db_path.read_bytes() == b"existing"
+    assert not install_pack(tmp_path / "other.db", tmp_path / "missing.db")
+    assert not (tmp_path / "other.db").exists()
+
+
+def test_compile_pack_without_guides_fails(tmp_path):
+    """Test that an empty data directory does not produce a pack."""
+    dest = tmp_path / "guide_pack.db"
+    with pytest.raises(ValueError):
+        compile_pack(tmp_path, dest)
+    assert not dest.exists()
+    assert not list(tmp_path.glob("*.tmp*"))
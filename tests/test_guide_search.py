@@ -0,0 +1,92 @@
+"""Tests for the guide full-text search service."""
+
+import json
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.guide_search import (
+    build_match_query,
+    search_steps,
+)
+
+
+def _load(session, tmp_path, region, sections):
+    guide_data = {
+        "region": region,
+        "sections": [{"title": title, "steps": steps} for title, steps in sections],
+    }
+    with (tmp_path / f"guide_{region}.json").open("w") as f:
+        json.dump(guide_data, f)
+    load_guides_from_dir(tmp_path, session)
+
+
+def test_build_match_query():
+    """Test that free text becomes a safe FTS5 query."""
+    assert build_match_query("where do I get Surf?") == (
+        '"where" AND "do" AND "I" AND "get" AND "Surf"*'
+    )
+    assert build_match_query("gym leader", "OR") == '"gym" OR "leader"*'
+    assert build_match_query(" ?! ") == ""
+
+
+def test_search_steps_ranked_and_highlighted(session, tmp_path):
+    """Test that hits carry their region, section and a highlight."""
+    _load(
+        session,
+        tmp_path,
+        "Kanto",
+        [
+            ("PALLET TOWN", ["Talk to Professor Oak"]),
+            ("FUCHSIA CITY", ["Win the Safari Zone prize: HM03 Surf"]),
+        ],
+    )
+    _load(
+        session,
+        tmp_path,
+        "Johto",
+        [("CIANWOOD", ["Surf east from Olivine", "Surf surf surf"])],
+    )
+
+    page = search_steps(session, "where do I get Surf?")
+    assert {(h.guide_key, h.section_index) for h in page.hits} == {
+        ("kanto", 2),
+        ("johto", 1),
+    }
+    assert len(page.hits) == 3
+    assert page.hits[0].snippet == "[Surf] [surf] [surf]"
+    assert page.hits[0].section_title == "CIANWOOD"
+    assert page.next_cursor is None
+
+    assert search_steps(session, "oak").hits[0].guide_key == "kanto"
+    assert search_steps(session, "").hits == ()
+
+
+def test_search_steps_keyset_pagination(session, tmp_path):
+    """Test that pages follow each other without gaps or repeats."""
+    _load(
+        session,
+        tmp_path,
+        "Hoenn",
+        [("ROUTE", [f"Bike along route {i}" for i in range(7)])],
+    )
+
+    seen = []
+    page = search_steps(session, "bike", limit=3)
+    while True:
+        seen.extend(h.step_id for h in page.hits)
+        # Only the page is highlighted, but every hit on it is
+        assert all(h.snippet.startswith("[Bike] along") for h in page.hits)
+        if page.next_cursor is None:
+            break
+        page = search_steps(session, "bike", limit=3, after=page.next_cursor)
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_search_index_follows_replace_import(session, tmp_path):
+    """Test that triggers keep the index in sync with re-imports."""
+    _load(session, tmp_path, "Sinnoh", [("START", ["Find the lake"])])
+    assert len(search_steps(session, "lake").hits) == 1
+
+    _load(session, tmp_path, "Sinnoh", [("START", ["Climb the mountain"])])
+    assert search_steps(session, "lake").hits == ()
+    assert len(search_steps(session, "mountain").hits) == 1
@@ -0,0 +1,135 @@
+"""Tests for the memory-mapped guide store."""
+
+import json
+import pytest
+from sqlmodel import Session
+from pokemmo_companion.core.db import create_sqlite_engine, init_db
+from pokemmo_companion.core.services.guide_cache import (
+    query_region_keys,
+    query_sections_page,
+    query_steps_page,
+)
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.guide_store import (
+    GUIDE_STORE_ENV,
+    GuideStore,
+    _read_token,
+    import_token,
+    open_store,
+    resolve_backend,
+    store_path,
+)
+from tests.synthetic import write_synthetic_guides
+
+
+def _decoded(page):
+    return [(key, str(text, "utf-8")) for key, text in page]
+
+
+@pytest.fixture
+def loaded(tmp_path):
+    write_synthetic_guides(tmp_path / "data", regions=2, sections=5, steps=3)
+    engine = init_db(create_sqlite_engine(tmp_path / "store.db"))
+    with Session(engine) as s:
+        load_guides_from_dir(tmp_path / "data", s)
+    yield engine
+    engine.dispose()
+
+
+def test_store_pages_match_sqlite(loaded, tmp_path):
+    """Test that every store page equals the SQLite page it replaces."""
+    with Session(loaded) as s:
+        store = open_store(s)
+        assert store.path == store_path(tmp_path / "store.db")
+        keys = query_region_keys(s)
+        assert store.region_keys() == keys
+        for key in keys:
+            for after, limit in ((None, 500), (None, 2), (1, 2), (3, 500)):
+                assert _decoded(store.sections_page(key, after, limit)) == (
+                    query_sections_page(s, key, after, limit)
+                )
+            for section_index in range(7):
+                for after in (None, 0, 1, 2):
+                    assert _decoded(
+                        store.steps_page(key, section_index, after, 2)
+                    ) == query_steps_page(s, key, section_index, after, 2)
+
+    assert isinstance(store.sections_page(keys[0])[0][1], memoryview)
+    assert store.sections_page("missing") == []
+    assert store.steps_page(keys[0], 99) == []
+
+
+def test_loader_regenerates_store(loaded, tmp_path, monkeypatch):
+    """Test that an import rewrites the selected store and reopen picks it up."""
+    monkeypatch.setenv(GUIDE_STORE_ENV, "mmap")
+    with Session(loaded) as s:
+        store = open_store(s)
+    store.check_interval = float("inf")
+    (tmp_path / "data" / "guide_extra.json").write_text(
+        json.dumps({"region": "Extra", "sections": [{"title": "A", "steps": ["x"]}]})
+    )
+
+    with Session(loaded) as s:
+        load_guides_from_dir(tmp_path / "data", s)
+        token = import_token(s)
+    assert _read_token(store.path) == token
+    assert "extra" not in [k.lower() for k in store.region_keys()]
+
+    store.reopen()
+    assert store.token == token
+    (key,) = [k for k in store.region_keys() if k.lower() == "extra"]
+    assert _decoded(store.steps_page(key, 1)) == [(1, "x")]
+
+
+def test_open_store_rewrites_stale_file(loaded, tmp_path):
+    """Test that a store written before an unnoticed import is rebuilt."""
+    with Session(loaded) as s:
+        open_store(s)
+    path = store_path(tmp_path / "store.db")
+    path.unlink()
+    (tmp_path / "data" / "guide_extra.json").write_text(
+        json.dumps({"region": "Extra", "sections": [{"title": "A", "steps": ["x"]}]})
+    )
+    with Session(loaded) as s:
+        load_guides_from_dir(tmp_path / "data", s)
+        assert not path.exists()
+        path.write_bytes(b"not a store")
+        store = open_store(s)
+        assert store.token == import_token(s)
+        assert store.region_keys() == query_region_keys(s)
+    assert GuideStore(path).token == store.token
+
+
+def test_store_catches_up_with_other_imports(loaded, tmp_path, monkeypatch):
+    """Test that reads rewrite a store the loader did not regenerate."""
+    monkeypatch.delenv(GUIDE_STORE_ENV, raising=False)
+    with Session(loaded) as s:
+        store = open_store(s)
+    store.check_interval = float("inf")
+    written = store.path.stat().st_mtime_ns
+    (tmp_path / "data" / "guide_extra.json").write_text(
+        json.dumps({"region": "Extra", "sections": [{"title": "A", "steps": ["x"]}]})
+    )
+
+    # The sqlite backend is selected, e.g. an importer in another process
+    with Session(loaded) as s:
+        load_guides_from_dir(tmp_path / "data", s)
+        token = import_token(s)
+        keys = query_region_keys(s)
+    assert store.path.stat().st_mtime_ns == written
+    assert store.region_keys() != keys
+
+    store.check_interval = 0
+    assert store.region_keys() == keys
+    assert store.token == token == _read_token(store.path)
+
+
+def test_resolve_backend(monkeypatch):
+    """Test backend selection from the argument and the environment."""
+    monkeypatch.delenv(GUIDE_STORE_ENV, raising=False)
+    assert resolve_backend() == "sqlite"
+    monkeypatch.setenv(GUIDE_STORE_ENV, "MMAP")
+    assert resolve_backend() == "mmap"
+    assert resolve_backend("sqlite") == "sqlite"
+    with pytest.raises(ValueError):
+        resolve_backend("postgres")
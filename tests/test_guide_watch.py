@@ -0,0 +1,104 @@
+"""Tests for re-importing guide files as they change."""
+
+import json
+import os
+import threading
+import time
+from PySide6.QtCore import QCoreApplication, QThreadPool
+from sqlmodel import Session
+from pokemmo_companion.core.db import create_sqlite_engine, init_db
+from pokemmo_companion.core.services.guide_cache import query_steps_page
+from pokemmo_companion.core.services.guide_loader import (
+    add_import_listener,
+    remove_import_listener,
+)
+from pokemmo_companion.core.services.guide_watch import changed_files, snapshot, watch
+from pokemmo_companion.ui.guide_watcher import GuideFileWatcher
+from pokemmo_companion.ui.query_executor import QueryExecutor
+
+
+def _write(path, region, steps, mtime_ns=None):
+    path.write_text(
+        json.dumps({"region": region, "sections": [{"title": "A", "steps": steps}]})
+    )
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_changed_files_reports_added_and_modified(tmp_path):
+    """Test that snapshots diff to added and modified guide files only."""
+    _write(tmp_path / "guide_kanto.json", "Kanto", ["1"], 10**18)
+    _write(tmp_path / "guide_johto.json", "Johto", ["1"], 10**18)
+    (tmp_path / "notes.json").write_text("{}")
+    before = snapshot(tmp_path)
+    assert set(before) == {"guide_kanto.json", "guide_johto.json"}
+
+    _write(tmp_path / "guide_kanto.json", "Kanto", ["2"], 2 * 10**18)
+    _write(tmp_path / "guide_hoenn.json", "Hoenn", ["1"])
+    (tmp_path / "guide_johto.json").unlink()
+    assert changed_files(before, snapshot(tmp_path)) == [
+        "guide_hoenn.json",
+        "guide_kanto.json",
+    ]
+
+
+def test_watch_debounces_bursts(tmp_path):
+    """Test that several quick saves are reported as one change."""
+    path = tmp_path / "guide_kanto.json"
+    _write(path, "Kanto", ["1"], 10**18)
+    calls = []
+    stop = threading.Event()
+
+    def on_change(names):
+        calls.append(names)
+        stop.set()
+
+    thread = threading.Thread(
+        target=watch,
+        args=(tmp_path, on_change),
+        kwargs={"interval": 0.02, "debounce": 0.2, "stop": stop},
+    )
+    thread.start()
+    time.sleep(0.1)
+    for i in range(5):
+        _write(path, "Kanto", [str(i)], 10**18 + i + 1)
+        time.sleep(0.03)
+    thread.join(5)
+    stop.set()
+
+    assert calls == [["guide_kanto.json"]]
+
+
+def test_file_watcher_reimports_changed_file(tmp_path):
+    """Test that saving a file imports only that file, once per burst."""
+    app = QCoreApplication.instance() or QCoreApplication([])
+    _write(tmp_path / "guide_kanto.json", "Kanto", ["1"])
+    _write(tmp_path / "guide_johto.json", "Johto", ["1"])
+    engine = init_db(create_sqlite_engine(tmp_path / "watch.db"))
+    executor = QueryExecutor(pool=QThreadPool())
+    imports = []
+    add_import_listener(imports.append)
+    try:
+        watcher = GuideFileWatcher(
+            tmp_path, lambda: Session(engine), debounce_ms=50, executor=executor
+        )
+        watcher.import_all()
+        executor.wait_for_done(5000)
+        app.processEvents()
+        assert sorted(imports[0].guides) == ["johto", "kanto"]
+
+        _write(tmp_path / "guide_kanto.json", "Kanto", ["2"], 2 * 10**18)
+        _write(tmp_path / "guide_kanto.json", "Kanto", ["3"], 3 * 10**18)
+        deadline = time.monotonic() + 5
+        while len(imports) < 2 and time.monotonic() < deadline:
+            app.processEvents()
+            executor.wait_for_done(50)
+        app.processEvents()
+
+        assert len(imports) == 2
+        assert (imports[1].files, imports[1].guides) == (1, ["kanto"])
+        with Session(engine) as s:
+            assert query_steps_page(s, "kanto", 1) == [(1, "3")]
+    finally:
+        remove_import_listener(imports.append)
+        engine.dispose()
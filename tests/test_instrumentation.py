@@ -0,0 +1,88 @@
+"""Tests for SQL counters and timing spans."""
+
+import json
+import pytest
+from sqlalchemy import event, text
+from sqlmodel import Session
+from pokemmo_companion.core import instrumentation
+from pokemmo_companion.core.db import create_sqlite_engine, init_db
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = init_db(create_sqlite_engine(tmp_path / "instr.db"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def recording():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_attaches_nothing(engine):
+    """Test that disabled instrumentation adds no listeners and records nothing."""
+    instrumentation.disable()
+    instrumentation.reset()
+    assert instrumentation.span("x") is instrumentation.span("y")
+    assert not event.contains(
+        engine, "before_cursor_execute", instrumentation._before_cursor_execute
+    )
+
+    with instrumentation.span("x"), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    snap = instrumentation.snapshot()
+    assert not snap.enabled
+    assert snap.query_count == 0 and snap.spans == ()
+
+
+def test_spans_count_statements(engine, recording):
+    """Test that a span records its time and the statements run inside it."""
+
+    @instrumentation.timed("handler")
+    def handler():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+    handler()
+    handler()
+
+    snap = instrumentation.snapshot()
+    (span,) = snap.spans
+    assert (span.name, span.count, span.queries) == ("handler", 2, 4)
+    assert span.total_ms >= span.max_ms > 0
+    assert {s.name: s.count for s in snap.statements}["SELECT 1"] == 2
+    assert snap.query_count >= 4
+
+
+def test_loader_phases_recorded(engine, recording, tmp_path):
+    """Test that an import reports each loader phase and dumps as JSON."""
+    (tmp_path / "guide_kanto.json").write_text(
+        json.dumps({"region": "Kanto", "sections": [{"title": "A", "steps": ["1"]}]})
+    )
+    with Session(engine) as s:
+        load_guides_from_dir(tmp_path, s)
+    (tmp_path / "guide_kanto.json").write_text(
+        json.dumps({"region": "Kanto", "sections": [{"title": "A", "steps": []}]})
+    )
+    with Session(engine) as s:
+        load_guides_from_dir(tmp_path, s)
+
+    out = tmp_path / "instr.json"
+    data = json.loads(instrumentation.dump_json(out))
+    assert json.loads(out.read_text()) == data
+    spans = {s["name"]: s for s in data["spans"]}
+    for phase in ("parse", "guide_upsert", "sections", "commit"):
+        assert spans[f"loader.{phase}"]["count"] == 2
+    for phase in ("insert", "diff", "delete"):
+        assert spans[f"loader.{phase}"]["count"] == 1
+    assert spans["loader.insert"]["queries"] == 1
+    assert spans["loader.parse"]["queries"] == 0
+    assert "loader.insert" in instrumentation.snapshot().format()
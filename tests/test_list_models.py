@@ -0,0 +1,62 @@
+"""Tests for the incrementally fetched list models."""
+
+from PySide6.QtCore import QCoreApplication, QThreadPool, Qt
+from pokemmo_companion.ui.list_models import SectionListModel
+from pokemmo_companion.ui.query_executor import QueryExecutor
+
+
+def _app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _settle(app, executor):
+    executor.wait_for_done(5000)
+    app.processEvents()
+
+
+def _fetcher(rows, calls):
+    def fetch(after, limit):
+        calls.append(after)
+        start = 0 if after is None else [k for k, _ in rows].index(after) + 1
+        return rows[start : start + limit]
+
+    return fetch
+
+
+def test_model_fetches_pages_on_demand():
+    """Test that only the first page loads until more is requested."""
+    app = _app()
+    executor = QueryExecutor(pool=QThreadPool())
+    model = SectionListModel(executor, "sections", page_size=4)
+    rows = [(i, f"S{i}") for i in range(1, 11)]
+    calls = []
+
+    model.reset(_fetcher(rows, calls))
+    _settle(app, executor)
+    assert model.rowCount() == 4
+    assert model.canFetchMore()
+    assert model.data(model.index(0)) == "001 — S1"
+    assert model.data(model.index(3), Qt.UserRole) == 4
+
+    model.fetchMore()
+    _settle(app, executor)
+    model.fetchMore()
+    _settle(app, executor)
+    assert model.rowCount() == 10
+    assert model.complete and not model.canFetchMore()
+    assert calls == [None, 4, 8]
+    assert model.row_of(7) == 6
+    assert model.row_of(11) == -1
+
+
+def test_reset_drops_pages_of_previous_fetcher():
+    """Test that a page for the previous region never lands in the model."""
+    app = _app()
+    executor = QueryExecutor(pool=QThreadPool())
+    model = SectionListModel(executor, "sections", page_size=4)
+
+    model.reset(lambda after, limit: [(1, "old")])
+    model.reset(lambda after, limit: [(1, "new"), (2, "new")])
+    _settle(app, executor)
+
+    assert [model.text(r) for r in range(model.rowCount())] == ["new", "new"]
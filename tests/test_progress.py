@@ -0,0 +1,65 @@
+"""Tests for the write-behind progress store."""
+
+from sqlmodel import Session, select
+from pokemmo_companion.core.models import SectionProgress
+from pokemmo_companion.core.services.progress import ProgressStore
+
+
+def _rows(engine):
+    with Session(engine) as s:
+        return {
+            (p.guide_key, p.section_index): p.done
+            for p in s.exec(select(SectionProgress)).all()
+        }
+
+
+def test_toggles_coalesce_until_flush(temp_db):
+    """Test that toggles stay in memory and flush as one write per section."""
+    store = ProgressStore(lambda: Session(temp_db))
+
+    store.set_done("kanto", 1, True)
+    store.set_done("kanto", 1, False)
+    store.set_done("kanto", 1, True)
+    store.set_done("kanto", 2, True)
+
+    assert store.is_done("kanto", 1)
+    assert not store.is_done("kanto", 3)
+    assert store.pending == 2
+    assert _rows(temp_db) == {}
+
+    assert store.flush() == 2
+    assert store.pending == 0
+    assert _rows(temp_db) == {("kanto", 1): True, ("kanto", 2): True}
+
+    store.set_done("kanto", 2, False)
+    assert store.flush() == 1
+    assert _rows(temp_db) == {("kanto", 1): True, ("kanto", 2): False}
+    assert store.flush() == 0
+
+
+def test_close_flushes_and_reload_reads_database(temp_db):
+    """Test that close persists pending changes for the next session."""
+    store = ProgressStore(lambda: Session(temp_db), flush_interval=60)
+    store.start()
+    store.set_done("johto", 4, True)
+    store.close()
+
+    reopened = ProgressStore(lambda: Session(temp_db))
+    assert reopened.is_done("johto", 4)
+    assert reopened.done_sections("johto") == {4}
+    assert reopened.done_sections("kanto") == set()
+
+
+def test_background_thread_flushes(temp_db):
+    """Test that the flush thread writes without an explicit flush."""
+    store = ProgressStore(lambda: Session(temp_db), flush_interval=0.01)
+    store.start()
+    try:
+        store.set_done("hoenn", 1, True)
+        for _ in range(200):
+            if _rows(temp_db):
+                break
+            store._stop.wait(0.01)
+        assert _rows(temp_db) == {("hoenn", 1): True}
+    finally:
+        store.close()
@@ -0,0 +1,45 @@
+"""Tests for the background query executor used by the guides view."""
+
+import threading
+from PySide6.QtCore import QCoreApplication, QThreadPool
+from pokemmo_companion.ui.query_executor import QueryExecutor
+
+
+def _app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_only_latest_request_of_a_channel_is_delivered():
+    """Test that a superseded request never reaches its callback."""
+    app = _app()
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    executor = QueryExecutor(pool=pool)
+    release = threading.Event()
+    results = []
+
+    # The first task blocks the only worker so the next ones stay queued
+    executor.submit("steps", lambda: release.wait(5) and "first", results.append)
+    executor.submit("steps", lambda: "second", results.append)
+    executor.submit("steps", lambda: "third", results.append)
+    executor.submit("other", lambda: "other", results.append)
+    release.set()
+
+    assert executor.wait_for_done(5000)
+    app.processEvents()
+    assert sorted(results) == ["other", "third"]
+
+
+def test_failures_go_to_error_callback():
+    """Test that an exception is reported instead of a result."""
+    app = _app()
+    executor = QueryExecutor(pool=QThreadPool())
+    errors = []
+
+    def boom():
+        raise ValueError("broken")
+
+    executor.submit("sections", boom, lambda _: None, errors.append)
+    assert executor.wait_for_done(5000)
+    app.processEvents()
+    assert errors == ["broken"]
@@ -0,0 +1,149 @@
+"""Tests for the startup schema gate."""
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel
+from pokemmo_companion.core import schema
+from pokemmo_companion.core.db import create_sqlite_engine
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make(name="schema.db"):
+        engine = create_sqlite_engine(tmp_path / name)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def _objects(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT type, name FROM sqlite_master "
+                "WHERE name NOT LIKE 'sqlite%' AND name != 'alembic_version' "
+                # FTS5 shadow tables are created by the virtual table itself
+                "AND NOT (type = 'table' AND name GLOB 'guidestep_fts_*')"
+            )
+        ).all()
+    return set(rows)
+
+
+def _fts_sql(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT name, sql FROM sqlite_master "
+                # The virtual table and its triggers, not the shadow tables
+                "WHERE tbl_name IN ('guidestep', 'guidestep_fts') "
+                "AND name GLOB 'guidestep_fts*'"
+            )
+        ).all()
+    return dict(rows)
+
+
+def _revision(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def test_schema_version_matches_head_revision():
+    """Test that SCHEMA_VERSION is the head of migrations/versions."""
+    config = schema.alembic_config(None)
+    head = ScriptDirectory.from_config(config).get_current_head()
+    assert int(head) == schema.SCHEMA_VERSION
+
+
+def test_ensure_schema_migrates_once(make_engine):
+    """Test that a fresh database is migrated and then only version-checked."""
+    engine = make_engine()
+
+    assert schema.ensure_schema(engine)
+    with engine.connect() as conn:
+        assert schema.stored_version(conn) == schema.SCHEMA_VERSION
+    assert _revision(engine) == f"{schema.SCHEMA_VERSION:04d}"
+    assert not schema.ensure_schema(engine)
+
+
+def test_migrations_match_models(make_engine):
+    """Test that migrating and create_all build the same tables and indexes."""
+    migrated = make_engine("migrated.db")
+    created = make_engine("created.db")
+    schema.ensure_schema(migrated)
+    SQLModel.metadata.create_all(created)
+
+    assert _objects(migrated) == _objects(created)
+    # The FTS DDL is written out in migration 0005 and in the models
+    assert _fts_sql(migrated) == _fts_sql(created)
+
+
+def test_unversioned_database_is_stamped(make_engine):
+    """Test that a database built by create_all is adopted, not re-created."""
+    engine = make_engine()
+    SQLModel.metadata.create_all(engine)
+
+    assert schema.ensure_schema(engine)
+    assert _revision(engine) == f"{schema.SCHEMA_VERSION:04d}"
+
+
+def test_newer_database_is_rejected(make_engine):
+    """Test that a database from a newer app version is not touched."""
+    engine = make_engine()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {schema.SCHEMA_VERSION + 1}")
+
+    with pytest.raises(RuntimeError):
+        schema.ensure_schema(engine)
+
+
+def test_content_hash_backfill(make_engine):
+    """Test that migration 0009 hashes existing steps like the loader does."""
+    from alembic import command
+
+    from pokemmo_companion.core.services.guide_loader import step_hash
+
+    engine = make_engine()
+    with engine.begin() as conn:
+        command.upgrade(schema.alembic_config(conn), "0008")
+        conn.exec_driver_sql("INSERT INTO guide (id, key, title) VALUES (1, 'k', 'K')")
+        conn.exec_driver_sql(
+            "INSERT INTO guidestep (guide_id, section_index, step_index, title, text) "
+            "VALUES (1, 1, 1, 'Intro', 'Talk to the professor')"
+        )
+
+    schema.ensure_schema(engine)
+
+    with engine.connect() as conn:
+        stored = conn.exec_driver_sql("SELECT content_hash FROM guidestep").scalar()
+    assert stored == step_hash("Intro", "Talk to the professor")
+
+
+def test_json_tags_move_to_tag_store(make_engine):
+    """Test that migration 0010 keeps JSON guide tags and drops the columns."""
+    from alembic import command
+
+    from pokemmo_companion.core.services.tags import tags_of_guide
+
+    engine = make_engine()
+    with engine.begin() as conn:
+        command.upgrade(schema.alembic_config(conn), "0009")
+        conn.exec_driver_sql(
+            "INSERT INTO guide (id, key, title, tags) "
+            "VALUES (1, 'k', 'K', '[\"region:k\", \"legacy\"]')"
+        )
+
+    schema.ensure_schema(engine)
+
+    columns = {
+        table: {c["name"] for c in inspect(engine).get_columns(table)}
+        for table in ("guide", "guidestep")
+    }
+    assert "tags" not in columns["guide"] | columns["guidestep"]
+    with Session(engine) as s:
+        assert tags_of_guide(s, 1) == ["legacy", "region:k"]
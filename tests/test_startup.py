@@ -0,0 +1,33 @@
+"""Tests for startup profiling."""
+
+import time
+from pokemmo_companion.startup import FIRST_PAINT_TARGET_MS, StartupProfile
+
+
+def test_disabled_profile_records_nothing():
+    """Test that a disabled profile still imports but records nothing."""
+    profile = StartupProfile(time.perf_counter())
+
+    with profile.importing("email.mime.text"):
+        import email.mime.text  # noqa: F401
+    profile.mark("imports")
+    assert profile.imports == [] and profile.phases == []
+
+
+def test_profile_writes_json_breakdown(tmp_path):
+    """Test that imports and phases end up in the JSON report."""
+    profile = StartupProfile(time.perf_counter(), enabled=True)
+    with profile.importing("json"):  # already loaded, not timed
+        import json  # noqa: F401
+    with profile.importing("xml.dom.minidom"):
+        import xml.dom.minidom  # noqa: F401
+    profile.mark("first_paint")
+    out = tmp_path / "profile.json"
+
+    profile.report(str(out))
+
+    data = json.loads(out.read_text())
+    assert list(data["imports_ms"]) == ["xml.dom.minidom"]
+    assert data["phases_ms"]["first_paint"] >= 0
+    assert profile.phase_ms("first_paint") == data["phases_ms"]["first_paint"]
+    assert data["first_paint_target_ms"] == FIRST_PAINT_TARGET_MS
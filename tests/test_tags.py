@@ -0,0 +1,83 @@
+"""Tests for the interned tag store."""
+
+import json
+from sqlalchemy import text
+from pokemmo_companion.core.services.guide_loader import load_guides_from_dir
+from pokemmo_companion.core.services.tags import (
+    guides_with_tag,
+    intern_tags,
+    sections_with_tag,
+    steps_with_tag,
+    tag_guide,
+    tags_of_guide,
+    tags_of_step,
+)
+
+
+def _write_guides(tmp_path):
+    for region, sections in (
+        ("Alpha", [("A1", ["a", "b"]), ("A2", ["c"]), ("A3", ["d", "e"])]),
+        ("Beta", [("B1", ["f"]), ("B2", ["g"]), ("B3", ["h"])]),
+    ):
+        with (tmp_path / f"guide_{region.lower()}.json").open("w") as f:
+            json.dump(
+                {
+                    "region": region,
+                    "sections": [{"title": t, "steps": s} for t, s in sections],
+                },
+                f,
+            )
+
+
+def test_steps_with_tag_across_regions(session, tmp_path):
+    """Test that a section tag finds that section in every region."""
+    _write_guides(tmp_path)
+    load_guides_from_dir(tmp_path, session)
+
+    steps = steps_with_tag(session, "section:3")
+    assert [s.text for s in steps] == ["d", "e", "h"]
+    assert sections_with_tag(session, "section:1") == [
+        ("alpha", 1, "A1"),
+        ("beta", 1, "B1"),
+    ]
+    assert [s.text for s in steps_with_tag(session, "region:beta")] == [
+        "f",
+        "g",
+        "h",
+    ]
+    assert [g.key for g in guides_with_tag(session, "region:alpha")] == ["alpha"]
+    assert steps_with_tag(session, "missing") == []
+    assert tags_of_step(session, steps[0]) == ["region:alpha", "section:3"]
+
+
+def test_tags_are_interned_once(session, tmp_path):
+    """Test that re-imports reuse tag rows and keep links unique."""
+    _write_guides(tmp_path)
+    load_guides_from_dir(tmp_path, session)
+    load_guides_from_dir(tmp_path, session, force=True)
+
+    names = session.execute(text("SELECT name FROM tag ORDER BY name")).scalars()
+    assert list(names) == [
+        "region:alpha",
+        "region:beta",
+        "section:1",
+        "section:2",
+        "section:3",
+    ]
+    links = session.execute(text("SELECT count(*) FROM sectiontag")).scalar()
+    assert links == 6
+    guide_id = guides_with_tag(session, "region:alpha")[0].id
+    assert tags_of_guide(session, guide_id) == ["region:alpha"]
+
+    ids = intern_tags(session, ["region:alpha", "custom"])
+    assert ids["region:alpha"] == intern_tags(session, ["region:alpha"])["region:alpha"]
+    tag_guide(session, guide_id, ["custom"])
+    tag_guide(session, guide_id, ["custom"])
+    assert [g.key for g in guides_with_tag(session, "custom")] == ["alpha"]
+    assert [s.text for s in steps_with_tag(session, "custom")] == [
+        "a",
+        "b",
+        "c",
+        "d",
+        "e",
+    ]